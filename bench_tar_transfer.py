@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+大量小文件目录传输基准测试
+在真实SSH服务器上对比逐文件SFTP传输与tar流批量传输的耗时
+
+用法:
+  python bench_tar_transfer.py --host 192.168.1.100 --username admin --private-key ~/.ssh/id_rsa \
+      [--files 10000] [--file-size 1024] [--remote-dir /tmp] [--compression gzip]
+"""
+
+import argparse
+import asyncio
+import os
+import shlex
+import tempfile
+import time
+from ssh_manager import SSHManager
+
+
+def make_small_files(root: str, count: int, file_size: int):
+    """生成count个小文件，每个目录放100个"""
+    payload = (b"0123456789abcdef" * (file_size // 16 + 1))[:file_size]
+    for i in range(count):
+        directory = os.path.join(root, f"d{i // 100:04d}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"f{i:05d}.txt"), "wb") as f:
+            f.write(payload)
+
+
+async def run_benchmark(args) -> dict:
+    manager = SSHManager()
+    connection_id = await manager.create_connection(
+        args.host, args.username, args.port,
+        password=args.password, private_key=args.private_key
+    )
+    connection = manager.connections[connection_id]
+    remote_base = f"{args.remote_dir.rstrip('/')}/ssh_mcp_bench_{int(time.time())}"
+
+    try:
+        with tempfile.TemporaryDirectory() as local_root:
+            make_small_files(local_root, args.files, args.file_size)
+
+            started = time.perf_counter()
+            sftp_result = await manager.sync_directory(connection_id, local_root, f"{remote_base}/sftp")
+            sftp_elapsed = time.perf_counter() - started
+
+            started = time.perf_counter()
+            tar_result = await manager.upload_directory(
+                connection_id, local_root, f"{remote_base}/tar", compression=args.compression
+            )
+            tar_elapsed = time.perf_counter() - started
+    finally:
+        await connection.execute_command(f"rm -rf {shlex.quote(remote_base)}", timeout=300)
+        await manager.disconnect_all()
+
+    return {
+        "sftp": sftp_result,
+        "sftp_elapsed": sftp_elapsed,
+        "tar": tar_result,
+        "tar_elapsed": tar_elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="逐文件SFTP与tar流批量传输基准测试")
+    parser.add_argument("--host", required=True, help="SSH服务器地址")
+    parser.add_argument("--username", required=True, help="用户名")
+    parser.add_argument("--port", type=int, default=22, help="端口")
+    parser.add_argument("--password", help="密码")
+    parser.add_argument("--private-key", help="私钥文件路径")
+    parser.add_argument("--files", type=int, default=10000, help="小文件数量")
+    parser.add_argument("--file-size", type=int, default=1024, help="每个文件的字节数")
+    parser.add_argument("--remote-dir", default="/tmp", help="远端临时目录，测试结束后删除")
+    parser.add_argument("--compression", default="gzip", choices=["none", "gzip", "zstd"], help="tar流压缩方式")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_benchmark(args))
+    print(f"文件: {args.files} 个 x {args.file_size} 字节")
+    print(f"逐文件SFTP: {result['sftp_elapsed']:.2f} 秒 "
+          f"(传输 {result['sftp'].get('transferred', 0)} 个, 成功: {result['sftp']['success']})")
+    print(f"tar流({result['tar'].get('compression', args.compression)}): {result['tar_elapsed']:.2f} 秒 "
+          f"(传输 {result['tar'].get('files', 0)} 个, 线上 {result['tar'].get('wire_bytes', 0)} 字节, "
+          f"成功: {result['tar']['success']})")
+    if result["tar_elapsed"] > 0:
+        print(f"加速比: {result['sftp_elapsed'] / result['tar_elapsed']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
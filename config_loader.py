@@ -31,6 +31,40 @@ class SSHAgentConfig(BaseModel):
     log_level: str = Field(default="INFO", description="日志级别")
     auto_connect: List[str] = Field(default_factory=list, description="启动时自动连接的连接名称")
     max_connections: int = Field(default=10, description="最大连接数")
+    sftp_pool_size: int = Field(default=4, description="每个连接的SFTP会话池大小")
+    sftp_idle_timeout: int = Field(default=300, description="SFTP空闲会话回收时间（秒）")
+    health_probe_idle_threshold: int = Field(default=60, description="连接空闲超过该秒数才发送健康探测命令")
+    async_output_buffer_size: int = Field(default=1024 * 1024, description="每个异步命令stdout/stderr各自保留的最大字节数")
+    async_output_spill_dir: Optional[str] = Field(default=None, description="设置后异步命令的完整输出会同时写入该目录下的日志文件")
+    interactive_read_size: int = Field(default=65536, description="交互式会话每次从channel读取的最大字节数")
+    interactive_drain_limit: int = Field(default=4 * 1024 * 1024, description="交互式会话和异步命令每次唤醒最多读取的字节数（异步命令按流计算），超出部分留到下一轮，避免单个会话或命令占用事件循环")
+    sftp_transfer_chunk_size: int = Field(default=8 * 1024 * 1024, description="并行传输时每个分块的字节数")
+    sftp_transfer_concurrency: int = Field(default=4, description="并行传输使用的SFTP会话数，实际并发受sftp_pool_size限制")
+    transfer_checkpoint_file: str = Field(default="~/.ssh_agent_mcp/transfer_checkpoints.json", description="断点续传检查点文件路径，默认保存在用户目录下的 ~/.ssh_agent_mcp 中（目录权限0700）")
+    listing_page_size: int = Field(default=1000, description="分页列出远程目录时每页的默认条目数")
+    listing_cursor_idle_timeout: int = Field(default=300, description="目录列表游标空闲超过该秒数后关闭")
+    metadata_cache_ttl: float = Field(default=30, description="远程文件信息和目录列表缓存的有效秒数，0表示禁用缓存")
+    metadata_cache_size: int = Field(default=1024, description="每个连接最多缓存的元数据条目数")
+    execute_many_parallelism: int = Field(default=10, description="批量执行命令时同时处理的主机数上限")
+    auto_connect_parallelism: int = Field(default=8, description="自动连接时同时进行的SSH握手数上限")
+    auto_connect_timeout: int = Field(default=20, description="自动连接时每台主机的超时时间（秒）")
+    auto_connect_on_startup: bool = Field(default=False, description="是否在服务启动时于后台自动连接auto_connect中的主机")
+    health_check_concurrency: int = Field(default=16, description="健康检查和keep-alive每轮同时探测的连接数上限")
+    health_check_timeout: float = Field(default=10, description="健康检查和keep-alive对单个连接的超时时间（秒）")
+    health_check_jitter: float = Field(default=0.1, description="探测间隔的随机抖动比例，避免所有连接同时探测")
+    connect_workers: int = Field(default=8, description="SSH握手和打开会话使用的线程数")
+    command_workers: int = Field(default=32, description="命令执行和交互式SFTP操作使用的线程数")
+    transfer_workers: int = Field(default=16, description="文件传输和目录同步使用的线程数")
+    housekeeping_workers: int = Field(default=8, description="健康检查、keep-alive和会话关闭使用的线程数")
+    max_channels_per_connection: int = Field(default=6, description="每条SSH传输层同时执行命令的channel数上限，超出的命令按FIFO排队（需低于服务端MaxSessions减去SFTP会话数）")
+    auto_reconnect: bool = Field(default=True, description="连接断开后是否用上次的认证参数在后台自动重连")
+    reconnect_max_attempts: int = Field(default=10, description="每轮自动重连的最大尝试次数，0表示不限")
+    reconnect_base_delay: float = Field(default=1.0, description="重连退避的初始间隔（秒），每次失败后翻倍")
+    reconnect_max_delay: float = Field(default=60.0, description="重连退避间隔的上限（秒）")
+    reconnect_jitter: float = Field(default=0.5, description="重连间隔随机缩短的最大比例，避免多个连接同时重试")
+    reconnect_command_wait: float = Field(default=30.0, description="重连期间命令排队等待的最长时间（秒），超时后返回失败")
+    transports_per_connection: int = Field(default=1, description="每个连接常驻打开的SSH传输层数（含主传输层），命令按负载最低的传输层分配")
+    max_extra_transports: int = Field(default=0, description="channel占满时向同一主机额外打开的传输层数上限，0表示不额外打开")
 
 class ConfigLoader:
     """配置加载器"""
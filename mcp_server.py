@@ -33,11 +33,23 @@ except Exception as e:
     logger.warning(f"配置加载失败，使用默认配置: {e}")
     config = None
 
-ssh_manager = SSHManager()
+ssh_manager = SSHManager(config)
 
 # 创建MCP服务器
 server = Server("ssh-agent-mcp")
 
+def _resolve_auto_connect_hosts():
+    """把配置中的auto_connect名称解析为连接配置，返回(连接配置列表, 错误列表)"""
+    host_configs = []
+    errors = []
+    for conn_name in config.auto_connect:
+        conn_config = config_loader.get_connection_by_name(conn_name)
+        if conn_config:
+            host_configs.append(conn_config)
+        else:
+            errors.append(f"连接名称 '{conn_name}' 不存在")
+    return host_configs, errors
+
 def _format_file_size(size_bytes: int) -> str:
     """格式化文件大小显示"""
     if size_bytes == 0:
@@ -58,24 +70,38 @@ class SSHConnectionParams(BaseModel):
     password: Optional[str] = Field(default=None, description="SSH密码")
     private_key: Optional[str] = Field(default=None, description="私钥文件路径")
     private_key_password: Optional[str] = Field(default=None, description="私钥密码")
+    force_reconnect: bool = Field(default=False, description="已有健康连接时是否仍然断开并重新握手")
 
 class ExecuteCommandParams(BaseModel):
     connection_id: str = Field(description="SSH连接ID")
     command: str = Field(description="要执行的命令")
     timeout: int = Field(default=30, description="命令超时时间（秒）")
 
+class ExecuteManyParams(BaseModel):
+    command: str = Field(description="要执行的命令")
+    connection_ids: List[str] = Field(default_factory=list, description="已建立的SSH连接ID")
+    tag: Optional[str] = Field(default=None, description="配置文件中的标签，选择带该标签的所有主机")
+    names: List[str] = Field(default_factory=list, description="配置文件中的连接名称")
+    timeout: int = Field(default=30, description="每台主机的超时时间（秒），包括按需连接的时间")
+    max_parallel: Optional[int] = Field(default=None, description="同时执行的主机数上限")
+
 class StartAsyncCommandParams(BaseModel):
     connection_id: str = Field(description="SSH连接ID")
     command: str = Field(description="要执行的长时间运行命令")
 
 class GetCommandStatusParams(BaseModel):
     command_id: str = Field(description="异步命令ID")
+    offset: Optional[int] = Field(default=None, description="stdout起始字节序号，只返回之后的新输出")
+    stderr_offset: Optional[int] = Field(default=None, description="stderr起始字节序号")
+    tail_bytes: Optional[int] = Field(default=None, description="每个流只返回最后N字节")
+    head_bytes: Optional[int] = Field(default=None, description="每个流从起始位置最多返回N字节")
 
 class TerminateCommandParams(BaseModel):
     command_id: str = Field(description="要终止的异步命令ID")
 
 class ConnectByNameParams(BaseModel):
     connection_name: str = Field(description="配置文件中的连接名称")
+    force_reconnect: bool = Field(default=False, description="已有健康连接时是否仍然断开并重新握手")
 
 class ConnectByConfigHostParams(BaseModel):
     config_host: str = Field(description="SSH config文件中的主机名")
@@ -83,6 +109,7 @@ class ConnectByConfigHostParams(BaseModel):
     password: Optional[str] = Field(default=None, description="可选密码")
     private_key: Optional[str] = Field(default=None, description="可选私钥文件路径")
     private_key_password: Optional[str] = Field(default=None, description="可选私钥密码")
+    force_reconnect: bool = Field(default=False, description="已有健康连接时是否仍然断开并重新握手")
 
 class ListConfigParams(BaseModel):
     filter_tag: Optional[str] = Field(default=None, description="按标签过滤连接")
@@ -100,6 +127,15 @@ class SendInputParams(BaseModel):
 class GetInteractiveOutputParams(BaseModel):
     session_id: str = Field(description="交互式会话ID")
     max_lines: int = Field(default=50, description="最大返回行数")
+    offset: Optional[int] = Field(default=None, description="起始输出序号，只返回之后的新输出")
+    since_time: Optional[float] = Field(default=None, description="只返回该时间戳之后的输出")
+
+class WaitInteractiveOutputParams(BaseModel):
+    session_id: str = Field(description="交互式会话ID")
+    offset: Optional[int] = Field(default=None, description="起始输出序号，默认只等待新输出")
+    pattern: Optional[str] = Field(default=None, description="等待匹配的正则表达式（如提示符）")
+    idle_ms: Optional[int] = Field(default=None, description="输出安静多少毫秒后返回")
+    timeout: float = Field(default=30, description="最长等待时间（秒）")
 
 class TerminateInteractiveParams(BaseModel):
     session_id: str = Field(description="要终止的交互式会话ID")
@@ -108,15 +144,47 @@ class UploadFileParams(BaseModel):
     connection_id: str = Field(description="SSH连接ID")
     local_path: str = Field(description="本地文件路径")
     remote_path: str = Field(description="远程文件路径")
+    parallel: bool = Field(default=False, description="是否分块并行上传，默认整体上传")
+    chunk_size: Optional[int] = Field(default=None, description="并行上传的分块大小（字节）")
+    concurrency: Optional[int] = Field(default=None, description="并行上传使用的SFTP会话数")
+    resume: bool = Field(default=False, description="是否从上次中断处继续上传")
+    verify_hash: bool = Field(default=False, description="续传前是否比对两端已传输部分的SHA-256")
+    bulk: bool = Field(default=False, description="是否以tar流方式批量上传整个目录")
+    compression: str = Field(default="gzip", description="批量上传时的压缩方式：none、gzip或zstd")
 
 class DownloadFileParams(BaseModel):
     connection_id: str = Field(description="SSH连接ID")
     remote_path: str = Field(description="远程文件路径")
     local_path: str = Field(description="本地文件路径")
+    parallel: bool = Field(default=False, description="是否分块并行下载，默认整体下载")
+    chunk_size: Optional[int] = Field(default=None, description="并行下载的分块大小（字节）")
+    concurrency: Optional[int] = Field(default=None, description="并行下载使用的SFTP会话数")
+    resume: bool = Field(default=False, description="是否从上次中断处继续下载")
+    verify_hash: bool = Field(default=False, description="续传前是否比对两端已传输部分的SHA-256")
+    bulk: bool = Field(default=False, description="是否以tar流方式批量下载整个目录")
+    compression: str = Field(default="gzip", description="批量下载时的压缩方式：none、gzip或zstd")
+
+class SyncDirectoryParams(BaseModel):
+    connection_id: str = Field(description="SSH连接ID")
+    local_path: str = Field(description="本地目录路径")
+    remote_path: str = Field(description="远程目录路径")
+    direction: str = Field(default="upload", description="同步方向：upload（本地到远程）或download（远程到本地）")
+    include: List[str] = Field(default_factory=list, description="只同步匹配这些glob模式的文件")
+    exclude: List[str] = Field(default_factory=list, description="排除匹配这些glob模式的文件和目录")
+    checksum: bool = Field(default=False, description="是否对大小相同的文件比较SHA-256")
+    dry_run: bool = Field(default=False, description="只返回需要传输的文件，不实际传输")
+    concurrency: Optional[int] = Field(default=None, description="同时传输的文件数")
 
 class ListRemoteDirectoryParams(BaseModel):
     connection_id: str = Field(description="SSH连接ID")
     remote_path: str = Field(default=".", description="远程目录路径，默认为当前目录")
+    recursive: bool = Field(default=False, description="是否递归列出子目录")
+    max_depth: Optional[int] = Field(default=None, description="递归的最大深度，1表示只列出当前目录")
+    pattern: Optional[str] = Field(default=None, description="glob过滤规则，匹配相对路径或文件名")
+    page_size: Optional[int] = Field(default=None, description="每页条目数")
+    cursor: Optional[str] = Field(default=None, description="上一页返回的游标，用于获取下一页")
+    include_totals: bool = Field(default=False, description="是否统计过滤后的总条目数")
+    bypass_cache: bool = Field(default=False, description="是否绕过元数据缓存")
 
 class CreateRemoteDirectoryParams(BaseModel):
     connection_id: str = Field(description="SSH连接ID")
@@ -127,10 +195,20 @@ class CreateRemoteDirectoryParams(BaseModel):
 class RemoveRemoteFileParams(BaseModel):
     connection_id: str = Field(description="SSH连接ID")
     remote_path: str = Field(description="要删除的远程文件或目录路径")
+    fast: bool = Field(default=False, description="删除目录时是否在远端执行rm -rf")
+    concurrency: Optional[int] = Field(default=None, description="通过SFTP删除目录时并发使用的会话数")
 
 class GetRemoteFileInfoParams(BaseModel):
     connection_id: str = Field(description="SSH连接ID")
     remote_path: str = Field(description="远程文件或目录路径")
+    bypass_cache: bool = Field(default=False, description="是否绕过元数据缓存")
+
+class MetadataCacheStatsParams(BaseModel):
+    connection_id: Optional[str] = Field(default=None, description="SSH连接ID，为空时返回所有连接")
+    clear: bool = Field(default=False, description="返回统计后是否清空缓存")
+
+class TransportStatsParams(BaseModel):
+    connection_id: Optional[str] = Field(default=None, description="SSH连接ID，为空时返回所有连接")
 
 class RenameRemotePathParams(BaseModel):
     connection_id: str = Field(description="SSH连接ID")
@@ -146,7 +224,7 @@ async def handle_list_tools() -> List[Tool]:
     return [
         Tool(
             name="ssh_connect",
-            description="建立SSH连接",
+            description="建立SSH连接；同一主机已有健康连接时直接复用",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -155,7 +233,8 @@ async def handle_list_tools() -> List[Tool]:
                     "port": {"type": "integer", "description": "SSH端口", "default": 22},
                     "password": {"type": "string", "description": "SSH密码"},
                     "private_key": {"type": "string", "description": "私钥文件路径"},
-                    "private_key_password": {"type": "string", "description": "私钥密码"}
+                    "private_key_password": {"type": "string", "description": "私钥密码"},
+                    "force_reconnect": {"type": "boolean", "description": "已有健康连接时是否仍然断开并重新握手", "default": False}
                 },
                 "required": ["host", "username"]
             }
@@ -202,6 +281,22 @@ async def handle_list_tools() -> List[Tool]:
                 "required": ["connection_id", "command"]
             }
         ),
+        Tool(
+            name="ssh_execute_many",
+            description="在多台主机上并发执行同一命令，按相同输出分组返回结果；配置中尚未连接的主机会按需并发连接",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "command": {"type": "string", "description": "要执行的命令"},
+                    "connection_ids": {"type": "array", "items": {"type": "string"}, "description": "已建立的SSH连接ID列表"},
+                    "tag": {"type": "string", "description": "配置文件中的标签，选择带该标签的所有主机"},
+                    "names": {"type": "array", "items": {"type": "string"}, "description": "配置文件中的连接名称列表"},
+                    "timeout": {"type": "integer", "description": "每台主机的超时时间（秒），包括按需连接的时间", "default": 30},
+                    "max_parallel": {"type": "integer", "description": "同时执行的主机数上限，默认10"}
+                },
+                "required": ["command"]
+            }
+        ),
         Tool(
             name="ssh_disconnect_all",
             description="断开所有SSH连接",
@@ -224,11 +319,15 @@ async def handle_list_tools() -> List[Tool]:
         ),
         Tool(
             name="ssh_get_command_status",
-            description="获取异步命令状态和最新输出",
+            description="获取异步命令状态和最新输出（传入上次返回的游标可只获取新增输出）",
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "command_id": {"type": "string", "description": "异步命令ID"}
+                    "command_id": {"type": "string", "description": "异步命令ID"},
+                    "offset": {"type": "integer", "description": "stdout起始字节序号（上次返回的next_offset），只返回之后的新输出"},
+                    "stderr_offset": {"type": "integer", "description": "stderr起始字节序号（上次返回的next_stderr_offset）"},
+                    "tail_bytes": {"type": "integer", "description": "每个流只返回最后N字节"},
+                    "head_bytes": {"type": "integer", "description": "每个流从起始位置最多返回N字节"}
                 },
                 "required": ["command_id"]
             }
@@ -268,7 +367,8 @@ async def handle_list_tools() -> List[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "connection_name": {"type": "string", "description": "配置文件中的连接名称"}
+                    "connection_name": {"type": "string", "description": "配置文件中的连接名称"},
+                    "force_reconnect": {"type": "boolean", "description": "已有健康连接时是否仍然断开并重新握手", "default": False}
                 },
                 "required": ["connection_name"]
             }
@@ -285,7 +385,7 @@ async def handle_list_tools() -> List[Tool]:
         ),
         Tool(
             name="ssh_auto_connect",
-            description="自动连接配置文件中标记为auto_connect的连接",
+            description="并发连接配置文件中标记为auto_connect的连接，返回成功和失败汇总",
             inputSchema={
                 "type": "object",
                 "properties": {}
@@ -324,7 +424,24 @@ async def handle_list_tools() -> List[Tool]:
                 "type": "object",
                 "properties": {
                     "session_id": {"type": "string", "description": "交互式会话ID"},
-                    "max_lines": {"type": "integer", "description": "最大返回行数", "default": 50}
+                    "max_lines": {"type": "integer", "description": "最大返回行数（未指定offset时生效）", "default": 50},
+                    "offset": {"type": "integer", "description": "起始输出序号（上次返回的next_offset），精确返回之后的全部新输出"},
+                    "since_time": {"type": "number", "description": "只返回该Unix时间戳之后到达的输出"}
+                },
+                "required": ["session_id"]
+            }
+        ),
+        Tool(
+            name="ssh_wait_interactive_output",
+            description="在服务端等待交互式会话输出：直到出现新输出、匹配指定模式、输出安静指定时间或超时后返回，避免反复轮询",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "session_id": {"type": "string", "description": "交互式会话ID"},
+                    "offset": {"type": "integer", "description": "起始输出序号（上次返回的next_offset），默认只等待新输出"},
+                    "pattern": {"type": "string", "description": "等待匹配的正则表达式，如 '\\$ $' 或 '[Pp]assword:'"},
+                    "idle_ms": {"type": "integer", "description": "输出安静多少毫秒后返回"},
+                    "timeout": {"type": "number", "description": "最长等待时间（秒）", "default": 30}
                 },
                 "required": ["session_id"]
             }
@@ -358,7 +475,8 @@ async def handle_list_tools() -> List[Tool]:
                     "username": {"type": "string", "description": "可选用户名，覆盖config中的设置"},
                     "password": {"type": "string", "description": "可选密码"},
                     "private_key": {"type": "string", "description": "可选私钥文件路径"},
-                    "private_key_password": {"type": "string", "description": "可选私钥密码"}
+                    "private_key_password": {"type": "string", "description": "可选私钥密码"},
+                    "force_reconnect": {"type": "boolean", "description": "已有健康连接时是否仍然断开并重新握手", "default": False}
                 },
                 "required": ["config_host"]
             }
@@ -371,7 +489,14 @@ async def handle_list_tools() -> List[Tool]:
                 "properties": {
                     "connection_id": {"type": "string", "description": "SSH连接ID"},
                     "local_path": {"type": "string", "description": "本地文件路径"},
-                    "remote_path": {"type": "string", "description": "远程文件路径"}
+                    "remote_path": {"type": "string", "description": "远程文件路径"},
+                    "parallel": {"type": "boolean", "description": "是否分块并行上传，默认整体上传", "default": False},
+                    "chunk_size": {"type": "integer", "description": "并行上传的分块大小（字节），默认8MB"},
+                    "concurrency": {"type": "integer", "description": "并行上传使用的SFTP会话数，默认4"},
+                    "resume": {"type": "boolean", "description": "是否从上次中断处继续上传（断点续传）", "default": False},
+                    "verify_hash": {"type": "boolean", "description": "续传前是否比对两端已传输部分的SHA-256", "default": False},
+                    "bulk": {"type": "boolean", "description": "批量模式：路径为目录时打包为tar流通过单个channel上传，适合大量小文件；远端没有tar时回退为逐文件SFTP", "default": False},
+                    "compression": {"type": "string", "enum": ["none", "gzip", "zstd"], "description": "批量模式的压缩方式，zstd需要本地安装zstandard且远端有zstd", "default": "gzip"}
                 },
                 "required": ["connection_id", "local_path", "remote_path"]
             }
@@ -384,19 +509,60 @@ async def handle_list_tools() -> List[Tool]:
                 "properties": {
                     "connection_id": {"type": "string", "description": "SSH连接ID"},
                     "remote_path": {"type": "string", "description": "远程文件路径"},
-                    "local_path": {"type": "string", "description": "本地文件路径"}
+                    "local_path": {"type": "string", "description": "本地文件路径"},
+                    "parallel": {"type": "boolean", "description": "是否分块并行下载，默认整体下载", "default": False},
+                    "chunk_size": {"type": "integer", "description": "并行下载的分块大小（字节），默认8MB"},
+                    "concurrency": {"type": "integer", "description": "并行下载使用的SFTP会话数，默认4"},
+                    "resume": {"type": "boolean", "description": "是否从上次中断处继续下载（断点续传）", "default": False},
+                    "verify_hash": {"type": "boolean", "description": "续传前是否比对两端已传输部分的SHA-256", "default": False},
+                    "bulk": {"type": "boolean", "description": "批量模式：路径为目录时打包为tar流通过单个channel下载，适合大量小文件；远端没有tar时回退为逐文件SFTP", "default": False},
+                    "compression": {"type": "string", "enum": ["none", "gzip", "zstd"], "description": "批量模式的压缩方式，zstd需要本地安装zstandard且远端有zstd", "default": "gzip"}
                 },
                 "required": ["connection_id", "remote_path", "local_path"]
             }
         ),
+        Tool(
+            name="ssh_list_transfer_checkpoints",
+            description="列出未完成的文件传输检查点，可使用resume参数重新调用上传/下载继续传输",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
+        ),
+        Tool(
+            name="ssh_sync_directory",
+            description="同步本地目录与远程目录，只传输新增或变化的文件（按大小/修改时间或SHA-256判断）",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "connection_id": {"type": "string", "description": "SSH连接ID"},
+                    "local_path": {"type": "string", "description": "本地目录路径"},
+                    "remote_path": {"type": "string", "description": "远程目录路径"},
+                    "direction": {"type": "string", "enum": ["upload", "download"], "description": "同步方向：upload（本地到远程）或download（远程到本地）", "default": "upload"},
+                    "include": {"type": "array", "items": {"type": "string"}, "description": "只同步匹配这些glob模式的文件，如[\"*.py\"]"},
+                    "exclude": {"type": "array", "items": {"type": "string"}, "description": "排除匹配这些glob模式的文件和目录，如[\"node_modules\", \"*.log\"]"},
+                    "checksum": {"type": "boolean", "description": "是否对大小相同的文件比较SHA-256（远端使用sha256sum）", "default": False},
+                    "dry_run": {"type": "boolean", "description": "只返回需要传输的文件，不实际传输", "default": False},
+                    "concurrency": {"type": "integer", "description": "同时传输的文件数，默认4"}
+                },
+                "required": ["connection_id", "local_path", "remote_path"]
+            }
+        ),
         Tool(
             name="ssh_list_remote_directory",
-            description="列出远程目录内容",
+            description="列出远程目录内容；传入recursive、pattern、page_size、cursor或include_totals时改为分页列出，支持递归、最大深度和glob过滤，通过游标获取下一页",
             inputSchema={
                 "type": "object",
                 "properties": {
                     "connection_id": {"type": "string", "description": "SSH连接ID"},
-                    "remote_path": {"type": "string", "description": "远程目录路径", "default": "."}
+                    "remote_path": {"type": "string", "description": "远程目录路径", "default": "."},
+                    "recursive": {"type": "boolean", "description": "是否递归列出子目录", "default": False},
+                    "max_depth": {"type": "integer", "description": "递归的最大深度，1表示只列出当前目录，默认不限制"},
+                    "pattern": {"type": "string", "description": "glob过滤规则（如 *.log），匹配相对路径或文件名"},
+                    "page_size": {"type": "integer", "description": "每页条目数，默认1000"},
+                    "cursor": {"type": "string", "description": "上一页返回的游标；传入时沿用首次调用的路径和过滤条件"},
+                    "include_totals": {"type": "boolean", "description": "是否统计过滤后的总条目数（需要额外遍历一遍目录）", "default": False},
+                    "bypass_cache": {"type": "boolean", "description": "绕过元数据缓存，直接查询远端", "default": False}
                 },
                 "required": ["connection_id"]
             }
@@ -422,7 +588,9 @@ async def handle_list_tools() -> List[Tool]:
                 "type": "object",
                 "properties": {
                     "connection_id": {"type": "string", "description": "SSH连接ID"},
-                    "remote_path": {"type": "string", "description": "要删除的远程文件或目录路径"}
+                    "remote_path": {"type": "string", "description": "要删除的远程文件或目录路径"},
+                    "fast": {"type": "boolean", "description": "删除目录时在远端执行rm -rf（只接受绝对路径，拒绝系统目录和家目录）", "default": False},
+                    "concurrency": {"type": "integer", "description": "通过SFTP删除目录时并发使用的会话数，默认为会话池大小"}
                 },
                 "required": ["connection_id", "remote_path"]
             }
@@ -434,11 +602,49 @@ async def handle_list_tools() -> List[Tool]:
                 "type": "object",
                 "properties": {
                     "connection_id": {"type": "string", "description": "SSH连接ID"},
-                    "remote_path": {"type": "string", "description": "远程文件或目录路径"}
+                    "remote_path": {"type": "string", "description": "远程文件或目录路径"},
+                    "bypass_cache": {"type": "boolean", "description": "绕过元数据缓存，直接查询远端", "default": False}
                 },
                 "required": ["connection_id", "remote_path"]
             }
         ),
+        Tool(
+            name="ssh_health_metrics",
+            description="查看连接健康检查和keep-alive的扫描耗时、每个连接的最近探测结果和下次计划时间",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
+        ),
+        Tool(
+            name="ssh_executor_stats",
+            description="查看握手、命令、传输、后台维护各线程池的活跃线程数、排队深度、饱和次数和等待时间",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
+        ),
+        Tool(
+            name="ssh_transport_stats",
+            description="查看每个连接各SSH传输层的channel占用、排队情况和利用率",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "connection_id": {"type": "string", "description": "SSH连接ID，为空时返回所有连接"}
+                }
+            }
+        ),
+        Tool(
+            name="ssh_metadata_cache_stats",
+            description="查看远程文件信息/目录列表缓存的命中统计，可选清空缓存",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "connection_id": {"type": "string", "description": "SSH连接ID，为空时返回所有连接"},
+                    "clear": {"type": "boolean", "description": "返回统计后清空缓存", "default": False}
+                }
+            }
+        ),
         Tool(
             name="ssh_rename_remote_path",
             description="重命名远程文件或目录",
@@ -466,7 +672,8 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
                 port=params.port,
                 password=params.password,
                 private_key=params.private_key,
-                private_key_password=params.private_key_password
+                private_key_password=params.private_key_password,
+                force_reconnect=params.force_reconnect
             )
             
             # 检查连接状态
@@ -563,6 +770,8 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
             output += f"命令: {params.command}\n"
             output += f"成功: {result['success']}\n"
             output += f"退出码: {result['exit_code']}\n"
+            if result.get('queue_wait'):
+                output += f"排队等待: {result['queue_wait']:.3f}s\n"
             output += f"标准输出:\n{result['stdout']}\n"
             if result['stderr']:
                 output += f"标准错误:\n{result['stderr']}\n"
@@ -575,6 +784,75 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
                 isError=not result['success']
             )
             
+        elif name == "ssh_execute_many":
+            params = ExecuteManyParams(**arguments)
+            
+            host_configs = []
+            unknown_names = []
+            if params.tag or params.names:
+                if not config:
+                    return CallToolResult(
+                        content=[TextContent(
+                            type="text",
+                            text="配置文件未加载，无法按标签或名称选择主机"
+                        )],
+                        isError=True
+                    )
+                if params.tag:
+                    host_configs.extend(config_loader.get_connections_by_tag(params.tag))
+                for conn_name in params.names:
+                    conn_config = config_loader.get_connection_by_name(conn_name)
+                    if conn_config:
+                        host_configs.append(conn_config)
+                    else:
+                        unknown_names.append(conn_name)
+            
+            try:
+                result = await ssh_manager.execute_many(
+                    command=params.command,
+                    connection_ids=params.connection_ids,
+                    host_configs=host_configs,
+                    timeout=params.timeout,
+                    max_parallel=params.max_parallel
+                )
+            except Exception as e:
+                return CallToolResult(
+                    content=[TextContent(
+                        type="text",
+                        text=f"批量执行命令失败: {str(e)}"
+                    )],
+                    isError=True
+                )
+            
+            output = "批量执行结果:\n"
+            output += f"命令: {params.command}\n"
+            output += f"主机数: {result['total']} (成功: {result['succeeded']}, 失败: {result['failed']}, 错误: {result['errors']})\n"
+            if result['connected']:
+                output += f"按需连接: {len(result['connected'])} 台\n"
+            if unknown_names:
+                output += f"未找到的连接名称: {', '.join(unknown_names)}\n"
+            output += f"耗时: {result['elapsed']} 秒\n"
+            
+            for index, group in enumerate(result['groups'], 1):
+                output += f"\n[分组 {index}] {len(group['hosts'])} 台: {', '.join(group['hosts'])}\n"
+                if group['error']:
+                    output += f"错误: {group['error']}\n"
+                    continue
+                output += f"退出码: {group['exit_code']}\n"
+                output += f"标准输出:\n{group['stdout']}\n"
+                if group['stderr']:
+                    output += f"标准错误:\n{group['stderr']}\n"
+                if group['truncated']:
+                    output += "（输出过长，已截断）\n"
+            
+            return CallToolResult(
+                content=[TextContent(
+                    type="text",
+                    text=output
+                )],
+                isError=result['succeeded'] == 0
+            )
+            
         elif name == "ssh_disconnect_all":
             await ssh_manager.disconnect_all()
             return CallToolResult(
@@ -609,7 +887,13 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
                 
         elif name == "ssh_get_command_status":
             params = GetCommandStatusParams(**arguments)
-            status = await ssh_manager.get_command_status(params.command_id)
+            status = await ssh_manager.get_command_status(
+                params.command_id,
+                offset=params.offset,
+                stderr_offset=params.stderr_offset,
+                tail_bytes=params.tail_bytes,
+                head_bytes=params.head_bytes
+            )
             
             if status.get("status") == "not_found":
                 return CallToolResult(
@@ -633,6 +917,15 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
                 output += f"退出码: {status['exit_code']}\n"
             output += f"标准输出大小: {status['stdout_size']} 字节\n"
             output += f"标准错误大小: {status['stderr_size']} 字节\n"
+            if status.get('stdout_dropped') or status.get('stderr_dropped'):
+                output += f"缓冲区已丢弃: stdout={status['stdout_dropped']} 字节, stderr={status['stderr_dropped']} 字节\n"
+            if status.get('stdout_log'):
+                output += f"完整输出日志: {status['stdout_log']}, {status['stderr_log']}\n"
+            if 'next_offset' in status:
+                output += f"输出范围: stdout={status['offset']}-{status['next_offset']}, stderr={status['stderr_offset']}-{status['next_stderr_offset']}\n"
+                output += f"下次读取游标: offset={status['next_offset']}, stderr_offset={status['next_stderr_offset']}\n"
+                if status.get('stdout_skipped') or status.get('stderr_skipped'):
+                    output += f"游标之后部分输出已被丢弃: stdout={status['stdout_skipped']} 字节, stderr={status['stderr_skipped']} 字节\n"
             
             if status['stdout']:
                 output += f"\n标准输出:\n{status['stdout']}\n"
@@ -737,7 +1030,8 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
                 port=conn_config.port,
                 password=conn_config.password,
                 private_key=conn_config.private_key,
-                private_key_password=conn_config.private_key_password
+                private_key_password=conn_config.private_key_password,
+                force_reconnect=params.force_reconnect
             )
             
             # 检查连接状态
@@ -834,48 +1128,37 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
                     )]
                 )
             
-            results = []
-            errors = []
+            host_configs, errors = _resolve_auto_connect_hosts()
             
-            for conn_name in config.auto_connect:
-                conn_config = config_loader.get_connection_by_name(conn_name)
-                if not conn_config:
-                    errors.append(f"连接名称 '{conn_name}' 不存在")
-                    continue
-                
-                connection_id = await ssh_manager.create_connection(
-                    host=conn_config.host,
-                    username=conn_config.username,
-                    port=conn_config.port,
-                    password=conn_config.password,
-                    private_key=conn_config.private_key,
-                    private_key_password=conn_config.private_key_password
-                )
-                
-                # 检查连接状态
-                status = await ssh_manager.get_connection_status(connection_id)
-                if status["status"] == "connected":
-                    results.append(f"{conn_name} -> {connection_id}")
-                else:
-                    error_msg = status.get('error_message', '未知错误')
-                    errors.append(f"{conn_name}: {error_msg}")
+            # 服务启动时的后台自动连接仍在进行时等待其结果，避免重复握手
+            summary = await ssh_manager.wait_auto_connect()
+            background = summary is not None
+            if summary is None:
+                summary = await ssh_manager.connect_many(host_configs)
             
-            output = f"自动连接完成\n\n"
-            output += f"成功连接 ({len(results)} 个):\n"
-            for result in results:
-                output += f"  {result}\n"
+            output = f"自动连接完成{'（服务启动时后台发起）' if background else ''}\n"
+            output += f"耗时: {summary['elapsed']} 秒\n\n"
+            output += f"成功连接 ({len(summary['connected'])} 个):\n"
+            for item in summary['connected']:
+                output += f"  {item['name']} -> {item['connection_id']} ({item['elapsed']} 秒)\n"
             
-            if errors:
-                output += f"\n连接失败 ({len(errors)} 个):\n"
-                for error in errors:
+            failures = errors + [f"{item['name']}: {item['error']}" for item in summary['failed']]
+            if failures:
+                output += f"\n连接失败 ({len(failures)} 个):\n"
+                for error in failures:
                     output += f"  {error}\n"
             
+            if summary['pending']:
+                output += f"\n握手未完成 ({len(summary['pending'])} 个，稍后可能连接成功，可通过ssh_list_connections查看):\n"
+                for item in summary['pending']:
+                    output += f"  {item['name']} -> {item['connection_id']}: {item['error']}\n"
+            
             return CallToolResult(
                 content=[TextContent(
                     type="text",
                     text=output
                 )],
-                isError=len(errors) > 0 and len(results) == 0
+                isError=len(failures) > 0 and len(summary['connected']) == 0
             )
             
         elif name == "ssh_start_interactive":
@@ -940,7 +1223,9 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
             try:
                 output_data = await ssh_manager.get_interactive_output(
                     session_id=params.session_id,
-                    max_lines=params.max_lines
+                    since_time=params.since_time,
+                    max_lines=params.max_lines,
+                    offset=params.offset
                 )
                 
                 if output_data is None:
@@ -973,7 +1258,12 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
                     output_text = output_content
                 
                 output += f"输出行数: {len(output_text.splitlines()) if output_text else 0}\n"
-                output += f"缓冲区大小: {output_data['output_size']}\n\n"
+                output += f"缓冲区大小: {output_data['output_size']}\n"
+                if 'next_offset' in output_data:
+                    output += f"下次读取游标: offset={output_data['next_offset']}\n"
+                    if output_data.get('skipped'):
+                        output += f"游标之后已被丢弃的输出: {output_data['skipped']} 字符\n"
+                output += "\n"
                 
                 if output_text:
                     output += "输出内容:\n"
@@ -996,6 +1286,53 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
                     isError=True
                 )
                 
+        elif name == "ssh_wait_interactive_output":
+            params = WaitInteractiveOutputParams(**arguments)
+            try:
+                output_data = await ssh_manager.wait_interactive_output(
+                    session_id=params.session_id,
+                    offset=params.offset,
+                    pattern=params.pattern,
+                    idle_ms=params.idle_ms,
+                    timeout=params.timeout
+                )
+                
+                if output_data.get('status') == 'not_found':
+                    return CallToolResult(
+                        content=[TextContent(
+                            type="text",
+                            text=output_data.get('message', f"会话 {params.session_id} 不存在")
+                        )],
+                        isError=True
+                    )
+                
+                output_text = output_data.get('output', '')
+                output = f"交互式会话输出 (会话ID: {params.session_id})\n"
+                output += f"状态: {output_data['status']}\n"
+                output += f"等待结果: {output_data['wait_reason']} (等待 {output_data['waited']:.2f}秒)\n"
+                output += f"下次读取游标: offset={output_data['next_offset']}\n\n"
+                
+                if output_text:
+                    output += "输出内容:\n"
+                    output += output_text
+                else:
+                    output += "暂无输出"
+                
+                return CallToolResult(
+                    content=[TextContent(
+                        type="text",
+                        text=output
+                    )]
+                )
+            except Exception as e:
+                return CallToolResult(
+                    content=[TextContent(
+                        type="text",
+                        text=f"等待输出失败: {str(e)}"
+                    )],
+                    isError=True
+                )
+                
         elif name == "ssh_list_interactive_sessions":
             try:
                 sessions = await ssh_manager.list_interactive_sessions()
@@ -1069,7 +1406,8 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
                     username=params.username,
                     password=params.password,
                     private_key=params.private_key,
-                    private_key_password=params.private_key_password
+                    private_key_password=params.private_key_password,
+                    force_reconnect=params.force_reconnect
                 )
                 
                 # 检查连接状态
@@ -1112,11 +1450,24 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
         elif name == "ssh_upload_file":
             params = UploadFileParams(**arguments)
             try:
-                result = await ssh_manager.upload_file(
-                    connection_id=params.connection_id,
-                    local_path=params.local_path,
-                    remote_path=params.remote_path
-                )
+                if params.bulk:
+                    result = await ssh_manager.upload_directory(
+                        connection_id=params.connection_id,
+                        local_path=params.local_path,
+                        remote_path=params.remote_path,
+                        compression=params.compression
+                    )
+                else:
+                    result = await ssh_manager.upload_file(
+                        connection_id=params.connection_id,
+                        local_path=params.local_path,
+                        remote_path=params.remote_path,
+                        parallel=params.parallel,
+                        chunk_size=params.chunk_size,
+                        concurrency=params.concurrency,
+                        resume=params.resume,
+                        verify_hash=params.verify_hash
+                    )
                 
                 output = f"文件上传操作结果:\n"
                 output += f"连接ID: {params.connection_id}\n"
@@ -1124,9 +1475,23 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
                 output += f"远程路径: {params.remote_path}\n"
                 output += f"成功: {result['success']}\n"
                 
-                if result['success']:
+                if result['success'] and params.bulk:
+                    output += f"传输模式: {result['mode']}"
+                    output += f" (压缩: {result['compression']})\n" if result['mode'] == 'tar' else f" ({result['fallback_reason']})\n"
+                    output += f"文件数: {result['files']}, 数据量: {result['bytes']} 字节\n"
+                    output += f"耗时: {result['elapsed']} 秒\n"
+                    if 'warning' in result:
+                        output += f"警告: {result['warning']}\n"
+                    output += f"消息: {result['message']}\n"
+                elif result['success']:
                     output += f"本地大小: {result['local_size']} 字节\n"
                     output += f"远程大小: {result['remote_size']} 字节\n"
+                    if 'mode' in result:
+                        output += f"传输模式: {result['mode']} (分块: {result['chunks']}, 并发: {result['concurrency']})\n"
+                        if result.get('resumed_from'):
+                            output += f"续传起始偏移: {result['resumed_from']} 字节\n"
+                        if result.get('throughput'):
+                            output += f"耗时: {result['elapsed']} 秒, 吞吐量: {result['throughput'] / 1024 / 1024:.2f} MB/s\n"
                     if 'warning' in result:
                         output += f"警告: {result['warning']}\n"
                     output += f"消息: {result['message']}\n"
@@ -1152,11 +1517,24 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
         elif name == "ssh_download_file":
             params = DownloadFileParams(**arguments)
             try:
-                result = await ssh_manager.download_file(
-                    connection_id=params.connection_id,
-                    remote_path=params.remote_path,
-                    local_path=params.local_path
-                )
+                if params.bulk:
+                    result = await ssh_manager.download_directory(
+                        connection_id=params.connection_id,
+                        remote_path=params.remote_path,
+                        local_path=params.local_path,
+                        compression=params.compression
+                    )
+                else:
+                    result = await ssh_manager.download_file(
+                        connection_id=params.connection_id,
+                        remote_path=params.remote_path,
+                        local_path=params.local_path,
+                        parallel=params.parallel,
+                        chunk_size=params.chunk_size,
+                        concurrency=params.concurrency,
+                        resume=params.resume,
+                        verify_hash=params.verify_hash
+                    )
                 
                 output = f"文件下载操作结果:\n"
                 output += f"连接ID: {params.connection_id}\n"
@@ -1164,9 +1542,23 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
                 output += f"本地路径: {params.local_path}\n"
                 output += f"成功: {result['success']}\n"
                 
-                if result['success']:
+                if result['success'] and params.bulk:
+                    output += f"传输模式: {result['mode']}"
+                    output += f" (压缩: {result['compression']})\n" if result['mode'] == 'tar' else f" ({result['fallback_reason']})\n"
+                    output += f"文件数: {result['files']}, 数据量: {result['bytes']} 字节\n"
+                    output += f"耗时: {result['elapsed']} 秒\n"
+                    if 'warning' in result:
+                        output += f"警告: {result['warning']}\n"
+                    output += f"消息: {result['message']}\n"
+                elif result['success']:
                     output += f"远程大小: {result['remote_size']} 字节\n"
                     output += f"本地大小: {result['local_size']} 字节\n"
+                    if 'mode' in result:
+                        output += f"传输模式: {result['mode']} (分块: {result['chunks']}, 并发: {result['concurrency']})\n"
+                        if result.get('resumed_from'):
+                            output += f"续传起始偏移: {result['resumed_from']} 字节\n"
+                        if result.get('throughput'):
+                            output += f"耗时: {result['elapsed']} 秒, 吞吐量: {result['throughput'] / 1024 / 1024:.2f} MB/s\n"
                     if 'warning' in result:
                         output += f"警告: {result['warning']}\n"
                     output += f"消息: {result['message']}\n"
@@ -1189,34 +1581,226 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
                     isError=True
                 )
         
+        elif name == "ssh_list_transfer_checkpoints":
+            result = ssh_manager.list_transfer_checkpoints()
+            return CallToolResult(
+                content=[TextContent(
+                    type="text",
+                    text=f"未完成的传输检查点:\n{json.dumps(result, indent=2, ensure_ascii=False)}"
+                )]
+            )
+        
+        elif name == "ssh_health_metrics":
+            result = ssh_manager.get_health_metrics()
+            return CallToolResult(
+                content=[TextContent(
+                    type="text",
+                    text=f"连接健康检查指标:\n{json.dumps(result, indent=2, ensure_ascii=False)}"
+                )]
+            )
+        
+        elif name == "ssh_executor_stats":
+            result = ssh_manager.get_executor_stats()
+            return CallToolResult(
+                content=[TextContent(
+                    type="text",
+                    text=f"线程池统计:\n{json.dumps(result, indent=2, ensure_ascii=False)}"
+                )]
+            )
+        
+        elif name == "ssh_transport_stats":
+            params = TransportStatsParams(**arguments)
+            try:
+                result = ssh_manager.get_transport_stats(params.connection_id)
+                return CallToolResult(
+                    content=[TextContent(
+                        type="text",
+                        text=f"传输层统计:\n{json.dumps(result, indent=2, ensure_ascii=False)}"
+                    )]
+                )
+            except Exception as e:
+                return CallToolResult(
+                    content=[TextContent(
+                        type="text",
+                        text=f"获取传输层统计失败: {str(e)}"
+                    )],
+                    isError=True
+                )
+        
+        elif name == "ssh_metadata_cache_stats":
+            params = MetadataCacheStatsParams(**arguments)
+            try:
+                result = ssh_manager.get_metadata_cache_stats(params.connection_id)
+                if params.clear:
+                    result["cleared"] = ssh_manager.clear_metadata_cache(params.connection_id)
+                return CallToolResult(
+                    content=[TextContent(
+                        type="text",
+                        text=f"元数据缓存统计:\n{json.dumps(result, indent=2, ensure_ascii=False)}"
+                    )]
+                )
+            except Exception as e:
+                return CallToolResult(
+                    content=[TextContent(
+                        type="text",
+                        text=f"获取元数据缓存统计失败: {str(e)}"
+                    )],
+                    isError=True
+                )
+        
+        elif name == "ssh_sync_directory":
+            params = SyncDirectoryParams(**arguments)
+            try:
+                result = await ssh_manager.sync_directory(
+                    connection_id=params.connection_id,
+                    local_path=params.local_path,
+                    remote_path=params.remote_path,
+                    direction=params.direction,
+                    include=params.include,
+                    exclude=params.exclude,
+                    checksum=params.checksum,
+                    dry_run=params.dry_run,
+                    concurrency=params.concurrency
+                )
+                
+                output = f"目录同步{'预览' if params.dry_run else '结果'}:\n"
+                output += f"连接ID: {params.connection_id}\n"
+                output += f"本地路径: {params.local_path}\n"
+                output += f"远程路径: {params.remote_path}\n"
+                output += f"方向: {params.direction}\n"
+                output += f"成功: {result['success']}\n"
+                
+                if 'to_transfer' in result:
+                    output += f"源文件数: {result['source_files']}, 目标文件数: {result['destination_files']}\n"
+                    output += f"未变化: {result['unchanged']}, 被过滤: {result['filtered']}\n"
+                    output += f"需要传输: {result['to_transfer']} 个文件, {result['bytes_to_transfer']} 字节\n"
+                    if not params.dry_run:
+                        output += f"已传输: {result['transferred']} 个文件, {result['transferred_bytes']} 字节\n"
+                    output += f"耗时: {result['elapsed']} 秒\n"
+                    for change in result['changes'][:50]:
+                        output += f"  [{change['reason']}] {change['path']} ({change['size']} 字节)\n"
+                    if result['to_transfer'] > 50:
+                        output += f"  ... 另有 {result['to_transfer'] - 50} 个文件\n"
+                    for failure in result['failed']:
+                        output += f"  失败: {failure['path']}: {failure['error']}\n"
+                if 'error' in result:
+                    output += f"错误: {result['error']}\n"
+                
+                return CallToolResult(
+                    content=[TextContent(
+                        type="text",
+                        text=output
+                    )],
+                    isError=not result['success']
+                )
+            except Exception as e:
+                return CallToolResult(
+                    content=[TextContent(
+                        type="text",
+                        text=f"目录同步失败: {str(e)}"
+                    )],
+                    isError=True
+                )
+        
         elif name == "ssh_list_remote_directory":
             params = ListRemoteDirectoryParams(**arguments)
+            paged = (params.recursive or params.cursor is not None or params.page_size is not None
+                     or params.pattern is not None or params.include_totals)
+            if not paged:
+                # 未请求分页、递归或过滤时保持原有的排序列表输出
+                try:
+                    result = await ssh_manager.list_remote_directory(
+                        connection_id=params.connection_id,
+                        remote_path=params.remote_path,
+                        use_cache=not params.bypass_cache
+                    )
+                    
+                    if result['success']:
+                        output = f"远程目录列表:\n"
+                        output += f"连接ID: {params.connection_id}\n"
+                        output += f"路径: {result['path']}\n"
+                        output += f"总项目数: {result['total_count']}\n"
+                        output += f"目录数: {result['directory_count']}\n"
+                        output += f"文件数: {result['file_count']}\n\n"
+                        
+                        if result['directories']:
+                            output += "目录:\n"
+                            for directory in result['directories']:
+                                output += f"  📁 {directory['name']}/ (权限: {directory['permissions']}, 所有者: {directory['owner']})\n"
+                            output += "\n"
+                        
+                        if result['files']:
+                            output += "文件:\n"
+                            for file in result['files']:
+                                size_str = _format_file_size(file['size'])
+                                modified_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(file['modified']))
+                                output += f"  📄 {file['name']} (大小: {size_str}, 权限: {file['permissions']}, 修改时间: {modified_time})\n"
+                        
+                        return CallToolResult(
+                            content=[TextContent(
+                                type="text",
+                                text=output
+                            )]
+                        )
+                    else:
+                        return CallToolResult(
+                            content=[TextContent(
+                                type="text",
+                                text=f"列出远程目录失败: {result['error']}"
+                            )],
+                            isError=True
+                        )
+                except Exception as e:
+                    return CallToolResult(
+                        content=[TextContent(
+                            type="text",
+                            text=f"列出远程目录失败: {str(e)}"
+                        )],
+                        isError=True
+                    )
+            
             try:
-                result = await ssh_manager.list_remote_directory(
+                result = await ssh_manager.list_remote_directory_page(
                     connection_id=params.connection_id,
-                    remote_path=params.remote_path
+                    remote_path=params.remote_path,
+                    recursive=params.recursive,
+                    max_depth=params.max_depth,
+                    pattern=params.pattern,
+                    page_size=params.page_size,
+                    cursor=params.cursor,
+                    include_totals=params.include_totals,
+                    use_cache=not params.bypass_cache
                 )
                 
                 if result['success']:
                     output = f"远程目录列表:\n"
                     output += f"连接ID: {params.connection_id}\n"
                     output += f"路径: {result['path']}\n"
-                    output += f"总项目数: {result['total_count']}\n"
-                    output += f"目录数: {result['directory_count']}\n"
-                    output += f"文件数: {result['file_count']}\n\n"
+                    if result['recursive']:
+                        depth = result['max_depth'] if result['max_depth'] is not None else "不限"
+                        output += f"递归: 是 (最大深度: {depth})\n"
+                    if result['pattern']:
+                        output += f"过滤: {result['pattern']}\n"
+                    output += f"本页项目数: {result['count']} (累计: {result['returned']})\n"
+                    if result.get('cached'):
+                        output += "来源: 元数据缓存\n"
+                    if 'totals' in result:
+                        totals = result['totals']
+                        output += f"总项目数: {totals['entries']} (目录: {totals['directories']}, 文件: {totals['files']}, 总大小: {_format_file_size(totals['bytes'])})\n"
+                    output += "\n"
                     
-                    if result['directories']:
-                        output += "目录:\n"
-                        for directory in result['directories']:
-                            output += f"  📁 {directory['name']}/ (权限: {directory['permissions']}, 所有者: {directory['owner']})\n"
-                        output += "\n"
+                    for entry in result['entries']:
+                        if entry['is_directory']:
+                            output += f"  📁 {entry['path']}/ (权限: {entry['permissions']}, 所有者: {entry['owner']})\n"
+                        else:
+                            size_str = _format_file_size(entry['size'] or 0)
+                            modified_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['modified'] or 0))
+                            output += f"  📄 {entry['path']} (大小: {size_str}, 权限: {entry['permissions']}, 修改时间: {modified_time})\n"
                     
-                    if result['files']:
-                        output += "文件:\n"
-                        for file in result['files']:
-                            size_str = _format_file_size(file['size'])
-                            modified_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(file['modified']))
-                            output += f"  📄 {file['name']} (大小: {size_str}, 权限: {file['permissions']}, 修改时间: {modified_time})\n"
+                    if result['has_more']:
+                        output += f"\n还有更多条目，下一页游标: {result['next_cursor']}\n"
+                    else:
+                        output += "\n已列出全部条目\n"
                     
                     return CallToolResult(
                         content=[TextContent(
@@ -1283,7 +1867,9 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
             try:
                 result = await ssh_manager.remove_remote_file(
                     connection_id=params.connection_id,
-                    remote_path=params.remote_path
+                    remote_path=params.remote_path,
+                    fast=params.fast,
+                    concurrency=params.concurrency
                 )
                 
                 output = f"删除远程文件/目录结果:\n"
@@ -1293,6 +1879,8 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
                 
                 if result['success']:
                     output += f"类型: {result['type']}\n"
+                    if 'deleted_count' in result:
+                        output += f"删除条目数: {result['deleted_count']} (方式: {result['method']}, 耗时: {result['elapsed']} 秒)\n"
                     output += f"消息: {result['message']}\n"
                 else:
                     output += f"错误: {result['error']}\n"
@@ -1318,7 +1906,8 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
             try:
                 result = await ssh_manager.get_remote_file_info(
                     connection_id=params.connection_id,
-                    remote_path=params.remote_path
+                    remote_path=params.remote_path,
+                    use_cache=not params.bypass_cache
                 )
                 
                 if result['success']:
@@ -1332,6 +1921,8 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResu
                     output += f"组: {result['group']}\n"
                     output += f"修改时间: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(result['modified']))}\n"
                     output += f"访问时间: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(result['accessed']))}\n"
+                    if result.get('cached'):
+                        output += "来源: 元数据缓存\n"
                     
                     return CallToolResult(
                         content=[TextContent(
@@ -1467,6 +2058,13 @@ async def main():
         # 启动keep-alive
         await ssh_manager.start_keepalive()
         
+        # 后台自动连接，不阻塞第一次工具调用
+        if config and config.auto_connect and config.auto_connect_on_startup:
+            host_configs, errors = _resolve_auto_connect_hosts()
+            for error in errors:
+                logger.warning(f"自动连接: {error}")
+            ssh_manager.start_auto_connect(host_configs)
+        
         # 使用stdio服务器
         async with stdio_server() as (read_stream, write_stream):
             await server.run(
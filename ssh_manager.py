@@ -7,8 +7,33 @@ from typing import Dict, Optional, Tuple, List
 from enum import Enum
 import logging
 from dataclasses import dataclass, field
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 import threading
 import queue
+import bisect
+import re
+import codecs
+import mmap
+import json
+import hashlib
+import shlex
+import fnmatch
+import tarfile
+import posixpath
+import itertools
+import random
+import io
+import base64
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from config_loader import SSHAgentConfig, SSHConnectionConfig
+
+try:
+    import zstandard
+except ImportError:  # 可选依赖，缺失时tar流传输不提供zstd压缩
+    zstandard = None
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +50,15 @@ ERROR_MESSAGES = {
     "invalid_parameter": "参数无效"
 }
 
+# rm -rf快速删除拒绝处理的远程路径（根目录和所有顶层目录另行拒绝）
+PROTECTED_REMOTE_PATHS = {
+    "/usr/bin", "/usr/lib", "/usr/lib64", "/usr/local", "/usr/sbin", "/usr/share",
+    "/var/lib", "/var/log", "/var/spool", "/etc/ssh"
+}
+
+# 同时保留的目录列表游标上限，超出时关闭最久未使用的游标
+MAX_LISTING_CURSORS = 32
+
 class ConnectionStatus(Enum):
     DISCONNECTED = "disconnected"
     CONNECTING = "connecting"
@@ -44,6 +78,200 @@ class InteractiveStatus(Enum):
     FAILED = "failed"
     TERMINATED = "terminated"
 
+class OutputRingBuffer:
+    """按字节数限制大小的输出环形缓冲区
+    
+    只保留最近 max_bytes 字节的输出，超出部分从头部整块丢弃（deque.popleft为O(1)）。
+    同时统计累计产生的字节数和被丢弃的字节数；设置 spill_path 后所有输出还会
+    追加写入该文件，完整日志仍可从磁盘取回。
+    """
+    
+    def __init__(self, max_bytes: int = 1024 * 1024, spill_path: Optional[str] = None):
+        self.max_bytes = max(1, max_bytes)
+        self.spill_path = spill_path
+        self._chunks: deque = deque()
+        self._size = 0
+        self.total_bytes = 0
+        self.dropped_bytes = 0
+        self._spill_file = None
+        if spill_path:
+            try:
+                self._spill_file = open(spill_path, 'ab')
+            except OSError as e:
+                logger.warning(f"无法打开输出落盘文件 {spill_path}: {e}")
+                self.spill_path = None
+    
+    def __len__(self) -> int:
+        """缓冲区中保留的字节数"""
+        return self._size
+    
+    def append(self, data: bytes):
+        """追加输出，超出上限时丢弃最旧的数据"""
+        if not data:
+            return
+        self.total_bytes += len(data)
+        if self._spill_file:
+            try:
+                self._spill_file.write(data)
+            except OSError as e:
+                # 落盘文件缺少本次及之后的数据，不能再作为完整历史读取
+                logger.warning(f"写入输出落盘文件失败 {self.spill_path}: {e}")
+                self._remove_spill()
+        
+        self._chunks.append(data)
+        self._size += len(data)
+        self._trim()
+    
+    def _trim(self):
+        """丢弃超出上限的旧数据"""
+        while self._size > self.max_bytes:
+            excess = self._size - self.max_bytes
+            head = self._chunks[0]
+            if len(head) <= excess:
+                self._chunks.popleft()
+                self._size -= len(head)
+                self.dropped_bytes += len(head)
+                continue
+            # 部分截断首块，并跳过被截断的UTF-8多字节字符的后续字节
+            cut = excess
+            while cut < len(head) and (head[cut] & 0xC0) == 0x80:
+                cut += 1
+            self._chunks[0] = head[cut:]
+            self._size -= cut
+            self.dropped_bytes += cut
+            if not self._chunks[0]:
+                self._chunks.popleft()
+    
+    def getvalue(self) -> bytes:
+        """返回缓冲区中保留的全部字节"""
+        if len(self._chunks) > 1:
+            # 合并为单块，后续读取无需重复拼接
+            merged = b"".join(self._chunks)
+            self._chunks.clear()
+            self._chunks.append(merged)
+        return self._chunks[0] if self._chunks else b""
+    
+    def text(self) -> str:
+        """以UTF-8解码缓冲区内容"""
+        return self.getvalue().decode('utf-8', errors='replace')
+    
+    def _slice_retained(self, start: int, end: int) -> bytes:
+        """读取内存中保留数据的 [start, end) 绝对偏移区间"""
+        rel_start = start - self.dropped_bytes
+        rel_end = end - self.dropped_bytes
+        parts = []
+        pos = 0
+        for chunk in self._chunks:
+            chunk_end = pos + len(chunk)
+            if chunk_end > rel_start and pos < rel_end:
+                parts.append(chunk[max(0, rel_start - pos):rel_end - pos])
+            if chunk_end >= rel_end:
+                break
+            pos = chunk_end
+        return b"".join(parts)
+    
+    def _slice(self, start: int, end: int) -> bytes:
+        """读取 [start, end) 绝对偏移区间，已丢弃部分从落盘文件读取"""
+        if start >= end:
+            return b""
+        if start >= self.dropped_bytes:
+            return self._slice_retained(start, end)
+        
+        # 请求范围包含已丢弃的数据，只能从落盘文件读取
+        if self._spill_file:
+            self._spill_file.flush()
+        with open(self.spill_path, 'rb') as f:
+            f.seek(start)
+            return f.read(end - start)
+    
+    def read(self, offset: Optional[int] = None, max_bytes: Optional[int] = None,
+             tail_bytes: Optional[int] = None) -> Dict:
+        """按字节序号增量读取输出
+        
+        Args:
+            offset: 起始字节序号（从命令开始累计），为空时从最早可读位置开始
+            max_bytes: 最多返回的字节数（head模式）
+            tail_bytes: 只返回最后N字节（tail模式）
+            
+        Returns:
+            包含 data、offset（实际起始序号）、next_offset、skipped_bytes 的字典
+        """
+        # 有落盘文件时全部历史都可读，否则只能读取仍保留在内存中的部分
+        earliest = 0 if self.spill_path else self.dropped_bytes
+        end = self.total_bytes
+        start = earliest if offset is None else max(offset, 0)
+        if tail_bytes is not None:
+            start = max(start, end - max(tail_bytes, 0))
+        skipped = max(0, earliest - start)
+        start = min(max(start, earliest), end)
+        if max_bytes is not None:
+            end = min(end, start + max(max_bytes, 0))
+        
+        data = self._slice(start, end)
+        
+        # 起点落在多字节字符中间时向后对齐
+        lead = 0
+        while lead < len(data) and lead < 3 and (data[lead] & 0xC0) == 0x80:
+            lead += 1
+        data = data[lead:]
+        start += lead
+        
+        # 终点切开了多字节字符时，把不完整的字符留给下一次读取
+        if end < self.total_bytes and data and (self._slice(end, end + 1)[:1] or b"\x00")[0] & 0xC0 == 0x80:
+            cut = len(data) - 1
+            while cut > 0 and (data[cut] & 0xC0) == 0x80:
+                cut -= 1
+            if cut > 0:
+                data = data[:cut]
+            else:
+                # 窗口小于一个字符时补全该字符，保证游标总能前进
+                first = data[0]
+                char_len = 4 if first >= 0xF0 else 3 if first >= 0xE0 else 2
+                data = self._slice(start, min(self.total_bytes, start + char_len))
+        
+        return {
+            "data": data,
+            "offset": start,
+            "next_offset": start + len(data),
+            "skipped_bytes": skipped,
+            "total_bytes": self.total_bytes
+        }
+    
+    def _close_spill(self):
+        if self._spill_file:
+            try:
+                self._spill_file.close()
+            except OSError:
+                pass
+            self._spill_file = None
+    
+    def _remove_spill(self):
+        """关闭并删除落盘文件，之后只能读取内存中保留的部分"""
+        self._close_spill()
+        if self.spill_path:
+            try:
+                os.remove(self.spill_path)
+            except OSError:
+                pass
+            self.spill_path = None
+    
+    def close(self, remove_spill: bool = False):
+        """关闭落盘文件（缓冲区内容仍可读取），remove_spill为True时同时删除落盘文件"""
+        if remove_spill:
+            self._remove_spill()
+        else:
+            self._close_spill()
+    
+    def stats(self) -> Dict:
+        """缓冲区统计信息"""
+        return {
+            "retained_bytes": self._size,
+            "total_bytes": self.total_bytes,
+            "dropped_bytes": self.dropped_bytes,
+            "max_bytes": self.max_bytes,
+            "spill_path": self.spill_path
+        }
+
 @dataclass
 class AsyncCommand:
     command_id: str
@@ -53,11 +281,106 @@ class AsyncCommand:
     start_time: float
     end_time: Optional[float] = None
     exit_code: Optional[int] = None
-    stdout_buffer: List[str] = field(default_factory=list)
-    stderr_buffer: List[str] = field(default_factory=list)
+    stdout_buffer: OutputRingBuffer = field(default_factory=OutputRingBuffer)
+    stderr_buffer: OutputRingBuffer = field(default_factory=OutputRingBuffer)
     process: Optional[paramiko.Channel] = None
-    stdout_size: int = 0
-    stderr_size: int = 0
+    
+    @property
+    def stdout_size(self) -> int:
+        """累计产生的stdout字节数"""
+        return self.stdout_buffer.total_bytes
+    
+    @property
+    def stderr_size(self) -> int:
+        """累计产生的stderr字节数"""
+        return self.stderr_buffer.total_bytes
+    
+    def close_buffers(self, remove_spill: bool = False):
+        """命令结束后关闭输出落盘文件，命令被清理时remove_spill为True，同时删除落盘文件"""
+        self.stdout_buffer.close(remove_spill)
+        self.stderr_buffer.close(remove_spill)
+
+class OutputChunkLog:
+    """带序号和时间戳的交互式输出日志
+    
+    每个输出块记录其起始字符序号（从会话开始累计，单调递增）和到达时间，
+    读取时通过二分查找定位游标或时间点。旧数据超出上限后按块丢弃，
+    丢弃只移动头指针，列表在头部空洞过大时才整体压缩。
+    """
+    
+    def __init__(self, max_chars: int = 100000):
+        self.max_chars = max_chars
+        self._starts: List[int] = []
+        self._times: List[float] = []
+        self._chunks: List[str] = []
+        self._head = 0
+        self.total_chars = 0  # 累计产生的字符数，即下一块的起始序号
+        self.retained_chars = 0
+    
+    def __len__(self) -> int:
+        return len(self._chunks) - self._head
+    
+    @property
+    def first_offset(self) -> int:
+        """仍保留的最早字符序号"""
+        return self._starts[self._head] if len(self) else self.total_chars
+    
+    def append(self, data: str, timestamp: Optional[float] = None):
+        """追加输出块"""
+        if not data:
+            return
+        self._starts.append(self.total_chars)
+        self._times.append(timestamp if timestamp is not None else time.time())
+        self._chunks.append(data)
+        self.total_chars += len(data)
+        self.retained_chars += len(data)
+        
+        # 超出上限时丢弃旧输出，保留最近一半
+        if self.retained_chars > self.max_chars:
+            target_size = self.max_chars // 2
+            while len(self) > 1 and self.retained_chars > target_size:
+                self.retained_chars -= len(self._chunks[self._head])
+                self._chunks[self._head] = ""
+                self._head += 1
+            if self._head > len(self._chunks) // 2:
+                del self._starts[:self._head]
+                del self._times[:self._head]
+                del self._chunks[:self._head]
+                self._head = 0
+    
+    def read(self, offset: Optional[int] = None, since_time: Optional[float] = None) -> Dict:
+        """读取游标或时间点之后的输出
+        
+        Args:
+            offset: 起始字符序号，返回该位置之后的全部输出
+            since_time: 只返回在该时间戳之后到达的输出块
+            
+        Returns:
+            包含 text、offset（实际起始序号）、next_offset、skipped 的字典
+        """
+        start = self.first_offset
+        if since_time is not None:
+            index = bisect.bisect_right(self._times, since_time, lo=self._head)
+            start = self._starts[index] if index < len(self._chunks) else self.total_chars
+        if offset is not None:
+            start = max(start, min(offset, self.total_chars))
+        
+        skipped = 0
+        if offset is not None and offset < self.first_offset:
+            skipped = self.first_offset - offset
+        
+        if start >= self.total_chars:
+            return {"text": "", "offset": self.total_chars, "next_offset": self.total_chars, "skipped": skipped}
+        
+        index = bisect.bisect_right(self._starts, start, lo=self._head) - 1
+        parts = [self._chunks[index][start - self._starts[index]:]]
+        parts.extend(self._chunks[index + 1:])
+        return {
+            "text": "".join(parts),
+            "offset": start,
+            "next_offset": self.total_chars,
+            "skipped": skipped
+        }
 
 @dataclass
 class InteractiveSession:
@@ -68,44 +391,976 @@ class InteractiveSession:
     start_time: float
     end_time: Optional[float] = None
     channel: Optional[paramiko.Channel] = None
-    output_buffer: List[str] = field(default_factory=list)
-    output_size: int = 0
+    output_log: OutputChunkLog = field(default_factory=OutputChunkLog)
     last_output_time: float = field(default_factory=time.time)
     pty_width: int = 80
     pty_height: int = 24
+    # 有新输出或状态变化时通知等待者（ssh_wait_interactive_output）
+    output_condition: asyncio.Condition = field(default_factory=asyncio.Condition, repr=False)
+    # 增量UTF-8解码器，跨两次读取的多字节字符不会被替换成乱码
+    decoder: codecs.IncrementalDecoder = field(
+        default_factory=lambda: codecs.getincrementaldecoder('utf-8')(errors='replace'), repr=False
+    )
+    
+    @property
+    def output_size(self) -> int:
+        """缓冲区中保留的输出字符数"""
+        return self.output_log.retained_chars
     
     def add_output(self, data: str):
-        """添加输出数据到缓冲区"""
-        self.output_buffer.append(data)
-        self.output_size += len(data)
+        """添加输出数据到缓冲区（超过100K字符时丢弃旧输出，保留最近一半）"""
         self.last_output_time = time.time()
+        self.output_log.append(data, self.last_output_time)
+
+class InstrumentedExecutor(ThreadPoolExecutor):
+    """带排队和饱和统计的有界线程池"""
+
+    def __init__(self, name: str, max_workers: int):
+        super().__init__(max_workers=max(1, max_workers), thread_name_prefix=f"ssh-{name}")
+        self.name = name
+        self._stats_lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.active = 0
+        self.queued = 0
+        self.peak_queued = 0
+        self.saturated = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def submit(self, fn, /, *args, **kwargs):
+        enqueued = time.monotonic()
+        with self._stats_lock:
+            self.submitted += 1
+            # 提交时所有工作线程都在忙，任务需要排队等待
+            if self.active + self.queued >= self._max_workers:
+                self.saturated += 1
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+
+        def run():
+            waited = time.monotonic() - enqueued
+            with self._stats_lock:
+                self.queued -= 1
+                self.active += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._stats_lock:
+                    self.active -= 1
+                    self.completed += 1
+
+        return super().submit(run)
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            started = self.completed + self.active
+            return {
+                "workers": self._max_workers,
+                "active": self.active,
+                "queued": self.queued,
+                "peak_queued": self.peak_queued,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "saturated": self.saturated,
+                "utilization": round(self.active / self._max_workers, 3),
+                "avg_wait_ms": round(self.total_wait / started * 1000, 3) if started else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3)
+            }
+
+
+class WorkloadExecutors:
+    """按工作负载分类的阻塞调用线程池
+
+    connect: SSH握手、打开SFTP会话和channel
+    command: 命令执行与输出读取，以及stat/mkdir/rename等短小的交互式SFTP操作
+    transfer: 文件上传下载、目录同步、tar流和批量删除等长时间占用线程的操作
+    housekeeping: 健康检查、keep-alive和会话关闭
+    各类互不共享线程，长时间的传输不会挤占握手和健康检查。
+    """
+
+    KINDS = ("connect", "command", "transfer", "housekeeping")
+    _shared: Optional["WorkloadExecutors"] = None
+
+    def __init__(self, config: Optional[SSHAgentConfig] = None):
+        config = config or SSHAgentConfig()
+        self.connect = InstrumentedExecutor("connect", config.connect_workers)
+        self.command = InstrumentedExecutor("command", config.command_workers)
+        self.transfer = InstrumentedExecutor("transfer", config.transfer_workers)
+        self.housekeeping = InstrumentedExecutor("housekeeping", config.housekeeping_workers)
+
+    @classmethod
+    def shared(cls) -> "WorkloadExecutors":
+        """未由SSHManager创建的连接使用的默认线程池"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def stats(self) -> Dict:
+        return {kind: getattr(self, kind).stats() for kind in self.KINDS}
+
+    def shutdown(self, wait: bool = False):
+        for kind in self.KINDS:
+            getattr(self, kind).shutdown(wait=wait, cancel_futures=True)
+
+
+class PrivateKeyLoader:
+    """私钥加载器：自动识别RSA/Ed25519/ECDSA类型，并在进程内缓存已解密的PKey
+
+    缓存按文件路径、修改时间、大小和口令摘要区分，私钥文件被替换后自动重新加载；
+    所有连接共享同一个加载器，同一私钥只解密一次（bcrypt保护的OpenSSH私钥解密开销很大）。
+    """
+
+    # OpenSSH格式私钥的公钥段中未加密的类型名
+    OPENSSH_KEY_CLASSES = {
+        "ssh-rsa": paramiko.RSAKey,
+        "ssh-ed25519": paramiko.Ed25519Key,
+        "ecdsa-sha2-nistp256": paramiko.ECDSAKey,
+        "ecdsa-sha2-nistp384": paramiko.ECDSAKey,
+        "ecdsa-sha2-nistp521": paramiko.ECDSAKey
+    }
+    # 传统PEM格式的头部标签
+    PEM_KEY_CLASSES = {
+        "RSA": paramiko.RSAKey,
+        "EC": paramiko.ECDSAKey
+    }
+    _shared: Optional["PrivateKeyLoader"] = None
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        # 同一私钥的并发加载只解密一次：路径 -> [锁, 等待中的加载数]，无人等待时移除
+        self._path_locks: Dict[str, list] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def shared(cls) -> "PrivateKeyLoader":
+        """所有连接共享的默认加载器"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def detect_key_class(cls, text: str):
+        """不解密私钥，从文件头识别密钥类型；无法识别时返回None"""
+        match = re.search(r"-----BEGIN ([A-Z ]+) PRIVATE KEY-----", text)
+        if not match:
+            return None
+        label = match.group(1)
+        if label in cls.PEM_KEY_CLASSES:
+            return cls.PEM_KEY_CLASSES[label]
+        if label != "OPENSSH":
+            return None
+        try:
+            body = text[match.end():text.index("-----END")]
+            message = paramiko.Message(base64.b64decode("".join(body.split())))
+            if message.get_bytes(15) != b"openssh-key-v1\0":
+                return None
+            message.get_string()  # 加密算法
+            message.get_string()  # KDF名称
+            message.get_string()  # KDF参数
+            message.get_int()  # 私钥数量
+            public_key = paramiko.Message(message.get_binary())
+            return cls.OPENSSH_KEY_CLASSES.get(public_key.get_text())
+        except Exception:
+            return None
+
+    @classmethod
+    def parse(cls, text: str, password: Optional[str] = None) -> paramiko.PKey:
+        """解析私钥文本，按识别出的类型只解密一次"""
+        key_class = cls.detect_key_class(text)
+        if key_class is not None:
+            return key_class.from_private_key(io.StringIO(text), password=password)
+        # PKCS8等无法从文件头识别类型的格式，先由cryptography解密再包装为对应的PKey
+        try:
+            loaded = serialization.load_pem_private_key(
+                text.encode(), password.encode() if password else None
+            )
+        except TypeError as e:
+            raise paramiko.PasswordRequiredException(str(e))
+        except ValueError as e:
+            raise paramiko.SSHException(f"无法解析私钥: {e}")
+        if isinstance(loaded, rsa.RSAPrivateKey):
+            return paramiko.RSAKey(key=loaded)
+        if isinstance(loaded, ec.EllipticCurvePrivateKey):
+            return paramiko.ECDSAKey(vals=(loaded, loaded.public_key()))
+        if isinstance(loaded, ed25519.Ed25519PrivateKey):
+            # Ed25519Key不能直接由cryptography对象构造，转为未加密的OpenSSH格式后在内存中解析
+            openssh = loaded.private_bytes(
+                serialization.Encoding.PEM, serialization.PrivateFormat.OpenSSH, serialization.NoEncryption()
+            )
+            return paramiko.Ed25519Key.from_private_key(io.StringIO(openssh.decode()))
+        raise paramiko.SSHException(f"不支持的私钥类型: {type(loaded).__name__}")
+
+    def load(self, path: str, password: Optional[str] = None) -> paramiko.PKey:
+        """从文件加载私钥，命中缓存时不再读取和解密"""
+        path = os.path.abspath(os.path.expanduser(path))
+        stat = os.stat(path)
+        cache_key = (
+            path, stat.st_mtime_ns, stat.st_size,
+            hashlib.sha256(password.encode()).hexdigest() if password else None
+        )
+        with self._lock:
+            pkey = self._entries.get(cache_key)
+            if pkey is not None:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return pkey
+            path_lock = self._path_locks.setdefault(path, [threading.Lock(), 0])
+            path_lock[1] += 1
         
-        # 限制缓冲区大小，保留最近的输出
-        max_buffer_size = 100000  # 100KB
-        if self.output_size > max_buffer_size:
-            # 移除旧的输出，保留最近的50KB
-            target_size = max_buffer_size // 2
-            removed_size = 0
-            while self.output_buffer and removed_size < (self.output_size - target_size):
-                removed_data = self.output_buffer.pop(0)
-                removed_size += len(removed_data)
-            self.output_size -= removed_size
+        try:
+            with path_lock[0]:
+                with self._lock:
+                    pkey = self._entries.get(cache_key)
+                    if pkey is not None:
+                        self.hits += 1
+                        return pkey
+                with open(path, "r") as f:
+                    pkey = self.parse(f.read(), password)
+                with self._lock:
+                    self.misses += 1
+                    # 私钥文件已更新，旧版本的缓存不再需要
+                    for stale in [key for key in self._entries if key[0] == path]:
+                        del self._entries[stale]
+                    self._entries[cache_key] = pkey
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                logger.debug(f"已加载{pkey.get_name()}私钥: {path}")
+                return pkey
+        finally:
+            with self._lock:
+                path_lock[1] -= 1
+                if path_lock[1] == 0:
+                    del self._path_locks[path]
+
+    def load_any(self, private_key, password: Optional[str] = None) -> paramiko.PKey:
+        """private_key为路径时走缓存加载，为文件对象时直接解析"""
+        if isinstance(private_key, str):
+            return self.load(private_key, password)
+        return self.parse(private_key.read(), password)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class TransportLane:
+    """调度器中的一条SSH传输层；主传输层的client为None，使用连接当前的client
+
+    pooled为True的传输层在连接建立时按transports_per_connection常驻打开，
+    其余额外传输层只在channel占满时按需打开
+    """
+
+    def __init__(self, index: int, client=None, pooled: bool = False):
+        self.index = index
+        self.client = client
+        self.pooled = pooled
+        self.active = 0
+        self.peak_active = 0
+        self.channels_opened = 0
+        self.closed = False
+        self.opened_at = time.monotonic()
+        self.busy_time = 0.0
+        self._busy_since: Optional[float] = None
+
+    def enter(self):
+        if self.active == 0:
+            self._busy_since = time.monotonic()
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+
+    def leave(self):
+        self.active -= 1
+        if self.active == 0 and self._busy_since is not None:
+            self.busy_time += time.monotonic() - self._busy_since
+            self._busy_since = None
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        busy = self.busy_time + (now - self._busy_since if self._busy_since is not None else 0.0)
+        lifetime = now - self.opened_at
+        return {
+            "index": self.index,
+            "primary": self.client is None,
+            "pooled": self.pooled,
+            "active": self.active,
+            "peak_active": self.peak_active,
+            "channels_opened": self.channels_opened,
+            # 至少有一个channel在执行的时间占传输层存活时间的比例
+            "utilization": round(busy / lifetime, 3) if lifetime > 0 else 0.0
+        }
+
+
+class ChannelScheduler:
+    """单个连接上exec channel的调度器
+
+    每条传输层最多同时打开 max_channels 个channel，超出的请求按到达顺序排队；
+    释放的名额直接交给队首的等待者，后来的请求不会插队。
+    所有传输层都占满时，可按需向同一主机额外打开最多 max_extra_transports 条传输层。
+    """
+
+    def __init__(self, max_channels: int = 6, max_extra_transports: int = 0):
+        self.max_channels = max(1, max_channels)
+        self.max_extra_transports = max(0, max_extra_transports)
+        self.lanes: List[TransportLane] = [TransportLane(0)]
+        self._waiters: deque = deque()
+        self._opening = False
+        self.acquired = 0
+        self.queued_count = 0
+        self.peak_queued = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _free_lane(self) -> Optional[TransportLane]:
+        """负载最低且仍有空闲名额的传输层"""
+        candidates = [lane for lane in self.lanes if not lane.closed and lane.active < self.max_channels]
+        return min(candidates, key=lambda lane: lane.active) if candidates else None
+
+    def _dispatch(self):
+        """把空闲名额按FIFO顺序交给等待者"""
+        while self._waiters:
+            lane = self._free_lane()
+            if lane is None:
+                return
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            lane.enter()
+            waiter.set_result(lane)
+
+    async def acquire(self, open_transport: Optional[callable] = None) -> Tuple[TransportLane, float]:
+        """获取一个channel名额，返回(传输层, 排队等待秒数)
+
+        open_transport为打开新传输层的协程函数，返回paramiko.SSHClient；为None时不扩展传输层
+        """
+        started = time.monotonic()
+        lane = None if self._waiters else self._free_lane()
+        if lane is not None:
+            lane.enter()
+        else:
+            if (open_transport is not None and not self._opening
+                    and self._overflow_count() < self.max_extra_transports):
+                self._opening = True
+                asyncio.get_event_loop().create_task(self._open_lane(open_transport))
+            waiter = asyncio.get_event_loop().create_future()
+            self._waiters.append(waiter)
+            self.queued_count += 1
+            self.peak_queued = max(self.peak_queued, len(self._waiters))
+            try:
+                lane = await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # 名额已交到手上但调用方被取消，归还名额
+                    self.release(waiter.result())
+                else:
+                    try:
+                        self._waiters.remove(waiter)
+                    except ValueError:
+                        pass
+                raise
+        waited = time.monotonic() - started
+        self.acquired += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        lane.channels_opened += 1
+        return lane, waited
+
+    def _overflow_count(self) -> int:
+        return sum(1 for lane in self.lanes if lane.client is not None and not lane.pooled)
+
+    def add_lane(self, client, pooled: bool = False) -> TransportLane:
+        """加入一条已打开的传输层，并把名额分给等待者"""
+        lane = TransportLane(max(lane.index for lane in self.lanes) + 1, client, pooled)
+        self.lanes.append(lane)
+        self._dispatch()
+        return lane
+
+    async def _open_lane(self, open_transport: callable):
+        try:
+            client = await open_transport()
+            lane = self.add_lane(client)
+            logger.info(f"channel已满，额外打开传输层 #{lane.index}")
+        except Exception as e:
+            logger.warning(f"额外打开传输层失败: {e}")
+        finally:
+            self._opening = False
+        self._dispatch()
+
+    def release(self, lane: TransportLane):
+        """归还名额；有等待者时直接交给队首"""
+        lane.leave()
+        self._dispatch()
+
+    def discard(self, lane: TransportLane) -> Optional[object]:
+        """移除已断开的额外传输层，返回需要关闭的client"""
+        if lane.client is None or lane.closed:
+            return None
+        lane.closed = True
+        self.lanes.remove(lane)
+        return lane.client
+
+    def take_extra_clients(self) -> List:
+        """断开连接时取出所有额外传输层的client"""
+        clients = [lane.client for lane in self.lanes if lane.client is not None]
+        for lane in self.lanes[1:]:
+            lane.closed = True
+        self.lanes = self.lanes[:1]
+        return clients
+
+    def stats(self) -> Dict:
+        return {
+            "max_channels": self.max_channels,
+            "active": sum(lane.active for lane in self.lanes),
+            "queued": len(self._waiters),
+            "peak_queued": self.peak_queued,
+            "acquired": self.acquired,
+            "queued_total": self.queued_count,
+            "avg_wait_ms": round(self.total_wait / self.acquired * 1000, 3) if self.acquired else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "pooled_transports": sum(1 for lane in self.lanes if lane.pooled),
+            "extra_transports": self._overflow_count(),
+            "transports": [lane.stats() for lane in self.lanes]
+        }
+
+
+class SFTPSessionPool:
+    """单个SSH连接上的SFTP会话池
+
+    复用已打开的SFTP会话，避免每次操作都重新打开channel并协商SFTP版本。
+    会话在空闲超过 idle_timeout 秒后被回收，借出时发现已损坏会自动重新打开。
+    """
+
+    def __init__(self, connection: "SSHConnection", max_size: int = 4,
+                 idle_timeout: float = 300):
+        self.connection = connection
+        self.max_size = max(1, max_size)
+        self.idle_timeout = idle_timeout
+        self._idle: deque = deque()  # (sftp_client, last_used)
+        self._in_use = 0
+        self._condition = asyncio.Condition()
+        self.opened_count = 0
+        self.reused_count = 0
+        self.evicted_count = 0
+
+    @staticmethod
+    def _is_usable(sftp_client) -> bool:
+        """检查SFTP会话底层channel是否仍然可用"""
+        try:
+            channel = sftp_client.get_channel()
+            if channel is None or channel.closed:
+                return False
+            transport = channel.get_transport()
+            return transport is not None and transport.is_active()
+        except Exception:
+            return False
+
+    def _pop_expired(self) -> List:
+        """取出所有空闲超时的会话（调用方需持有锁）"""
+        now = time.monotonic()
+        expired = []
+        # 最旧的会话在左侧
+        while self._idle and now - self._idle[0][1] > self.idle_timeout:
+            expired.append(self._idle.popleft()[0])
+        self.evicted_count += len(expired)
+        return expired
+
+    async def _close_sessions(self, sessions: List):
+        """在线程池中关闭会话，忽略关闭时的错误"""
+        if not sessions:
+            return
+        loop = asyncio.get_event_loop()
+        for sftp_client in sessions:
+            try:
+                await loop.run_in_executor(self.connection.executors.housekeeping, sftp_client.close)
+            except Exception as e:
+                logger.debug(f"关闭SFTP会话时出错: {e}")
+
+    async def acquire(self):
+        """借出一个SFTP会话，池满时等待其他会话归还"""
+        async with self._condition:
+            while True:
+                expired = self._pop_expired()
+                if self._idle:
+                    sftp_client = self._idle.pop()[0]
+                    break
+                if self._in_use < self.max_size:
+                    sftp_client = None
+                    break
+                await self._condition.wait()
+            self._in_use += 1
+
+        await self._close_sessions(expired)
+
+        if sftp_client is not None:
+            if self._is_usable(sftp_client):
+                self.reused_count += 1
+                return sftp_client
+            # 会话已损坏，关闭后重新打开
+            logger.debug(f"SFTP会话已失效，重新打开: {self.connection.username}@{self.connection.host}")
+            await self._close_sessions([sftp_client])
+
+        try:
+            if not self.connection.client:
+                raise Exception("SSH连接未建立")
+            loop = asyncio.get_event_loop()
+            sftp_client = await loop.run_in_executor(self.connection.executors.connect, self.connection.client.open_sftp)
+            self.opened_count += 1
+            return sftp_client
+        except BaseException:
+            async with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+
+    async def discard(self, sftp_client):
+        """关闭借出的会话而不放回池中，释放其名额（会话上仍有未完成的请求时使用）"""
+        async with self._condition:
+            self._in_use -= 1
+            self._condition.notify()
+        await self._close_sessions([sftp_client])
+
+    async def release(self, sftp_client):
+        """归还会话，已损坏的会话直接关闭"""
+        usable = self._is_usable(sftp_client)
+        if usable:
+            self.connection.mark_activity()
+        async with self._condition:
+            self._in_use -= 1
+            if usable:
+                self._idle.append((sftp_client, time.monotonic()))
+            self._condition.notify()
+        if not usable:
+            await self._close_sessions([sftp_client])
+
+    @asynccontextmanager
+    async def session(self):
+        """以上下文管理器方式借用会话"""
+        sftp_client = await self.acquire()
+        try:
+            yield sftp_client
+        finally:
+            await self.release(sftp_client)
+
+    async def evict_idle(self) -> int:
+        """回收空闲超时的会话，返回回收数量"""
+        async with self._condition:
+            expired = self._pop_expired()
+        await self._close_sessions(expired)
+        return len(expired)
+
+    async def close(self):
+        """关闭池中所有空闲会话"""
+        async with self._condition:
+            sessions = [entry[0] for entry in self._idle]
+            self._idle.clear()
+        await self._close_sessions(sessions)
+
+    def stats(self) -> Dict:
+        """会话池统计信息"""
+        return {
+            "max_size": self.max_size,
+            "idle": len(self._idle),
+            "in_use": self._in_use,
+            "opened": self.opened_count,
+            "reused": self.reused_count,
+            "evicted": self.evicted_count
+        }
+
+class ChannelWriter:
+    """把exec channel的stdin包装为只写文件对象，供tarfile流式写入"""
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.bytes_written = 0
+
+    def write(self, data) -> int:
+        self.channel.sendall(data)
+        self.bytes_written += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+class ChannelReader:
+    """把exec channel的stdout包装为只读文件对象，供tarfile流式读取"""
+
+    def __init__(self, channel, read_size: int = 65536):
+        self.channel = channel
+        self.read_size = read_size
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.channel.recv(size if size and size > 0 else self.read_size)
+        self.bytes_read += len(data)
+        return data
+
+
+class TransferCheckpointStore:
+    """断点续传检查点存储
+
+    记录分块传输中已确认写入的连续字节偏移，保存在本地JSON文件中，
+    MCP服务重启后仍可通过resume参数从断点继续未完成的传输。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = self._load()
+
+    @staticmethod
+    def make_key(direction: str, connection_id: str, remote_path: str, local_path: str) -> str:
+        """生成检查点键，同一连接上同一对文件的同向传输共用一个检查点"""
+        return f"{direction}|{connection_id}|{remote_path}|{os.path.abspath(local_path)}"
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取传输检查点失败，忽略已有记录: {e}")
+            return {}
+
+    def _save(self):
+        """原子地写回检查点文件（调用方需持有锁）"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            # 检查点记录了本地和远程路径，状态目录只允许当前用户访问
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            return dict(entry) if entry else None
+
+    def begin(self, key: str, **entry):
+        """开始（或重新开始）一次分块传输"""
+        with self._lock:
+            self._entries[key] = dict(entry, updated_at=time.time())
+            self._save()
+
+    def update(self, key: str, verified_offset: int):
+        """更新已确认的连续偏移"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or verified_offset <= entry["verified_offset"]:
+                return
+            entry["verified_offset"] = verified_offset
+            entry["updated_at"] = time.time()
+            self._save()
+
+    def remove(self, key: str):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._save()
+
+    def list(self) -> List[Dict]:
+        with self._lock:
+            return [dict(entry) for entry in self._entries.values()]
+
+
+class RemoteMetadataCache:
+    """单个连接上的远程元数据缓存（stat结果和目录列表）
+
+    按规范化路径缓存，条目超过 ttl 秒失效，超过 max_entries 时淘汰最久未使用的条目。
+    本服务自身的写操作会使相关条目失效；execute_command等其他途径造成的远端变化只能依赖TTL。
+    相对路径相对于SFTP会话的初始目录，无法与绝对路径对应，任何写操作都会使其失效。
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 30):
+        self.max_entries = max(0, max_entries)
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()  # (kind, path, variant) -> (stored_at, value)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    @staticmethod
+    def normalize(path: str) -> str:
+        normalized = posixpath.normpath(path or ".")
+        # normpath保留开头的"//"，统一为单个"/"
+        return "/" + normalized.lstrip("/") if normalized.startswith("/") else normalized
+
+    def get(self, kind: str, path: str, variant=None) -> Optional[Dict]:
+        if not self.enabled:
+            return None
+        key = (kind, self.normalize(path), variant)
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, kind: str, path: str, value: Dict, variant=None):
+        if not self.enabled:
+            return
+        key = (kind, self.normalize(path), variant)
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, path: str):
+        """使path本身、其下所有路径以及包含它的上级目录列表失效"""
+        target = self.normalize(path)
+        parent = posixpath.dirname(target)
+        relative = not target.startswith("/")
+
+        def affected(kind: str, cached: str) -> bool:
+            if relative or not cached.startswith("/"):
+                return True
+            if cached == target or cached.startswith(target.rstrip("/") + "/"):
+                return True
+            # 上级目录的stat（修改时间）和列表（可能是递归列表）也随之变化
+            if cached == parent:
+                return True
+            return kind == "list" and target.startswith(cached.rstrip("/") + "/")
+
+        stale = [key for key in self._entries if affected(key[0], key[1])]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+
+    def clear(self) -> int:
+        count = len(self._entries)
+        self._entries.clear()
+        return count
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions
+        }
+
+class RemoteListingCursor:
+    """分页列出远程目录的游标
+
+    游标从连接的会话池借用一个SFTP会话并在翻页期间一直占用，通过 listdir_iter 流式读取目录，
+    每次只取出一页条目，未读取的部分保留在服务端目录句柄和待遍历目录栈中。
+    读完后会话归还会话池；提前关闭时会话上还有未读取的预读请求，直接关闭而不归还。
+    条目按服务端返回顺序输出，不做全局排序。
+    """
+
+    def __init__(self, cursor_id: str, connection_id: str, sftp_client, remote_path: str,
+                 recursive: bool = False, max_depth: Optional[int] = None,
+                 pattern: Optional[str] = None, sftp_pool: Optional[SFTPSessionPool] = None):
+        self.cursor_id = cursor_id
+        self.connection_id = connection_id
+        self.sftp_client = sftp_client
+        self.sftp_pool = sftp_pool
+        self.exhausted = False
+        self.remote_path = remote_path
+        self.recursive = recursive
+        self.max_depth = max_depth
+        self.pattern = pattern
+        self.returned = 0
+        self.totals: Optional[Dict] = None
+        self.last_used = time.monotonic()
+        self.lock = asyncio.Lock()
+        self._peeked = None
+        self._entries = (
+            entry for entry in self.walk(sftp_client, remote_path, recursive, max_depth)
+            if self.matches(entry[0], pattern)
+        )
+
+    @staticmethod
+    def walk(sftp_client, remote_path: str, recursive: bool, max_depth: Optional[int]):
+        """深度优先遍历目录，逐条产出(相对路径, 深度, SFTPAttributes)
+
+        只在栈中保存待遍历的目录，条目本身不在内存中累积；
+        符号链接不会被跟随，避免目录环。
+        """
+        pending = [("", 1)]
+        while pending:
+            relative_directory, depth = pending.pop()
+            path = f"{remote_path.rstrip('/')}/{relative_directory}" if relative_directory else remote_path
+            for file_attr in sftp_client.listdir_iter(path):
+                relative = f"{relative_directory}/{file_attr.filename}" if relative_directory else file_attr.filename
+                if (recursive and ((file_attr.st_mode or 0) & 0o170000) == 0o040000
+                        and (max_depth is None or depth < max_depth)):
+                    pending.append((relative, depth + 1))
+                yield relative, depth, file_attr
+
+    @staticmethod
+    def matches(relative: str, pattern: Optional[str]) -> bool:
+        """glob同时匹配相对路径和文件名"""
+        if not pattern:
+            return True
+        return fnmatch.fnmatch(relative, pattern) or fnmatch.fnmatch(relative.rsplit('/', 1)[-1], pattern)
+
+    @staticmethod
+    def format_entry(relative: str, depth: int, file_attr) -> Dict:
+        return {
+            "name": file_attr.filename,
+            "path": relative,
+            "depth": depth,
+            "size": file_attr.st_size,
+            "modified": file_attr.st_mtime,
+            "permissions": oct(file_attr.st_mode)[-3:] if file_attr.st_mode is not None else None,
+            "is_directory": file_attr.st_mode is not None and (file_attr.st_mode & 0o170000) == 0o040000,
+            "owner": file_attr.st_uid,
+            "group": file_attr.st_gid
+        }
+
+    def fetch(self, page_size: int) -> Tuple[List[Dict], bool]:
+        """读取下一页（阻塞调用），返回(条目列表, 是否已读完)
+
+        额外预读一条用来判断是否还有下一页，预读的条目放到下一页开头。
+        """
+        entries = [self._peeked] if self._peeked is not None else []
+        entries.extend(itertools.islice(self._entries, page_size - len(entries)))
+        self._peeked = next(self._entries, None)
+        self.returned += len(entries)
+        self.exhausted = self._peeked is None
+        return [self.format_entry(*entry) for entry in entries], self.exhausted
+
+    def count(self, sftp_client) -> Dict:
+        """按相同的过滤条件流式统计总数（阻塞调用），不保存条目"""
+        totals = {"entries": 0, "files": 0, "directories": 0, "bytes": 0}
+        for relative, _, file_attr in self.walk(sftp_client, self.remote_path, self.recursive, self.max_depth):
+            if not self.matches(relative, self.pattern):
+                continue
+            totals["entries"] += 1
+            if ((file_attr.st_mode or 0) & 0o170000) == 0o040000:
+                totals["directories"] += 1
+            else:
+                totals["files"] += 1
+                totals["bytes"] += file_attr.st_size or 0
+        return totals
+
+    @staticmethod
+    def summarize(entries: List[Dict]) -> Dict:
+        """由已列出的条目汇总总数"""
+        directories = sum(1 for entry in entries if entry["is_directory"])
+        return {
+            "entries": len(entries),
+            "files": len(entries) - directories,
+            "directories": directories,
+            "bytes": sum(entry["size"] or 0 for entry in entries if not entry["is_directory"])
+        }
+
+    async def close(self):
+        """停止遍历并交还会话：读完时归还会话池，否则关闭会话"""
+        self._entries = iter(())
+        self._peeked = None
+        if self.sftp_pool is None:
+            return
+        if self.exhausted:
+            await self.sftp_pool.release(self.sftp_client)
+        else:
+            await self.sftp_pool.discard(self.sftp_client)
+
 
 class SSHConnection:
-    def __init__(self, host: str, username: str, port: int = 22):
+    def __init__(self, host: str, username: str, port: int = 22,
+                 sftp_pool_size: int = 4, sftp_idle_timeout: float = 300,
+                 idle_probe_threshold: float = 60, metadata_cache_size: int = 1024,
+                 metadata_cache_ttl: float = 30, executors: Optional[WorkloadExecutors] = None,
+                 max_channels: int = 6, max_extra_transports: int = 0, transports: int = 1):
         self.host = host
         self.username = username
         self.port = port
         self.client: Optional[paramiko.SSHClient] = None
+        self.executors = executors or WorkloadExecutors.shared()
         self.status = ConnectionStatus.DISCONNECTED
         self.error_message: Optional[str] = None
+        self.sftp_pool = SFTPSessionPool(self, sftp_pool_size, sftp_idle_timeout)
+        self.metadata_cache = RemoteMetadataCache(metadata_cache_size, metadata_cache_ttl)
+        self.channel_scheduler = ChannelScheduler(max_channels, max_extra_transports)
+        # 每个连接常驻的传输层数（含主传输层），命令按负载最低的传输层分配
+        self.transports = max(1, transports)
+        # 最近一次成功认证的参数，用于向同一主机额外打开传输层
+        self._auth_kwargs: Optional[Dict] = None
+        # 被动存活检测：记录最后一次成功通信的时间，仅在空闲超过阈值时才主动探测
+        self.idle_probe_threshold = idle_probe_threshold
+        self.last_activity: float = 0.0
+        self.probes_sent = 0
+        self.probes_skipped = 0
+        # 健康检查和keep-alive的下次计划时间（monotonic），由SSHManager调度
+        self.next_health_check: float = 0.0
+        self.next_keepalive: float = 0.0
+    
+    def mark_activity(self):
+        """记录一次成功的通信"""
+        self.last_activity = time.monotonic()
+    
+    def _transport_active(self) -> bool:
+        """检查传输层是否仍然活跃（不产生网络往返）"""
+        transport = self.client.get_transport() if self.client else None
+        return transport is not None and transport.is_active()
+    
+    async def ensure_alive(self) -> bool:
+        """被动存活检测
+        
+        传输层不活跃时直接判定断开；最近有过成功通信则跳过探测，
+        只有空闲超过 idle_probe_threshold 秒才调用 is_healthy() 发送探测命令。
+        """
+        if not self.client or self.status != ConnectionStatus.CONNECTED:
+            return False
         
+        if not self._transport_active():
+            self.status = ConnectionStatus.ERROR
+            self.error_message = "SSH传输层不活跃"
+            return False
+        
+        if time.monotonic() - self.last_activity < self.idle_probe_threshold:
+            self.probes_skipped += 1
+            return True
+        
+        return await self.is_healthy()
+    
+    def liveness_stats(self) -> Dict:
+        """存活检测统计信息"""
+        return {
+            "idle_seconds": round(time.monotonic() - self.last_activity, 3) if self.last_activity else None,
+            "probes_sent": self.probes_sent,
+            "probes_skipped": self.probes_skipped
+        }
+
+    def sftp_session(self):
+        """从会话池借用SFTP会话，用法: async with connection.sftp_session() as sftp"""
+        return self.sftp_pool.session()
+
     async def connect(self, password: Optional[str] = None, 
                      private_key: Optional[str] = None,
                      private_key_password: Optional[str] = None) -> bool:
         """建立SSH连接"""
         try:
             self.status = ConnectionStatus.CONNECTING
+            await self._close_clients(self.channel_scheduler.take_extra_clients())
             self.client = paramiko.SSHClient()
             self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
             
@@ -118,13 +1373,8 @@ class SSHConnection:
             }
             
             if private_key:
-                # 使用私钥认证
-                key_obj = paramiko.RSAKey.from_private_key_file(
-                    private_key, password=private_key_password
-                ) if isinstance(private_key, str) else paramiko.RSAKey.from_private_key(
-                    private_key, password=private_key_password
-                )
-                auth_kwargs['pkey'] = key_obj
+                # 使用私钥认证（自动识别密钥类型，解密结果在连接间共享）
+                auth_kwargs['pkey'] = await self._load_private_key(private_key, private_key_password)
             elif password:
                 # 使用密码认证
                 auth_kwargs['password'] = password
@@ -134,20 +1384,7 @@ class SSHConnection:
                 auth_kwargs['allow_agent'] = True
             
             # 在线程池中执行连接（因为paramiko是同步的）
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, lambda: self.client.connect(**auth_kwargs))
-            
-            # 启用keep-alive
-            transport = self.client.get_transport()
-            if transport:
-                # 启用TCP keep-alive
-                transport.set_keepalive(60)  # 60秒间隔
-                # 设置压缩
-                transport.use_compression(True)
-                logger.debug(f"已启用SSH keep-alive: {self.username}@{self.host}:{self.port}")
-            
-            self.status = ConnectionStatus.CONNECTED
-            self.error_message = None
+            await self._handshake(auth_kwargs)
             logger.info(f"SSH连接成功: {self.username}@{self.host}:{self.port}")
             return True
             
@@ -165,6 +1402,7 @@ class SSHConnection:
         """使用SSH config中的主机名建立连接"""
         try:
             self.status = ConnectionStatus.CONNECTING
+            await self._close_clients(self.channel_scheduler.take_extra_clients())
             self.client = paramiko.SSHClient()
             self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
             
@@ -198,12 +1436,7 @@ class SSHConnection:
             if private_key:
                 # 使用显式提供的私钥
                 try:
-                    key_obj = paramiko.RSAKey.from_private_key_file(
-                        private_key, password=private_key_password
-                    ) if isinstance(private_key, str) else paramiko.RSAKey.from_private_key(
-                        private_key, password=private_key_password
-                    )
-                    auth_kwargs['pkey'] = key_obj
+                    auth_kwargs['pkey'] = await self._load_private_key(private_key, private_key_password)
                 except Exception as e:
                     logger.error(f"无法加载提供的私钥文件 {private_key}: {e}")
                     # 如果提供的私钥加载失败，继续尝试其他认证方式
@@ -217,10 +1450,7 @@ class SSHConnection:
                 try:
                     # 检查文件是否存在
                     if os.path.exists(identity_file):
-                        key_obj = paramiko.RSAKey.from_private_key_file(
-                            identity_file, password=private_key_password
-                        )
-                        auth_kwargs['pkey'] = key_obj
+                        auth_kwargs['pkey'] = await self._load_private_key(identity_file, private_key_password)
                         logger.debug(f"成功加载私钥文件: {identity_file}")
                     else:
                         logger.warning(f"私钥文件不存在: {identity_file}")
@@ -239,20 +1469,7 @@ class SSHConnection:
                     auth_kwargs['allow_agent'] = True
             
             # 在线程池中执行连接
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, lambda: self.client.connect(**auth_kwargs))
-            
-            # 启用keep-alive
-            transport = self.client.get_transport()
-            if transport:
-                # 启用TCP keep-alive
-                transport.set_keepalive(60)  # 60秒间隔
-                # 设置压缩
-                transport.use_compression(True)
-                logger.debug(f"已启用SSH keep-alive: {self.username}@{self.host}:{self.port}")
-            
-            self.status = ConnectionStatus.CONNECTED
-            self.error_message = None
+            await self._handshake(auth_kwargs)
             logger.info(f"SSH config连接成功: {self.username}@{self.host}:{self.port} (config: {config_host})")
             return True
             
@@ -262,12 +1479,72 @@ class SSHConnection:
             logger.error(f"SSH config连接失败: {e}")
             return False
     
+    async def _load_private_key(self, private_key, password: Optional[str]) -> paramiko.PKey:
+        """在握手线程池中加载私钥，避免解密阻塞事件循环"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self.executors.connect, PrivateKeyLoader.shared().load_any, private_key, password
+        )
+    
+    async def _handshake(self, auth_kwargs: Dict):
+        """用self.client完成握手认证并启用keep-alive，成功后记录认证参数供重连和额外传输层使用"""
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(self.executors.connect, lambda: self.client.connect(**auth_kwargs))
+        self._auth_kwargs = auth_kwargs
+        
+        # 启用keep-alive
+        transport = self.client.get_transport()
+        if transport:
+            # 启用TCP keep-alive
+            transport.set_keepalive(60)  # 60秒间隔
+            # 设置压缩
+            transport.use_compression(True)
+            logger.debug(f"已启用SSH keep-alive: {self.username}@{self.host}:{self.port}")
+        
+        await self._open_pooled_transports()
+        self.status = ConnectionStatus.CONNECTED
+        self.error_message = None
+        self.mark_activity()
+    
+    @property
+    def can_reconnect(self) -> bool:
+        """是否记录了可用于自动重连的认证参数"""
+        return self._auth_kwargs is not None
+    
+    async def reconnect(self) -> bool:
+        """用上次成功的认证参数在同一连接对象上重新握手
+        
+        保留连接对象本身，异步命令、元数据缓存等按连接ID引用的状态不受影响
+        """
+        if not self.can_reconnect:
+            return False
+        old_client = self.client
+        await self.sftp_pool.close()
+        await self._close_clients(
+            self.channel_scheduler.take_extra_clients() + ([old_client] if old_client else [])
+        )
+        self.metadata_cache.clear()
+        try:
+            self.status = ConnectionStatus.CONNECTING
+            self.client = paramiko.SSHClient()
+            self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            await self._handshake(self._auth_kwargs)
+            logger.info(f"SSH重连成功: {self.username}@{self.host}:{self.port}")
+            return True
+        except Exception as e:
+            self.status = ConnectionStatus.ERROR
+            self.error_message = f"重连失败: {str(e)}"
+            logger.warning(f"SSH重连失败: {self.username}@{self.host}:{self.port}: {e}")
+            return False
+    
     async def disconnect(self):
         """断开SSH连接"""
+        await self.sftp_pool.close()
+        await self._close_clients(self.channel_scheduler.take_extra_clients())
         if self.client:
             try:
                 loop = asyncio.get_event_loop()
-                await loop.run_in_executor(None, self.client.close)
+                await loop.run_in_executor(self.executors.housekeeping, self.client.close)
             except Exception as e:
                 logger.error(f"断开连接时出错: {e}")
             finally:
@@ -283,7 +1560,7 @@ class SSHConnection:
         try:
             # 检查传输层状态
             loop = asyncio.get_event_loop()
-            transport = await loop.run_in_executor(None, lambda: self.client.get_transport())
+            transport = await loop.run_in_executor(self.executors.housekeeping, lambda: self.client.get_transport())
             if not transport or not transport.is_active():
                 self.status = ConnectionStatus.ERROR
                 self.error_message = "SSH传输层不活跃"
@@ -291,11 +1568,13 @@ class SSHConnection:
             
             # 执行轻量级命令进行健康检查（使用echo避免输出过多）
             try:
+                self.probes_sent += 1
                 stdin, stdout, stderr = await loop.run_in_executor(
-                    None, lambda: self.client.exec_command('echo "health_check"', timeout=5)
+                    self.executors.housekeeping, lambda: self.client.exec_command('echo "health_check"', timeout=5)
                 )
                 # 读取输出以确认命令执行成功
-                await loop.run_in_executor(None, stdout.read)
+                await loop.run_in_executor(self.executors.housekeeping, stdout.read)
+                self.mark_activity()
                 return True
             except Exception as cmd_error:
                 # 如果命令执行失败，可能是连接问题，但不立即标记为错误
@@ -321,10 +1600,10 @@ class SSHConnection:
         
         try:
             loop = asyncio.get_event_loop()
-            transport = await loop.run_in_executor(None, lambda: self.client.get_transport())
+            transport = await loop.run_in_executor(self.executors.housekeeping, lambda: self.client.get_transport())
             if transport and transport.is_active():
                 # 发送keep-alive包
-                await loop.run_in_executor(None, transport.send_ignore)
+                await loop.run_in_executor(self.executors.housekeeping, transport.send_ignore)
                 return True
         except Exception as e:
             logger.debug(f"发送keep-alive失败: {e}")
@@ -333,25 +1612,71 @@ class SSHConnection:
         
         return False
     
-    async def execute_command(self, command: str, timeout: int = 30) -> Tuple[int, str, str]:
-        """执行SSH命令并返回退出码、stdout、stderr"""
+    async def _open_extra_transport(self) -> paramiko.SSHClient:
+        """用最近一次的认证参数向同一主机再打开一条传输层"""
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(self.executors.connect, lambda: client.connect(**self._auth_kwargs))
+        transport = client.get_transport()
+        if transport:
+            transport.set_keepalive(60)
+            transport.use_compression(True)
+        return client
+    
+    async def _open_pooled_transports(self):
+        """按transports配置并发打开常驻传输层；部分失败时以已打开的传输层继续"""
+        if self.transports <= 1:
+            return
+        results = await asyncio.gather(
+            *[self._open_extra_transport() for _ in range(self.transports - 1)], return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"打开常驻传输层失败: {self.username}@{self.host}:{self.port}: {result}")
+            else:
+                self.channel_scheduler.add_lane(result, pooled=True)
+    
+    async def _close_clients(self, clients: List):
+        loop = asyncio.get_event_loop()
+        for client in clients:
+            try:
+                await loop.run_in_executor(self.executors.housekeeping, client.close)
+            except Exception as e:
+                logger.debug(f"关闭额外传输层时出错: {e}")
+    
+    async def execute_command(self, command: str, timeout: int = 30,
+                              timing: Optional[Dict] = None) -> Tuple[int, str, str]:
+        """执行SSH命令并返回退出码、stdout、stderr
+        
+        命令经过channel调度器排队，timing不为None时写入queue_wait（秒）和transport（传输层序号）
+        """
         if not self.client or self.status != ConnectionStatus.CONNECTED:
             return -1, "", "SSH连接未建立"
         
+        lane = None
         try:
-            # 在执行命令前检查连接健康状态
-            if not await self.is_healthy():
+            # 被动存活检测：近期有通信时不再额外发送探测命令
+            if not await self.ensure_alive():
                 return -1, "", "SSH连接已断开"
             
+            lane, waited = await self.channel_scheduler.acquire(
+                self._open_extra_transport if self._auth_kwargs else None
+            )
+            if timing is not None:
+                timing.update(queue_wait=round(waited, 3), transport=lane.index)
+            client = lane.client or self.client
+            
             loop = asyncio.get_event_loop()
             stdin, stdout, stderr = await loop.run_in_executor(
-                None, lambda: self.client.exec_command(command, timeout=timeout)
+                self.executors.command, lambda: client.exec_command(command, timeout=timeout)
             )
             
             # 读取输出
-            stdout_data = await loop.run_in_executor(None, stdout.read)
-            stderr_data = await loop.run_in_executor(None, stderr.read)
+            stdout_data = await loop.run_in_executor(self.executors.command, stdout.read)
+            stderr_data = await loop.run_in_executor(self.executors.command, stderr.read)
             exit_code = stdout.channel.recv_exit_status()
+            self.mark_activity()
             
             return (
                 exit_code,
@@ -362,58 +1687,143 @@ class SSHConnection:
         except Exception as e:
             error_msg = f"命令执行失败: {str(e)}"
             logger.error(error_msg)
-            # 检查是否是连接断开导致的错误
-            if "Broken pipe" in str(e) or "Connection reset" in str(e) or "Socket is closed" in str(e):
+            if lane is not None and lane.client is not None:
+                # 额外传输层断开时只移除该传输层，不影响主连接状态
+                transport = lane.client.get_transport()
+                if transport is None or not transport.is_active():
+                    await self._close_clients([client for client in [self.channel_scheduler.discard(lane)] if client])
+                return -1, "", error_msg
+            # 根据真实命令的错误判断连接是否已断开
+            if ("Broken pipe" in str(e) or "Connection reset" in str(e) or "Socket is closed" in str(e)
+                    or not self._transport_active()):
                 self.status = ConnectionStatus.ERROR
                 self.error_message = f"连接意外断开: {str(e)}"
             return -1, "", error_msg
+        finally:
+            if lane is not None:
+                self.channel_scheduler.release(lane)
 
 class SSHManager:
-    def __init__(self):
+    def __init__(self, config: Optional[SSHAgentConfig] = None):
+        self.config = config or SSHAgentConfig()
+        # 阻塞的paramiko调用按工作负载分到各自的有界线程池
+        self.executors = WorkloadExecutors(self.config)
         self.connections: Dict[str, SSHConnection] = {}
         self.async_commands: Dict[str, AsyncCommand] = {}
         self.interactive_sessions: Dict[str, InteractiveSession] = {}
+        self.listing_cursors: Dict[str, RemoteListingCursor] = {}
         self._output_monitor_task: Optional[asyncio.Task] = None
+        self._command_readers: Dict[str, int] = {}  # command_id -> channel fileno
         self._interactive_monitor_task: Optional[asyncio.Task] = None
         self._health_check_task: Optional[asyncio.Task] = None
         self._keepalive_task: Optional[asyncio.Task] = None
+        self._auto_connect_task: Optional[asyncio.Task] = None
+        # 正在进行的握手，同一连接ID的并发连接请求共享同一次握手
+        self._connecting: Dict[str, asyncio.Task] = {}
+        # 后台自动重连任务和每个连接的重连统计
+        self._reconnect_tasks: Dict[str, asyncio.Task] = {}
+        self.reconnect_stats: Dict[str, Dict] = {}
+        self._health_check_interval = 30
+        self._keepalive_interval = 120
+        self.health_metrics: Dict[str, Dict] = {
+            kind: {"sweeps": 0, "last_sweep_at": None, "last_sweep_duration": None,
+                   "max_sweep_duration": 0.0, "last_sweep_hosts": 0, "hosts": {}}
+            for kind in ("health_check", "keepalive")
+        }
         self._running = True
+        self.transfer_checkpoints = TransferCheckpointStore(
+            os.path.expanduser(self.config.transfer_checkpoint_file)
+        )
         
     def generate_connection_id(self, host: str, username: str, port: int) -> str:
         """生成连接ID"""
         return f"{username}@{host}:{port}"
     
+    def _new_connection(self, host: str, username: str, port: int) -> SSHConnection:
+        """按管理器配置创建连接对象"""
+        return SSHConnection(
+            host, username, port,
+            sftp_pool_size=self.config.sftp_pool_size,
+            sftp_idle_timeout=self.config.sftp_idle_timeout,
+            idle_probe_threshold=self.config.health_probe_idle_threshold,
+            metadata_cache_size=self.config.metadata_cache_size,
+            metadata_cache_ttl=self.config.metadata_cache_ttl,
+            executors=self.executors,
+            max_channels=self.config.max_channels_per_connection,
+            max_extra_transports=self.config.max_extra_transports,
+            transports=self.config.transports_per_connection
+        )
+    
+    async def _connect_single_flight(self, connection_id: str, establish: callable,
+                                     force_reconnect: bool = False):
+        """按连接ID合并并发的连接请求
+        
+        已有健康连接时直接复用；否则只进行一次握手，同时到达的调用方共享其结果。
+        force_reconnect为True时总是重新握手，但仍会复用正在进行的握手。
+        """
+        while connection_id in self._connecting:
+            handshaked = await asyncio.shield(self._connecting[connection_id])
+            if handshaked or not force_reconnect:
+                return
+        
+        task = asyncio.ensure_future(self._establish_connection(connection_id, establish, force_reconnect))
+        self._connecting[connection_id] = task
+        try:
+            # shield：某个调用方被取消时不中断其他调用方共享的握手
+            await asyncio.shield(task)
+        finally:
+            if task.done() and self._connecting.get(connection_id) is task:
+                del self._connecting[connection_id]
+    
+    async def _establish_connection(self, connection_id: str, establish: callable,
+                                    force_reconnect: bool) -> bool:
+        """复用健康连接或重新握手，返回是否进行了握手"""
+        try:
+            existing = self.connections.get(connection_id)
+            if existing is not None and not force_reconnect and await existing.ensure_alive():
+                logger.info(f"复用已有SSH连接: {connection_id}")
+                return False
+            
+            # 如果连接已存在，先停止其自动重连并断开
+            if existing is not None:
+                await self._cancel_reconnect(connection_id)
+                await existing.disconnect()
+            
+            connection, success = await establish()
+            
+            # 无论连接成功与否，都将连接对象保存（用于查询错误状态）
+            self.connections[connection_id] = connection
+            if success:
+                logger.info(f"SSH连接建立成功: {connection_id}")
+            else:
+                # 不抛出异常，让调用者检查状态
+                logger.warning(f"SSH连接失败: {connection_id}, 错误: {connection.error_message}")
+            return True
+        finally:
+            if self._connecting.get(connection_id) is asyncio.current_task():
+                del self._connecting[connection_id]
+    
     async def create_connection(self, host: str, username: str, port: int = 22,
                               password: Optional[str] = None,
                               private_key: Optional[str] = None,
-                              private_key_password: Optional[str] = None) -> str:
-        """创建新的SSH连接"""
+                              private_key_password: Optional[str] = None,
+                              force_reconnect: bool = False) -> str:
+        """创建SSH连接；同一连接ID已有健康连接时直接复用，force_reconnect为True时强制重新握手"""
         connection_id = self.generate_connection_id(host, username, port)
         
-        # 如果连接已存在，先断开
-        if connection_id in self.connections:
-            await self.connections[connection_id].disconnect()
+        async def establish():
+            connection = self._new_connection(host, username, port)
+            return connection, await connection.connect(password, private_key, private_key_password)
         
-        # 创建新连接
-        connection = SSHConnection(host, username, port)
-        success = await connection.connect(password, private_key, private_key_password)
-        
-        # 无论连接成功与否，都将连接对象保存（用于查询错误状态）
-        self.connections[connection_id] = connection
-        
-        if success:
-            logger.info(f"SSH连接建立成功: {connection_id}")
-            return connection_id
-        else:
-            logger.warning(f"SSH连接失败: {connection_id}, 错误: {connection.error_message}")
-            # 不抛出异常，返回连接ID，让调用者检查状态
-            return connection_id
+        await self._connect_single_flight(connection_id, establish, force_reconnect)
+        return connection_id
     
     async def create_connection_from_config(self, config_host: str, 
                                           username: Optional[str] = None,
                                           password: Optional[str] = None,
                                           private_key: Optional[str] = None,
-                                          private_key_password: Optional[str] = None) -> str:
+                                          private_key_password: Optional[str] = None,
+                                          force_reconnect: bool = False) -> str:
         """使用SSH config中的主机名创建连接
         
         Args:
@@ -422,6 +1832,7 @@ class SSHManager:
             password: 可选的密码
             private_key: 可选的私钥文件路径
             private_key_password: 可选的私钥密码
+            force_reconnect: 已有健康连接时是否仍然重新握手
             
         Returns:
             连接ID
@@ -461,32 +1872,21 @@ class SSHManager:
         # 生成连接ID
         connection_id = f"{actual_username}@{actual_hostname}:{actual_port}"
         
-        # 如果连接已存在，先断开
-        if connection_id in self.connections:
-            await self.connections[connection_id].disconnect()
-        
-        # 创建新连接
-        connection = SSHConnection(actual_hostname, actual_username, actual_port)
-        
-        # 对于config连接，我们让SSH客户端自己处理配置解析
-        # 只传递明确的认证参数
-        success = await connection.connect_from_config(
-            config_host=config_host,
-            username=username,
-            password=password,
-            private_key=private_key,
-            private_key_password=private_key_password
-        )
-        
-        # 无论连接成功与否，都将连接对象保存（用于查询错误状态）
-        self.connections[connection_id] = connection
+        async def establish():
+            connection = self._new_connection(actual_hostname, actual_username, actual_port)
+            # 对于config连接，我们让SSH客户端自己处理配置解析
+            # 只传递明确的认证参数
+            success = await connection.connect_from_config(
+                config_host=config_host,
+                username=username,
+                password=password,
+                private_key=private_key,
+                private_key_password=private_key_password
+            )
+            return connection, success
         
-        if success:
-            logger.info(f"SSH config连接建立成功: {connection_id}")
-            return connection_id
-        else:
-            logger.warning(f"SSH config连接失败: {connection_id}, 错误: {connection.error_message}")
-            return connection_id
+        await self._connect_single_flight(connection_id, establish, force_reconnect)
+        return connection_id
     
     async def get_connection_status(self, connection_id: str) -> Dict:
         """获取连接状态"""
@@ -502,7 +1902,11 @@ class SSHManager:
             "host": connection.host,
             "username": connection.username,
             "port": connection.port,
-            "error_message": connection.error_message
+            "error_message": connection.error_message,
+            "sftp_pool": connection.sftp_pool.stats(),
+            "channels": connection.channel_scheduler.stats(),
+            "liveness": connection.liveness_stats(),
+            "reconnect": self.get_reconnect_status(connection_id)
         }
     
     async def list_connections(self) -> Dict[str, Dict]:
@@ -514,7 +1918,8 @@ class SSHManager:
                 "host": connection.host,
                 "username": connection.username,
                 "port": connection.port,
-                "error_message": connection.error_message
+                "error_message": connection.error_message,
+                "liveness": connection.liveness_stats()
             }
         return result
     
@@ -523,8 +1928,15 @@ class SSHManager:
         if connection_id not in self.connections:
             return False
         
+        await self._cancel_reconnect(connection_id)
+        await self._close_listing_cursors(
+            [cursor_id for cursor_id, cursor in self.listing_cursors.items() if cursor.connection_id == connection_id]
+        )
         await self.connections[connection_id].disconnect()
         del self.connections[connection_id]
+        self.reconnect_stats.pop(connection_id, None)
+        for metrics in self.health_metrics.values():
+            metrics["hosts"].pop(connection_id, None)
         return True
     
     async def execute_command(self, connection_id: str, command: str, 
@@ -540,8 +1952,8 @@ class SSHManager:
         
         connection = self.connections[connection_id]
         
-        # 检查连接状态
-        if connection.status != ConnectionStatus.CONNECTED:
+        # 检查连接状态；连接断开但可自动重连时，命令排队等待重连完成
+        if connection.status != ConnectionStatus.CONNECTED and not await self._wait_reconnect(connection_id):
             error_msg = connection.error_message or "连接未建立"
             return {
                 "success": False,
@@ -551,12 +1963,18 @@ class SSHManager:
             }
         
         try:
-            exit_code, stdout, stderr = await connection.execute_command(command, timeout)
+            timing = {}
+            exit_code, stdout, stderr = await connection.execute_command(command, timeout, timing=timing)
+            if connection.status == ConnectionStatus.ERROR:
+                # 命令执行中连接断开：命令本身不重试（可能不是幂等的），后台开始重连
+                self._schedule_reconnect(connection_id)
             return {
                 "success": exit_code == 0,
                 "exit_code": exit_code,
                 "stdout": stdout,
-                "stderr": stderr
+                "stderr": stderr,
+                "queue_wait": timing.get("queue_wait", 0.0),
+                "transport": timing.get("transport", 0)
             }
         except Exception as e:
             return {
@@ -566,6 +1984,201 @@ class SSHManager:
                 "stderr": f"命令执行失败: {str(e)}"
             }
     
+    async def _connect_config_host(self, host_config: SSHConnectionConfig) -> Optional[str]:
+        """按配置建立连接，成功返回None，失败返回错误信息"""
+        connection_id = await self.create_connection(
+            host=host_config.host,
+            username=host_config.username,
+            port=host_config.port,
+            password=host_config.password,
+            private_key=host_config.private_key,
+            private_key_password=host_config.private_key_password
+        )
+        connection = self.connections[connection_id]
+        if connection.status != ConnectionStatus.CONNECTED:
+            return connection.error_message or "未知错误"
+        return None
+    
+    async def connect_many(self, host_configs: List[SSHConnectionConfig],
+                           max_parallel: Optional[int] = None,
+                           timeout: Optional[int] = None) -> Dict:
+        """并发连接多台配置主机，同时进行的握手数受max_parallel限制
+        
+        超时的主机如果握手仍在进行（握手在调用方之间共享，不会随超时取消），
+        归入pending而不是failed：该主机之后仍可能连接成功并出现在连接列表中。
+        
+        Returns:
+            包含connected（名称、连接ID、耗时）、failed（名称、错误）、pending（名称、连接ID、说明）和总耗时的汇总字典
+        """
+        max_parallel = max(1, max_parallel or self.config.auto_connect_parallelism)
+        timeout = timeout or self.config.auto_connect_timeout
+        semaphore = asyncio.Semaphore(max_parallel)
+        
+        async def connect_host(host_config: SSHConnectionConfig) -> Dict:
+            connection_id = self.generate_connection_id(host_config.host, host_config.username, host_config.port)
+            async with semaphore:
+                host_started = time.monotonic()
+                pending = False
+                try:
+                    error = await asyncio.wait_for(self._connect_config_host(host_config), timeout)
+                except asyncio.TimeoutError:
+                    error = f"{ERROR_MESSAGES['timeout']}（{timeout}秒）"
+                    pending = connection_id in self._connecting
+                except Exception as e:
+                    error = str(e)
+                return {
+                    "name": host_config.name,
+                    "connection_id": connection_id,
+                    "elapsed": round(time.monotonic() - host_started, 3),
+                    "error": error,
+                    "pending": pending
+                }
+        
+        started = time.monotonic()
+        outcomes = await asyncio.gather(*(connect_host(host_config) for host_config in host_configs))
+        elapsed = time.monotonic() - started
+        connected = [{key: outcome[key] for key in ("name", "connection_id", "elapsed")}
+                     for outcome in outcomes if outcome["error"] is None]
+        failed = [{"name": outcome["name"], "error": outcome["error"]}
+                  for outcome in outcomes if outcome["error"] is not None and not outcome["pending"]]
+        pending = [{"name": outcome["name"], "connection_id": outcome["connection_id"],
+                    "error": f"{outcome['error']}，握手仍在进行，稍后可能连接成功"}
+                   for outcome in outcomes if outcome["pending"]]
+        
+        logger.info(f"并发连接完成: 成功 {len(connected)}, 失败 {len(failed)}, 握手未完成 {len(pending)}, 耗时 {elapsed:.2f}秒")
+        return {
+            "success": not failed and not pending,
+            "total": len(outcomes),
+            "connected": connected,
+            "failed": failed,
+            "pending": pending,
+            "elapsed": round(elapsed, 3)
+        }
+    
+    def start_auto_connect(self, host_configs: List[SSHConnectionConfig]) -> asyncio.Task:
+        """在后台并发连接主机，不阻塞调用方；已有后台连接任务时直接返回该任务"""
+        if self._auto_connect_task and not self._auto_connect_task.done():
+            return self._auto_connect_task
+        self._auto_connect_task = asyncio.create_task(self.connect_many(host_configs))
+        logger.info(f"后台自动连接已启动: {len(host_configs)} 台主机")
+        return self._auto_connect_task
+    
+    async def wait_auto_connect(self) -> Optional[Dict]:
+        """等待进行中的后台自动连接完成并返回汇总，没有进行中的任务时返回None"""
+        if not self._auto_connect_task or self._auto_connect_task.done():
+            return None
+        return await asyncio.shield(self._auto_connect_task)
+    
+    async def execute_many(self, command: str, connection_ids: Optional[List[str]] = None,
+                           host_configs: Optional[List[SSHConnectionConfig]] = None,
+                           timeout: Optional[int] = None, max_parallel: Optional[int] = None,
+                           max_output_chars: int = 4000) -> Dict:
+        """在多台主机上并发执行同一命令，按相同结果分组汇总
+        
+        Args:
+            command: 要执行的命令
+            connection_ids: 已建立的连接ID
+            host_configs: 配置文件中的主机，尚未连接的主机在执行前按需并发连接
+            timeout: 每台主机的总超时时间（秒），包括按需连接的时间
+            max_parallel: 同时处理的主机数上限，默认为配置中的execute_many_parallelism
+            max_output_chars: 每组stdout/stderr保留的最大字符数
+        
+        Returns:
+            包含汇总计数、groups（相同退出码和输出的主机归为一组）和durations（按连接ID的耗时）的字典
+        """
+        timeout = timeout or self.config.default_timeout
+        max_parallel = max(1, max_parallel or self.config.execute_many_parallelism)
+        
+        # 目标去重：(显示名称, 连接ID, 用于按需连接的配置)
+        targets = {}
+        for connection_id in connection_ids or []:
+            targets.setdefault(connection_id, (connection_id, None))
+        for host_config in host_configs or []:
+            connection_id = self.generate_connection_id(host_config.host, host_config.username, host_config.port)
+            targets.setdefault(connection_id, (host_config.name, host_config))
+        
+        if not targets:
+            raise Exception(f"{ERROR_MESSAGES['invalid_parameter']}: 没有指定目标主机")
+        
+        semaphore = asyncio.Semaphore(max_parallel)
+        connected_lazily = []
+        # 按连接ID记录每台主机的耗时，显示名称可能重复
+        durations: Dict[str, float] = {}
+        
+        async def run_on_host(connection_id: str, host_config: Optional[SSHConnectionConfig]) -> Dict:
+            async with semaphore:
+                # 在拿到名额后计时，duration不包含排队等待的时间
+                host_started = time.monotonic()
+                try:
+                    return await asyncio.wait_for(run_host_command(connection_id, host_config), timeout)
+                except asyncio.TimeoutError:
+                    return {"exit_code": None, "stdout": "", "stderr": "", "error": f"{ERROR_MESSAGES['timeout']}（{timeout}秒）"}
+                except Exception as e:
+                    return {"exit_code": None, "stdout": "", "stderr": "", "error": str(e)}
+                finally:
+                    durations[connection_id] = round(time.monotonic() - host_started, 3)
+        
+        async def run_host_command(connection_id: str, host_config: Optional[SSHConnectionConfig]) -> Dict:
+            connection = self.connections.get(connection_id)
+            if connection is not None and connection.status != ConnectionStatus.CONNECTED:
+                await self._wait_reconnect(connection_id)
+            if connection is None or connection.status != ConnectionStatus.CONNECTED:
+                if host_config is None:
+                    error = ERROR_MESSAGES["connection_not_found"] if connection is None else "连接未建立"
+                    return {"exit_code": None, "stdout": "", "stderr": "", "error": error}
+                error = await self._connect_config_host(host_config)
+                if error:
+                    return {"exit_code": None, "stdout": "", "stderr": "",
+                            "error": f"{ERROR_MESSAGES['connection_failed']}: {error}"}
+                connection = self.connections[connection_id]
+                connected_lazily.append(connection_id)
+            exit_code, stdout, stderr = await connection.execute_command(command, timeout)
+            if exit_code == -1:
+                # -1表示连接断开或channel打开失败等连接层错误，命令未正常结束，归入errors而不是failed
+                return {"exit_code": None, "stdout": stdout, "stderr": "", "error": stderr or "命令执行失败"}
+            return {"exit_code": exit_code, "stdout": stdout, "stderr": stderr, "error": None}
+        
+        started = time.monotonic()
+        labels = [label for label, _ in targets.values()]
+        outcomes = await asyncio.gather(*(
+            run_on_host(connection_id, host_config)
+            for connection_id, (_, host_config) in targets.items()
+        ))
+        
+        # 退出码和输出完全相同的主机归为一组
+        groups: Dict[Tuple, Dict] = {}
+        for label, outcome in zip(labels, outcomes):
+            key = (outcome["exit_code"], outcome["stdout"], outcome["stderr"], outcome["error"])
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {
+                    "hosts": [],
+                    "exit_code": outcome["exit_code"],
+                    "stdout": outcome["stdout"][:max_output_chars],
+                    "stderr": outcome["stderr"][:max_output_chars],
+                    "truncated": max(len(outcome["stdout"]), len(outcome["stderr"])) > max_output_chars,
+                    "error": outcome["error"]
+                }
+            group["hosts"].append(label)
+        
+        succeeded = sum(1 for outcome in outcomes if outcome["exit_code"] == 0)
+        errors = sum(1 for outcome in outcomes if outcome["error"] is not None)
+        elapsed = time.monotonic() - started
+        result = {
+            "success": succeeded == len(outcomes),
+            "command": command,
+            "total": len(outcomes),
+            "succeeded": succeeded,
+            "failed": len(outcomes) - succeeded - errors,
+            "errors": errors,
+            "connected": connected_lazily,
+            "groups": sorted(groups.values(), key=lambda group: (group["exit_code"] != 0, -len(group["hosts"]))),
+            "durations": durations,
+            "elapsed": round(elapsed, 3)
+        }
+        logger.info(f"批量执行命令完成: {len(outcomes)} 台主机, 成功 {succeeded}, 分组 {len(groups)}, 耗时 {elapsed:.2f}秒")
+        return result
+    
     async def disconnect_all(self):
         """断开所有连接"""
         for connection_id in list(self.connections.keys()):
@@ -589,67 +2202,153 @@ class SSHManager:
             connection_id=connection_id,
             command=command,
             status=CommandStatus.RUNNING,
-            start_time=time.time()
+            start_time=time.time(),
+            stdout_buffer=self._new_output_buffer(command_id, "stdout"),
+            stderr_buffer=self._new_output_buffer(command_id, "stderr")
         )
         
         try:
-            # 在线程池中执行命令
+            # 在线程池中执行命令
+            loop = asyncio.get_event_loop()
+            stdin, stdout, stderr = await loop.run_in_executor(
+                self.executors.command, lambda: connection.client.exec_command(command)
+            )
+            
+            async_cmd.process = stdout.channel
+            self.async_commands[command_id] = async_cmd
+            
+            # 注册事件驱动的输出读取器（不支持时回退到轮询）
+            self._register_command_reader(command_id, async_cmd)
+            
+            logger.info(f"异步命令已启动: {command_id} ({command})")
+            return command_id
+            
+        except Exception as e:
+            async_cmd.status = CommandStatus.FAILED
+            async_cmd.end_time = time.time()
+            async_cmd.close_buffers()
+            raise Exception(f"启动异步命令失败: {str(e)}")
+    
+    def _new_output_buffer(self, command_id: str, stream: str) -> OutputRingBuffer:
+        """按配置创建异步命令的输出缓冲区"""
+        spill_path = None
+        spill_dir = self.config.async_output_spill_dir
+        if spill_dir:
+            try:
+                os.makedirs(spill_dir, exist_ok=True)
+                spill_path = os.path.join(spill_dir, f"{command_id}.{stream}.log")
+            except OSError as e:
+                logger.warning(f"无法创建输出落盘目录 {spill_dir}: {e}")
+        return OutputRingBuffer(self.config.async_output_buffer_size, spill_path)
+    
+    def _register_command_reader(self, command_id: str, async_cmd: AsyncCommand):
+        """在事件循环上监听命令channel的可读事件
+        
+        paramiko的Channel.fileno()返回一个在stdout/stderr有数据或EOF时变为可读的管道，
+        因此可以直接交给事件循环的add_reader，没有输出时不产生任何开销。
+        """
+        loop = asyncio.get_event_loop()
+        try:
+            fd = async_cmd.process.fileno()
+            loop.add_reader(fd, self._on_command_readable, command_id)
+            self._command_readers[command_id] = fd
+        except (NotImplementedError, AttributeError, ValueError, TypeError) as e:
+            # 例如Windows的Proactor事件循环不支持add_reader
+            logger.debug(f"无法注册事件驱动读取器，回退到轮询: {command_id}, {e}")
+            if self._output_monitor_task is None or self._output_monitor_task.done():
+                self._output_monitor_task = asyncio.create_task(self._monitor_command_outputs())
+    
+    def _unregister_command_reader(self, command_id: str):
+        """移除命令channel的可读事件监听"""
+        fd = self._command_readers.pop(command_id, None)
+        if fd is None:
+            return
+        try:
+            asyncio.get_event_loop().remove_reader(fd)
+        except Exception as e:
+            logger.debug(f"移除读取器失败 {command_id}: {e}")
+    
+    def _on_command_readable(self, command_id: str):
+        """channel可读时由事件循环回调，立即把数据写入缓冲区"""
+        async_cmd = self.async_commands.get(command_id)
+        if not async_cmd or async_cmd.status != CommandStatus.RUNNING or not async_cmd.process:
+            self._unregister_command_reader(command_id)
+            return
+        
+        if self._drain_command_output(command_id, async_cmd):
+            self._unregister_command_reader(command_id)
+        elif ((async_cmd.process.eof_received or async_cmd.process.closed)
+              and not (async_cmd.process.recv_ready() or async_cmd.process.recv_stderr_ready())):
+            # 已收到EOF但退出码尚未到达：管道会一直保持可读，
+            # 移除监听并在线程池中等待退出码，避免空转
+            self._unregister_command_reader(command_id)
+            asyncio.get_event_loop().create_task(self._await_command_exit(command_id, async_cmd))
+    
+    async def _await_command_exit(self, command_id: str, async_cmd: AsyncCommand):
+        """等待已收到EOF的命令返回退出码"""
+        try:
             loop = asyncio.get_event_loop()
-            stdin, stdout, stderr = await loop.run_in_executor(
-                None, lambda: connection.client.exec_command(command)
-            )
-            
-            async_cmd.process = stdout.channel
-            self.async_commands[command_id] = async_cmd
-            
-            # 启动输出监控任务
-            if self._output_monitor_task is None:
-                self._output_monitor_task = asyncio.create_task(self._monitor_command_outputs())
-            
-            logger.info(f"异步命令已启动: {command_id} ({command})")
-            return command_id
-            
+            await loop.run_in_executor(self.executors.command, async_cmd.process.recv_exit_status)
         except Exception as e:
-            async_cmd.status = CommandStatus.FAILED
-            async_cmd.end_time = time.time()
-            raise Exception(f"启动异步命令失败: {str(e)}")
+            logger.debug(f"等待命令退出码失败 {command_id}: {e}")
+        while async_cmd.status == CommandStatus.RUNNING and not self._drain_command_output(command_id, async_cmd):
+            await asyncio.sleep(0)
     
     async def _monitor_command_outputs(self):
-        """监控所有运行中命令的输出"""
+        """轮询方式监控命令输出（仅在事件循环不支持add_reader时使用）"""
         while self._running and self.async_commands:
-            tasks = []
-            for command_id, async_cmd in self.async_commands.items():
-                if async_cmd.status == CommandStatus.RUNNING and async_cmd.process:
-                    tasks.append(self._collect_command_output(command_id, async_cmd))
-            
-            if tasks:
-                await asyncio.gather(*tasks, return_exceptions=True)
+            for command_id, async_cmd in list(self.async_commands.items()):
+                if (async_cmd.status == CommandStatus.RUNNING and async_cmd.process
+                        and command_id not in self._command_readers):
+                    self._drain_command_output(command_id, async_cmd)
             
             await asyncio.sleep(0.1)  # 每100ms检查一次
     
     async def _collect_command_output(self, command_id: str, async_cmd: AsyncCommand):
         """收集单个命令的输出"""
+        if self._drain_command_output(command_id, async_cmd):
+            self._unregister_command_reader(command_id)
+    
+    def _read_command_streams(self, async_cmd: AsyncCommand, limit: Optional[int] = None) -> bool:
+        """读取channel中当前已到达的stdout/stderr数据（不阻塞）
+        
+        limit为每个流本次最多读取的字节数，为空时读完为止；
+        输出极快的命令（如yes）会一直有数据到达，限制读取量避免长时间占用事件循环。
+        
+        Returns:
+            是否还有数据留待下次读取
+        """
+        channel = async_cmd.process
+        pending = False
+        for ready, recv, buffer in ((channel.recv_ready, channel.recv, async_cmd.stdout_buffer),
+                                    (channel.recv_stderr_ready, channel.recv_stderr, async_cmd.stderr_buffer)):
+            drained = 0
+            while ready():
+                if limit is not None and drained >= limit:
+                    pending = True
+                    break
+                data = recv(32768)
+                if not data:
+                    break
+                buffer.append(data)
+                drained += len(data)
+        return pending
+    
+    def _drain_command_output(self, command_id: str, async_cmd: AsyncCommand) -> bool:
+        """把已到达的输出写入缓冲区，命令结束时更新状态
+        
+        Returns:
+            命令是否已经结束
+        """
+        if async_cmd.status != CommandStatus.RUNNING or not async_cmd.process:
+            return True
+        
         try:
-            if async_cmd.process and async_cmd.process.recv_ready():
-                # 读取stdout
-                while async_cmd.process.recv_ready():
-                    data = async_cmd.process.recv(4096)
-                    if data:
-                        text = data.decode('utf-8', errors='replace')
-                        async_cmd.stdout_buffer.append(text)
-                        async_cmd.stdout_size += len(text)
-            
-            if async_cmd.process and async_cmd.process.recv_stderr_ready():
-                # 读取stderr
-                while async_cmd.process.recv_stderr_ready():
-                    data = async_cmd.process.recv_stderr(4096)
-                    if data:
-                        text = data.decode('utf-8', errors='replace')
-                        async_cmd.stderr_buffer.append(text)
-                        async_cmd.stderr_size += len(text)
+            # 超出单次读取上限的数据留给下一次可读事件，此时命令即使已退出也暂不结束
+            pending = self._read_command_streams(async_cmd, self.config.interactive_drain_limit)
             
             # 检查命令是否完成
-            if async_cmd.process and async_cmd.process.exit_status_ready():
+            if not pending and async_cmd.process.exit_status_ready():
                 exit_code = async_cmd.process.recv_exit_status()
                 async_cmd.exit_code = exit_code
                 async_cmd.end_time = time.time()
@@ -659,35 +2358,41 @@ class SSHManager:
                 else:
                     async_cmd.status = CommandStatus.FAILED
                 
-                # 读取剩余输出（不再递归调用）
+                # 读取剩余输出
                 try:
-                    if async_cmd.process.recv_ready():
-                        while async_cmd.process.recv_ready():
-                            data = async_cmd.process.recv(4096)
-                            if data:
-                                text = data.decode('utf-8', errors='replace')
-                                async_cmd.stdout_buffer.append(text)
-                                async_cmd.stdout_size += len(text)
-                    
-                    if async_cmd.process.recv_stderr_ready():
-                        while async_cmd.process.recv_stderr_ready():
-                            data = async_cmd.process.recv_stderr(4096)
-                            if data:
-                                text = data.decode('utf-8', errors='replace')
-                                async_cmd.stderr_buffer.append(text)
-                                async_cmd.stderr_size += len(text)
-                except:
+                    self._read_command_streams(async_cmd)
+                except Exception:
                     pass  # 忽略读取剩余输出时的错误
+                async_cmd.close_buffers()
                 
                 logger.info(f"异步命令完成: {command_id} (退出码: {exit_code})")
+                return True
+            
+            return False
                 
         except Exception as e:
             logger.error(f"收集命令输出时出错 {command_id}: {e}")
             async_cmd.status = CommandStatus.FAILED
             async_cmd.end_time = time.time()
+            async_cmd.close_buffers()
+            return True
     
-    async def get_command_status(self, command_id: str) -> Dict:
-        """获取异步命令状态和最新输出"""
+    async def get_command_status(self, command_id: str, offset: Optional[int] = None,
+                                 stderr_offset: Optional[int] = None,
+                                 tail_bytes: Optional[int] = None,
+                                 head_bytes: Optional[int] = None) -> Dict:
+        """获取异步命令状态和最新输出
+        
+        Args:
+            command_id: 异步命令ID
+            offset: stdout起始字节序号，只返回该位置之后的输出
+            stderr_offset: stderr起始字节序号
+            tail_bytes: 每个流只返回最后N字节
+            head_bytes: 每个流从起始位置最多返回N字节
+            
+        不传任何游标参数时返回缓冲区中的全部输出；返回值中的 next_offset /
+        next_stderr_offset 可作为下一次调用的游标。
+        """
         if command_id not in self.async_commands:
             return {
                 "status": "not_found",
@@ -700,6 +2405,9 @@ class SSHManager:
         if async_cmd.status == CommandStatus.RUNNING:
             await self._collect_command_output(command_id, async_cmd)
         
+        stdout_window = async_cmd.stdout_buffer.read(offset, head_bytes, tail_bytes)
+        stderr_window = async_cmd.stderr_buffer.read(stderr_offset, head_bytes, tail_bytes)
+        
         return {
             "command_id": command_id,
             "connection_id": async_cmd.connection_id,
@@ -711,8 +2419,18 @@ class SSHManager:
             "exit_code": async_cmd.exit_code,
             "stdout_size": async_cmd.stdout_size,
             "stderr_size": async_cmd.stderr_size,
-            "stdout": "".join(async_cmd.stdout_buffer),
-            "stderr": "".join(async_cmd.stderr_buffer)
+            "stdout_dropped": async_cmd.stdout_buffer.dropped_bytes,
+            "stderr_dropped": async_cmd.stderr_buffer.dropped_bytes,
+            "stdout_log": async_cmd.stdout_buffer.spill_path,
+            "stderr_log": async_cmd.stderr_buffer.spill_path,
+            "stdout": stdout_window["data"].decode('utf-8', errors='replace'),
+            "stderr": stderr_window["data"].decode('utf-8', errors='replace'),
+            "offset": stdout_window["offset"],
+            "stderr_offset": stderr_window["offset"],
+            "next_offset": stdout_window["next_offset"],
+            "next_stderr_offset": stderr_window["next_offset"],
+            "stdout_skipped": stdout_window["skipped_bytes"],
+            "stderr_skipped": stderr_window["skipped_bytes"]
         }
     
     async def list_async_commands(self) -> Dict[str, Dict]:
@@ -744,10 +2462,13 @@ class SSHManager:
         
         try:
             if async_cmd.process:
+                # 先移除读取器，再关闭channel（关闭会释放其fileno管道）
+                self._unregister_command_reader(command_id)
                 # 使用close()方法来终止SSH通道
                 async_cmd.process.close()
                 async_cmd.status = CommandStatus.TERMINATED
                 async_cmd.end_time = time.time()
+                async_cmd.close_buffers()
                 logger.info(f"异步命令已终止: {command_id}")
                 return True
         except Exception as e:
@@ -766,8 +2487,11 @@ class SSHManager:
                 and current_time - async_cmd.end_time > max_age):
                 to_remove.append(command_id)
         
+        loop = asyncio.get_event_loop()
         for command_id in to_remove:
-            del self.async_commands[command_id]
+            async_cmd = self.async_commands.pop(command_id)
+            # 删除输出落盘文件，避免已清理命令的日志在磁盘上无限累积
+            await loop.run_in_executor(self.executors.housekeeping, async_cmd.close_buffers, True)
             logger.info(f"清理已完成的命令: {command_id}")
         
         return len(to_remove)
@@ -777,6 +2501,7 @@ class SSHManager:
         if self._health_check_task:
             return
         
+        self._health_check_interval = interval
         self._health_check_task = asyncio.create_task(self._health_check_loop(interval))
         logger.info("连接健康检查任务已启动")
     
@@ -796,6 +2521,7 @@ class SSHManager:
         if self._keepalive_task:
             return
         
+        self._keepalive_interval = interval
         self._keepalive_task = asyncio.create_task(self._keepalive_loop(interval))
         logger.info("SSH keep-alive任务已启动")
     
@@ -811,47 +2537,241 @@ class SSHManager:
             logger.info("SSH keep-alive任务已停止")
     
     async def _keepalive_loop(self, interval: int):
-        """keep-alive循环"""
+        """keep-alive循环：休眠到最早到期的连接，再对到期连接批量发送"""
         while self._running:
             try:
-                await asyncio.sleep(interval)
+                await asyncio.sleep(self._seconds_until_due("keepalive", interval))
                 await self._send_keepalive_to_all_connections()
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"keep-alive循环出错: {e}")
     
-    async def _send_keepalive_to_all_connections(self):
-        """向所有活跃连接发送keep-alive信号"""
-        for connection_id, connection in self.connections.items():
-            if connection.status == ConnectionStatus.CONNECTED:
-                if not await connection.send_keepalive():
-                    logger.debug(f"keep-alive失败，连接可能已断开: {connection_id}")
+    def _due_at(self, kind: str, connection: SSHConnection, interval: float) -> float:
+        """连接下次需要探测的时间：最近有通信的连接顺延到通信后一个间隔"""
+        scheduled = connection.next_health_check if kind == "health_check" else connection.next_keepalive
+        return max(scheduled, connection.last_activity + interval)
+    
+    def _schedule_next(self, kind: str, connection: SSHConnection, interval: float, now: float):
+        """按间隔加随机抖动安排下次探测，避免所有连接在同一时刻探测"""
+        jitter = self.config.health_check_jitter
+        next_due = now + interval * (1 + random.uniform(-jitter, jitter))
+        if kind == "health_check":
+            connection.next_health_check = next_due
+        else:
+            connection.next_keepalive = next_due
+    
+    def _seconds_until_due(self, kind: str, interval: float) -> float:
+        """距离最早到期连接的秒数，限制在[1, interval]之间"""
+        now = time.monotonic()
+        due_times = [
+            self._due_at(kind, connection, interval) for connection in self.connections.values()
+            if connection.status == ConnectionStatus.CONNECTED
+        ]
+        if not due_times:
+            return interval
+        return min(max(min(due_times) - now, 1), interval)
+    
+    def _due_connections(self, kind: str, interval: float, force: bool) -> List[Tuple[str, SSHConnection]]:
+        now = time.monotonic()
+        return [
+            (connection_id, connection) for connection_id, connection in list(self.connections.items())
+            if connection.status == ConnectionStatus.CONNECTED
+            and (force or self._due_at(kind, connection, interval) <= now)
+        ]
+    
+    async def _run_sweep(self, kind: str, targets: List[Tuple[str, SSHConnection]],
+                         probe, interval: float) -> Dict[str, Dict]:
+        """对一批连接并发执行探测，受并发上限和单连接超时约束，结果写入指标"""
+        semaphore = asyncio.Semaphore(max(1, self.config.health_check_concurrency))
+        timeout = self.config.health_check_timeout
+        
+        async def run(connection_id: str, connection: SSHConnection):
+            async with semaphore:
+                started = time.monotonic()
+                try:
+                    ok = await asyncio.wait_for(probe(connection), timeout)
+                    error = None if ok else (connection.error_message or "探测失败")
+                except asyncio.TimeoutError:
+                    ok, error = False, f"{ERROR_MESSAGES['timeout']}（{timeout}秒）"
+                except Exception as e:
+                    ok, error = False, str(e)
+                finished = time.monotonic()
+                self._schedule_next(kind, connection, interval, finished)
+                return connection_id, {
+                    "ok": ok,
+                    "error": error,
+                    "elapsed": round(finished - started, 3),
+                    "checked_at": time.time()
+                }
+        
+        sweep_started = time.monotonic()
+        results = dict(await asyncio.gather(*(run(connection_id, connection) for connection_id, connection in targets)))
+        duration = time.monotonic() - sweep_started
+        
+        metrics = self.health_metrics[kind]
+        metrics["sweeps"] += 1
+        metrics["last_sweep_at"] = time.time()
+        metrics["last_sweep_duration"] = round(duration, 3)
+        metrics["max_sweep_duration"] = round(max(metrics["max_sweep_duration"], duration), 3)
+        metrics["last_sweep_hosts"] = len(targets)
+        metrics["hosts"].update(results)
+        if targets:
+            failed = sum(1 for result in results.values() if not result["ok"])
+            logger.debug(f"{kind}完成: {len(targets)} 个连接, 失败 {failed}, 耗时 {duration:.2f}秒")
+        return results
+    
+    async def _send_keepalive_to_all_connections(self, force: bool = False):
+        """向到期的活跃连接并发发送keep-alive信号，force为True时忽略调度"""
+        interval = self._keepalive_interval
+        targets = self._due_connections("keepalive", interval, force)
+        results = await self._run_sweep("keepalive", targets, lambda connection: connection.send_keepalive(), interval)
+        for connection_id, result in results.items():
+            if not result["ok"]:
+                logger.debug(f"keep-alive失败，连接可能已断开: {connection_id} ({result['error']})")
     
     async def _health_check_loop(self, interval: int):
-        """健康检查循环"""
+        """健康检查循环：休眠到最早到期的连接，再对到期连接批量检查"""
         while self._running:
             try:
-                await asyncio.sleep(interval)
+                await asyncio.sleep(self._seconds_until_due("health_check", interval))
                 await self._check_all_connections()
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"健康检查循环出错: {e}")
     
-    async def _check_all_connections(self):
-        """检查所有连接的健康状态"""
-        disconnected_connections = []
+    async def _check_all_connections(self, force: bool = False):
+        """并发检查到期连接的健康状态，force为True时检查所有连接"""
+        interval = self._health_check_interval
+        
+        async def probe(connection: SSHConnection) -> bool:
+            if not await connection.ensure_alive():
+                return False
+            # 顺带回收空闲超时的SFTP会话
+            await connection.sftp_pool.evict_idle()
+            return True
         
-        for connection_id, connection in self.connections.items():
-            if connection.status == ConnectionStatus.CONNECTED:
-                if not await connection.is_healthy():
-                    logger.warning(f"检测到连接断开: {connection_id}")
-                    disconnected_connections.append(connection_id)
+        targets = self._due_connections("health_check", interval, force)
+        results = await self._run_sweep("health_check", targets, probe, interval)
         
-        # 清理断开的连接上的异步命令
-        for connection_id in disconnected_connections:
-            await self._cleanup_commands_on_disconnected_connection(connection_id)
+        # 清理断开的连接上的异步命令（超时的连接状态未变，下一轮再确认）
+        for connection_id, result in results.items():
+            connection = self.connections.get(connection_id)
+            if not result["ok"] and connection and connection.status != ConnectionStatus.CONNECTED:
+                logger.warning(f"检测到连接断开: {connection_id}")
+                await self._cleanup_commands_on_disconnected_connection(connection_id)
+                self._schedule_reconnect(connection_id)
+    
+    def _reconnect_delay(self, attempt: int) -> float:
+        """第attempt次失败后的退避时间：指数增长并封顶，再按jitter比例随机缩短，避免多个连接同时重试"""
+        delay = min(self.config.reconnect_max_delay, self.config.reconnect_base_delay * (2 ** attempt))
+        return delay * (1 - self.config.reconnect_jitter * random.random())
+    
+    def _schedule_reconnect(self, connection_id: str) -> Optional[asyncio.Task]:
+        """为断开的连接启动后台重连；已在重连时返回现有任务，无法重连时返回None"""
+        task = self._reconnect_tasks.get(connection_id)
+        if task is not None and not task.done():
+            return task
+        connection = self.connections.get(connection_id)
+        if (not self.config.auto_reconnect or connection is None or not connection.can_reconnect
+                or connection.status in (ConnectionStatus.CONNECTED, ConnectionStatus.CONNECTING)):
+            return None
+        task = asyncio.ensure_future(self._reconnect_loop(connection_id, connection))
+        self._reconnect_tasks[connection_id] = task
+        return task
+    
+    async def _reconnect_loop(self, connection_id: str, connection: SSHConnection) -> bool:
+        """按指数退避反复重连，直到成功、达到最大次数或连接被移除/替换"""
+        stats = self.reconnect_stats.setdefault(connection_id, {
+            "reconnects": 0, "gave_up": 0, "attempts": 0,
+            "last_error": None, "last_reconnect_at": None, "next_attempt_at": None
+        })
+        stats["attempts"] = 0
+        max_attempts = self.config.reconnect_max_attempts
+        try:
+            while self.connections.get(connection_id) is connection:
+                stats["attempts"] += 1
+                if await connection.reconnect():
+                    stats["reconnects"] += 1
+                    stats["last_error"] = None
+                    stats["last_reconnect_at"] = time.time()
+                    stats["next_attempt_at"] = None
+                    return True
+                stats["last_error"] = connection.error_message
+                if max_attempts and stats["attempts"] >= max_attempts:
+                    stats["gave_up"] += 1
+                    stats["next_attempt_at"] = None
+                    logger.error(f"自动重连放弃: {connection_id}，已尝试{stats['attempts']}次")
+                    return False
+                delay = self._reconnect_delay(stats["attempts"] - 1)
+                stats["next_attempt_at"] = time.time() + delay
+                logger.info(f"{delay:.1f}秒后重试连接: {connection_id}")
+                await asyncio.sleep(delay)
+            return False
+        finally:
+            if self._reconnect_tasks.get(connection_id) is asyncio.current_task():
+                del self._reconnect_tasks[connection_id]
+    
+    async def _wait_reconnect(self, connection_id: str) -> bool:
+        """等待后台重连完成，最多等待reconnect_command_wait秒，返回连接是否已恢复"""
+        task = self._schedule_reconnect(connection_id)
+        if task is None or self.config.reconnect_command_wait <= 0:
+            return False
+        try:
+            # shield：等待超时不取消重连任务本身
+            return await asyncio.wait_for(asyncio.shield(task), self.config.reconnect_command_wait)
+        except asyncio.TimeoutError:
+            logger.warning(f"等待重连超时: {connection_id}")
+            return False
+    
+    async def _cancel_reconnect(self, connection_id: str):
+        task = self._reconnect_tasks.pop(connection_id, None)
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    
+    def get_reconnect_status(self, connection_id: str) -> Dict:
+        """自动重连状态：是否正在重连、本轮尝试次数、最近错误和累计成功次数"""
+        task = self._reconnect_tasks.get(connection_id)
+        return dict(
+            self.reconnect_stats.get(connection_id, {"reconnects": 0, "gave_up": 0, "attempts": 0}),
+            in_progress=task is not None and not task.done()
+        )
+    
+    def get_transport_stats(self, connection_id: Optional[str] = None) -> Dict:
+        """获取每个连接各传输层的channel占用和利用率，不指定连接时返回所有连接"""
+        if connection_id is not None and connection_id not in self.connections:
+            raise Exception(ERROR_MESSAGES["connection_not_found"])
+        connection_ids = [connection_id] if connection_id else list(self.connections)
+        return {cid: self.connections[cid].channel_scheduler.stats() for cid in connection_ids}
+    
+    def get_executor_stats(self) -> Dict:
+        """各工作负载线程池的排队深度、饱和次数和等待时间"""
+        return self.executors.stats()
+    
+    def get_health_metrics(self) -> Dict:
+        """健康检查和keep-alive的扫描耗时、每个连接的最近结果和下次计划时间"""
+        now = time.monotonic()
+        metrics = {}
+        for kind, interval in (("health_check", self._health_check_interval),
+                               ("keepalive", self._keepalive_interval)):
+            entry = dict(self.health_metrics[kind], interval=interval)
+            entry["hosts"] = {
+                connection_id: dict(
+                    result,
+                    next_due_in=round(self._due_at(kind, self.connections[connection_id], interval) - now, 1)
+                    if connection_id in self.connections else None
+                )
+                for connection_id, result in self.health_metrics[kind]["hosts"].items()
+            }
+            metrics[kind] = entry
+        metrics["concurrency"] = self.config.health_check_concurrency
+        metrics["timeout"] = self.config.health_check_timeout
+        return metrics
     
     async def _cleanup_commands_on_disconnected_connection(self, connection_id: str):
         """清理断开连接上的异步命令"""
@@ -894,6 +2814,16 @@ class SSHManager:
             except asyncio.CancelledError:
                 pass
         
+        if self._auto_connect_task and not self._auto_connect_task.done():
+            self._auto_connect_task.cancel()
+            try:
+                await self._auto_connect_task
+            except asyncio.CancelledError:
+                pass
+        
+        for connection_id in list(self._reconnect_tasks):
+            await self._cancel_reconnect(connection_id)
+        
         await self.stop_health_check()
         await self.stop_keepalive()
         
@@ -907,6 +2837,7 @@ class SSHManager:
         
         # 断开所有连接
         await self.disconnect_all()
+        self.executors.shutdown()
 
     # ==================== 交互式会话管理 ====================
     
@@ -948,15 +2879,15 @@ class SSHManager:
             
             self.interactive_sessions[session_id] = session
             
-            # 如果提供了初始命令，发送它
-            if command:
-                await asyncio.sleep(0.5)  # 等待shell准备就绪
-                await self.send_input_to_session(session_id, command + '\n')
-            
             # 启动交互式会话监控任务
-            if self._interactive_monitor_task is None:
+            if self._interactive_monitor_task is None or self._interactive_monitor_task.done():
                 self._interactive_monitor_task = asyncio.create_task(self._monitor_interactive_sessions())
             
+            # 如果提供了初始命令，等shell输出提示符并安静下来后再发送（最多0.5秒）
+            if command:
+                await self.wait_interactive_output(session_id, offset=0, idle_ms=100, timeout=0.5)
+                await self.send_input_to_session(session_id, command + '\n')
+            
             logger.info(f"交互式会话已启动: {session_id} ({command or 'shell'})")
             return session_id
             
@@ -988,8 +2919,15 @@ class SSHManager:
             raise Exception(f"发送输入失败: {str(e)}")
     
     async def get_interactive_output(self, session_id: str, since_time: float = None, 
-                                   max_lines: int = None) -> Dict:
-        """获取交互式会话输出"""
+                                   max_lines: int = None, offset: Optional[int] = None) -> Dict:
+        """获取交互式会话输出
+        
+        Args:
+            session_id: 交互式会话ID
+            since_time: 只返回该时间戳之后到达的输出
+            max_lines: 未指定游标时最多返回的行数
+            offset: 起始字符序号（上次返回的next_offset），精确返回之后的全部输出
+        """
         if session_id not in self.interactive_sessions:
             return {
                 "status": "not_found",
@@ -999,16 +2937,14 @@ class SSHManager:
         session = self.interactive_sessions[session_id]
         
         # 获取输出数据
-        if since_time is not None:
-            # 过滤指定时间之后的输出（简化实现，实际可能需要更精确的时间戳）
-            output_lines = session.output_buffer[-100:] if session.output_buffer else []
-        else:
-            output_lines = session.output_buffer
+        window = session.output_log.read(offset=offset, since_time=since_time)
+        output_text = window["text"]
         
-        if max_lines and len(output_lines) > max_lines:
-            output_lines = output_lines[-max_lines:]
-        
-        output_text = ''.join(output_lines)
+        # 指定游标时必须返回游标之后的完整输出，不再按行截断
+        if offset is None and max_lines:
+            lines = output_text.splitlines(keepends=True)
+            if len(lines) > max_lines:
+                output_text = ''.join(lines[-max_lines:])
         
         return {
             "status": session.status.value,
@@ -1016,6 +2952,9 @@ class SSHManager:
             "connection_id": session.connection_id,
             "initial_command": session.initial_command,
             "output": output_text,
+            "offset": window["offset"],
+            "next_offset": window["next_offset"],
+            "skipped": window["skipped"],
             "output_size": session.output_size,
             "last_output_time": session.last_output_time,
             "start_time": session.start_time,
@@ -1025,6 +2964,83 @@ class SSHManager:
             "channel_closed": session.channel.closed if session.channel else True
         }
     
+    async def wait_interactive_output(self, session_id: str, offset: Optional[int] = None,
+                                    pattern: Optional[str] = None, idle_ms: Optional[int] = None,
+                                    timeout: float = 30.0) -> Dict:
+        """在服务端等待交互式会话输出
+        
+        阻塞直到满足以下任一条件：
+        - 未指定pattern和idle_ms时，游标之后出现了新输出
+        - 游标之后的输出匹配正则表达式pattern（如shell提示符）
+        - 游标之后有输出且已安静idle_ms毫秒
+        - 会话结束或超时
+        
+        Args:
+            session_id: 交互式会话ID
+            offset: 起始输出序号，默认为当前输出末尾（即只等待新输出）
+            pattern: 要等待的正则表达式
+            idle_ms: 输出安静多少毫秒后返回
+            timeout: 最长等待秒数
+            
+        Returns:
+            与get_interactive_output相同的结果，附加wait_reason和waited字段
+        """
+        if session_id not in self.interactive_sessions:
+            return {
+                "status": "not_found",
+                "message": "交互式会话不存在"
+            }
+        
+        session = self.interactive_sessions[session_id]
+        regex = re.compile(pattern) if pattern else None
+        if offset is None:
+            offset = session.output_log.total_chars
+        
+        loop = asyncio.get_event_loop()
+        started = loop.time()
+        deadline = started + max(timeout, 0)
+        reason = "timeout"
+        
+        async with session.output_condition:
+            while True:
+                text = session.output_log.read(offset=offset)["text"]
+                quiet_for = time.time() - session.last_output_time
+                
+                if regex and regex.search(text):
+                    reason = "pattern"
+                    break
+                if idle_ms is not None and text and quiet_for * 1000 >= idle_ms:
+                    reason = "idle"
+                    break
+                if regex is None and idle_ms is None and text:
+                    reason = "output"
+                    break
+                if session.status not in [InteractiveStatus.ACTIVE, InteractiveStatus.WAITING_INPUT]:
+                    reason = "session_ended"
+                    break
+                
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                # 等待安静期时，即使没有新输出也要在安静期结束时醒来
+                wait_time = remaining
+                if idle_ms is not None and text:
+                    wait_time = min(remaining, idle_ms / 1000 - quiet_for)
+                try:
+                    await asyncio.wait_for(session.output_condition.wait(), max(wait_time, 0.001))
+                except asyncio.TimeoutError:
+                    pass
+        
+        result = await self.get_interactive_output(session_id, offset=offset)
+        result["wait_reason"] = reason
+        result["waited"] = loop.time() - started
+        return result
+    
+    async def _notify_output_waiters(self, session: InteractiveSession):
+        """唤醒等待该会话输出的协程"""
+        async with session.output_condition:
+            session.output_condition.notify_all()
+    
     async def list_interactive_sessions(self) -> Dict[str, Dict]:
         """列出所有交互式会话"""
         result = {}
@@ -1054,6 +3070,7 @@ class SSHManager:
             
             session.status = InteractiveStatus.TERMINATED
             session.end_time = time.time()
+            await self._notify_output_waiters(session)
             
             logger.info(f"交互式会话已终止: {session_id}")
             return True
@@ -1084,37 +3101,543 @@ class SSHManager:
                 if session.status == InteractiveStatus.ACTIVE and session.channel:
                     tasks.append(self._collect_interactive_output(session_id, session))
             
+            pending = False
             if tasks:
-                await asyncio.gather(*tasks, return_exceptions=True)
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+                pending = any(result is True for result in results)
             
-            await asyncio.sleep(0.1)  # 每100ms检查一次
+            # 有会话达到单次读取上限时只让出事件循环，下一轮立即继续读取；否则每100ms检查一次
+            await asyncio.sleep(0 if pending else 0.1)
+    
+    async def _collect_interactive_output(self, session_id: str, session: InteractiveSession) -> bool:
+        """收集单个交互式会话的输出
+        
+        每次唤醒最多读取interactive_drain_limit字节，避免输出极快的会话长时间占用事件循环；
+        返回True表示达到上限后channel中仍有数据
+        """
+        changed = False
+        pending = False
+        try:
+            if session.channel and not session.channel.closed:
+                # 读取已到达的数据，直到读空或达到单次上限
+                read_size = self.config.interactive_read_size
+                drain_limit = max(read_size, self.config.interactive_drain_limit)
+                pieces = []
+                drained = 0
+                while drained < drain_limit and session.channel.recv_ready():
+                    data = session.channel.recv(read_size)
+                    if not data:
+                        break
+                    drained += len(data)
+                    pieces.append(session.decoder.decode(data))
+                pending = drained >= drain_limit and session.channel.recv_ready()
+                
+                # 检查channel是否已关闭（剩余数据读完之前不结束会话）
+                exited = not pending and session.channel.exit_status_ready()
+                if exited:
+                    pieces.append(session.decoder.decode(b'', final=True))
+                
+                text = ''.join(pieces)
+                if text:
+                    session.add_output(text)
+                    changed = True
+                
+                if exited:
+                    session.status = InteractiveStatus.COMPLETED
+                    session.end_time = time.time()
+                    changed = True
+                    logger.info(f"交互式会话已完成: {session_id}")
+                    
+        except Exception as e:
+            logger.error(f"收集交互式会话输出失败: {session_id}, 错误: {str(e)}")
+            session.status = InteractiveStatus.FAILED
+            session.end_time = time.time()
+            changed = True
+            pending = False
+        
+        if changed:
+            await self._notify_output_waiters(session)
+        return pending
+    
+    # SFTP 功能
+    async def upload_file(self, connection_id: str, local_path: str, remote_path: str, 
+                         progress_callback: Optional[callable] = None,
+                         parallel: bool = False, chunk_size: Optional[int] = None,
+                         concurrency: Optional[int] = None, resume: bool = False,
+                         verify_hash: bool = False) -> Dict:
+        """上传文件到远程服务器
+        
+        默认使用sftp put整体上传；parallel为True且文件大于一个分块时按字节范围通过多个SFTP会话并行上传。
+        resume为True时从上次中断处继续，verify_hash为True时续传前先比对两端已传输部分的SHA-256
+        """
+        if connection_id not in self.connections:
+            raise Exception(ERROR_MESSAGES["connection_not_found"])
+        
+        connection = self.connections[connection_id]
+        if connection.status != ConnectionStatus.CONNECTED:
+            raise Exception("连接未建立")
+        
+        chunk_size = chunk_size or self.config.sftp_transfer_chunk_size
+        concurrency = concurrency or self.config.sftp_transfer_concurrency
+        
+        try:
+            loop = asyncio.get_event_loop()
+            started = time.monotonic()
+            # 获取本地文件大小
+            local_stat = await loop.run_in_executor(self.executors.transfer, lambda: os.stat(local_path))
+            local_file_size = local_stat.st_size
+            
+            use_parallel = parallel and concurrency > 1 and local_file_size > chunk_size
+            # 并行和续传都走分块传输，逐块记录检查点
+            use_chunked = use_parallel or resume
+            
+            transfer_stats = {"chunks": 1, "workers": 1, "resumed_from": 0}
+            if use_chunked:
+                transfer_stats = await self._upload_file_chunked(
+                    connection_id, connection, local_path, remote_path, local_file_size,
+                    local_stat.st_mtime, chunk_size, concurrency if use_parallel else 1,
+                    progress_callback, resume, verify_hash
+                )
+            
+            # 从会话池借用SFTP客户端
+            async with connection.sftp_session() as sftp_client:
+                if not use_chunked:
+                    # 上传文件（put内部已使用流水线写请求）
+                    def progress_callback_wrapper(transferred, total):
+                        if progress_callback:
+                            progress_callback(transferred, total)
+                    
+                    await loop.run_in_executor(
+                        self.executors.transfer, 
+                        lambda: sftp_client.put(local_path, remote_path, callback=progress_callback_wrapper)
+                    )
+                
+                # 验证上传结果
+                remote_file_size = (await loop.run_in_executor(
+                    self.executors.transfer, lambda: sftp_client.stat(remote_path)
+                )).st_size
+            
+            elapsed = time.monotonic() - started
+            transferred = local_file_size - transfer_stats["resumed_from"]
+            result = {
+                "success": True,
+                "local_path": local_path,
+                "remote_path": remote_path,
+                "local_size": local_file_size,
+                "remote_size": remote_file_size,
+                "mode": "parallel" if use_parallel else ("chunked" if use_chunked else "single"),
+                "chunk_size": chunk_size,
+                "chunks": transfer_stats["chunks"],
+                "concurrency": transfer_stats["workers"],
+                "resumed_from": transfer_stats["resumed_from"],
+                "elapsed": round(elapsed, 3),
+                "throughput": round(transferred / elapsed, 1) if elapsed > 0 else None,
+                "message": f"文件上传成功: {local_path} -> {remote_path}"
+            }
+            
+            if local_file_size != remote_file_size:
+                result["warning"] = "文件大小不匹配，可能上传不完整"
+            
+            logger.info(f"SFTP上传成功: {local_path} -> {remote_path} ({result['mode']}, {elapsed:.2f}秒)")
+            return result
+                
+        except Exception as e:
+            error_msg = f"SFTP上传失败: {str(e)}"
+            logger.error(error_msg)
+            return {
+                "success": False,
+                "local_path": local_path,
+                "remote_path": remote_path,
+                "error": error_msg
+            }
+        finally:
+            connection.metadata_cache.invalidate(remote_path)
+    
+    async def download_file(self, connection_id: str, remote_path: str, local_path: str,
+                           progress_callback: Optional[callable] = None,
+                           parallel: bool = False, chunk_size: Optional[int] = None,
+                           concurrency: Optional[int] = None, resume: bool = False,
+                           verify_hash: bool = False) -> Dict:
+        """从远程服务器下载文件
+        
+        默认使用sftp get整体下载；parallel为True且文件大于一个分块时按字节范围通过多个SFTP会话并行下载。
+        resume为True时从上次中断处继续，verify_hash为True时续传前先比对两端已传输部分的SHA-256
+        """
+        if connection_id not in self.connections:
+            raise Exception(ERROR_MESSAGES["connection_not_found"])
+        
+        connection = self.connections[connection_id]
+        if connection.status != ConnectionStatus.CONNECTED:
+            raise Exception("连接未建立")
+        
+        chunk_size = chunk_size or self.config.sftp_transfer_chunk_size
+        concurrency = concurrency or self.config.sftp_transfer_concurrency
+        
+        try:
+            # 从会话池借用SFTP客户端
+            loop = asyncio.get_event_loop()
+            started = time.monotonic()
+            async with connection.sftp_session() as sftp_client:
+                # 获取远程文件大小
+                remote_stat = await loop.run_in_executor(
+                    self.executors.transfer, lambda: sftp_client.stat(remote_path)
+                )
+                remote_file_size = remote_stat.st_size
+                
+                # 确保本地目录存在
+                local_dir = os.path.dirname(local_path)
+                if local_dir:
+                    await loop.run_in_executor(self.executors.transfer, lambda: os.makedirs(local_dir, exist_ok=True))
+                
+                use_parallel = parallel and concurrency > 1 and remote_file_size > chunk_size
+                # 并行和续传都走分块传输，逐块记录检查点
+                use_chunked = use_parallel or resume
+                
+                if not use_chunked:
+                    # 下载文件
+                    def progress_callback_wrapper(transferred, total):
+                        if progress_callback:
+                            progress_callback(transferred, total)
+                    
+                    await loop.run_in_executor(
+                        self.executors.transfer, 
+                        lambda: sftp_client.get(remote_path, local_path, callback=progress_callback_wrapper)
+                    )
+            
+            # 分块下载在归还首个会话之后进行，使其可以被工作协程复用
+            transfer_stats = {"chunks": 1, "workers": 1, "resumed_from": 0}
+            if use_chunked:
+                transfer_stats = await self._download_file_chunked(
+                    connection_id, connection, remote_path, local_path, remote_file_size,
+                    remote_stat.st_mtime, chunk_size, concurrency if use_parallel else 1,
+                    progress_callback, resume, verify_hash
+                )
+            
+            # 验证下载结果
+            local_file_size = await loop.run_in_executor(self.executors.transfer, lambda: os.path.getsize(local_path))
+            elapsed = time.monotonic() - started
+            transferred = remote_file_size - transfer_stats["resumed_from"]
+            
+            result = {
+                "success": True,
+                "remote_path": remote_path,
+                "local_path": local_path,
+                "remote_size": remote_file_size,
+                "local_size": local_file_size,
+                "mode": "parallel" if use_parallel else ("chunked" if use_chunked else "single"),
+                "chunk_size": chunk_size,
+                "chunks": transfer_stats["chunks"],
+                "concurrency": transfer_stats["workers"],
+                "resumed_from": transfer_stats["resumed_from"],
+                "elapsed": round(elapsed, 3),
+                "throughput": round(transferred / elapsed, 1) if elapsed > 0 else None,
+                "message": f"文件下载成功: {remote_path} -> {local_path}"
+            }
+            
+            if remote_file_size != local_file_size:
+                result["warning"] = "文件大小不匹配，可能下载不完整"
+            
+            logger.info(f"SFTP下载成功: {remote_path} -> {local_path} ({result['mode']}, {elapsed:.2f}秒)")
+            return result
+                
+        except Exception as e:
+            error_msg = f"SFTP下载失败: {str(e)}"
+            logger.error(error_msg)
+            return {
+                "success": False,
+                "remote_path": remote_path,
+                "local_path": local_path,
+                "error": error_msg
+            }
+    
+    async def _run_parallel_transfer(self, connection: SSHConnection, file_size: int, chunk_size: int,
+                                     concurrency: int, transfer_ranges: callable,
+                                     progress_callback: Optional[callable] = None,
+                                     start_offset: int = 0,
+                                     on_checkpoint: Optional[callable] = None) -> Dict:
+        """把文件从start_offset开始按字节范围分块，由多个池化SFTP会话并行传输
+        
+        transfer_ranges在工作线程中执行，签名为(sftp_client, ranges, on_progress, stop_event)，
+        负责从共享队列领取范围直到队列为空或stop_event被设置，每完成一个范围调用on_progress(offset, length)。
+        on_checkpoint(offset)在已完成的连续前缀增长时调用
+        """
+        loop = asyncio.get_event_loop()
+        ranges = queue.Queue()
+        pending = set()
+        for offset in range(start_offset, file_size, chunk_size):
+            ranges.put((offset, min(chunk_size, file_size - offset)))
+            pending.add(offset)
+        chunk_count = ranges.qsize()
+        
+        progress_lock = threading.Lock()
+        transferred = [start_offset]
+        stop_event = threading.Event()
+        
+        def on_progress(offset: int, size: int):
+            with progress_lock:
+                transferred[0] += size
+                pending.discard(offset)
+                if progress_callback:
+                    progress_callback(transferred[0], file_size)
+                if on_checkpoint:
+                    # 分块乱序完成，只有最小未完成分块之前的数据是连续可信的
+                    on_checkpoint(min(pending) if pending else file_size)
+        
+        async def worker():
+            try:
+                async with connection.sftp_session() as sftp_client:
+                    await loop.run_in_executor(
+                        self.executors.transfer, transfer_ranges, sftp_client, ranges, on_progress, stop_event
+                    )
+            except Exception:
+                # 任一分块失败时通知其余工作线程停止领取新分块
+                stop_event.set()
+                raise
+        
+        # 每个工作协程独占一个会话，数量不超过会话池大小
+        workers = min(concurrency, chunk_count, connection.sftp_pool.max_size)
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        return {"chunks": chunk_count, "workers": workers}
+    
+    async def _download_file_chunked(self, connection_id: str, connection: SSHConnection,
+                                     remote_path: str, local_path: str, file_size: int,
+                                     source_mtime: float, chunk_size: int, concurrency: int,
+                                     progress_callback: Optional[callable] = None,
+                                     resume: bool = False, verify_hash: bool = False) -> Dict:
+        """分块下载：预先设置本地文件大小，各分块读取后写入对应偏移，并逐块记录检查点"""
+        loop = asyncio.get_event_loop()
+        key = TransferCheckpointStore.make_key("download", connection_id, remote_path, local_path)
+        start_offset = 0
+        if resume:
+            start_offset = await self._resume_offset(
+                key, connection, "download", local_path, remote_path, file_size, source_mtime, verify_hash
+            )
+        
+        # 先写检查点再预设文件大小，避免留下没有记录的预分配文件
+        await loop.run_in_executor(self.executors.transfer, lambda: self.transfer_checkpoints.begin(
+            key, direction="download", connection_id=connection_id, remote_path=remote_path,
+            local_path=os.path.abspath(local_path), total_size=file_size,
+            source_mtime=source_mtime, verified_offset=start_offset
+        ))
+        
+        def prepare_local_file():
+            # 续传时保留已下载的前缀
+            with open(local_path, "r+b" if start_offset else "wb") as f:
+                f.truncate(file_size)
+        
+        await loop.run_in_executor(self.executors.transfer, prepare_local_file)
+        
+        def transfer_ranges(sftp_client, ranges, on_progress, stop_event):
+            self._download_ranges(sftp_client, remote_path, local_path, ranges, on_progress, stop_event)
+        
+        stats = await self._run_parallel_transfer(
+            connection, file_size, chunk_size, concurrency, transfer_ranges, progress_callback,
+            start_offset=start_offset,
+            on_checkpoint=lambda offset: self.transfer_checkpoints.update(key, offset)
+        )
+        await loop.run_in_executor(self.executors.transfer, lambda: self.transfer_checkpoints.remove(key))
+        logger.debug(f"分块下载完成: {remote_path}, {stats['chunks']}个分块, {stats['workers']}个会话, 起始偏移{start_offset}")
+        stats["resumed_from"] = start_offset
+        return stats
+    
+    async def _upload_file_chunked(self, connection_id: str, connection: SSHConnection,
+                                   local_path: str, remote_path: str, file_size: int,
+                                   source_mtime: float, chunk_size: int, concurrency: int,
+                                   progress_callback: Optional[callable] = None,
+                                   resume: bool = False, verify_hash: bool = False) -> Dict:
+        """分块上传：预先设置远程文件大小，各分块通过流水线写请求写入对应偏移，并逐块记录检查点"""
+        loop = asyncio.get_event_loop()
+        key = TransferCheckpointStore.make_key("upload", connection_id, remote_path, local_path)
+        start_offset = 0
+        if resume:
+            start_offset = await self._resume_offset(
+                key, connection, "upload", local_path, remote_path, file_size, source_mtime, verify_hash
+            )
+        
+        # 先写检查点再预设文件大小，避免留下没有记录的预分配文件
+        await loop.run_in_executor(self.executors.transfer, lambda: self.transfer_checkpoints.begin(
+            key, direction="upload", connection_id=connection_id, remote_path=remote_path,
+            local_path=os.path.abspath(local_path), total_size=file_size,
+            source_mtime=source_mtime, verified_offset=start_offset
+        ))
+        
+        async with connection.sftp_session() as sftp_client:
+            def prepare_remote_file():
+                # 续传时保留已上传的前缀
+                if not start_offset:
+                    sftp_client.open(remote_path, "wb").close()
+                sftp_client.truncate(remote_path, file_size)
+            
+            await loop.run_in_executor(self.executors.transfer, prepare_remote_file)
+        
+        def transfer_ranges(sftp_client, ranges, on_progress, stop_event):
+            self._upload_ranges(sftp_client, local_path, remote_path, ranges, on_progress, stop_event)
+        
+        stats = await self._run_parallel_transfer(
+            connection, file_size, chunk_size, concurrency, transfer_ranges, progress_callback,
+            start_offset=start_offset,
+            on_checkpoint=lambda offset: self.transfer_checkpoints.update(key, offset)
+        )
+        await loop.run_in_executor(self.executors.transfer, lambda: self.transfer_checkpoints.remove(key))
+        logger.debug(f"分块上传完成: {remote_path}, {stats['chunks']}个分块, {stats['workers']}个会话, 起始偏移{start_offset}")
+        stats["resumed_from"] = start_offset
+        return stats
+    
+    async def _resume_offset(self, key: str, connection: SSHConnection, direction: str,
+                             local_path: str, remote_path: str, source_size: int,
+                             source_mtime: float, verify_hash: bool) -> int:
+        """确定续传的起始偏移
+        
+        以目标端已有部分的大小为上限；存在检查点时再受其已确认偏移约束，
+        源文件大小或修改时间与检查点不一致时从头传输；verify_hash时两端前缀哈希不一致也从头传输
+        """
+        loop = asyncio.get_event_loop()
+        if direction == "download":
+            def get_destination_size():
+                try:
+                    return os.path.getsize(local_path)
+                except FileNotFoundError:
+                    return 0
+            
+            destination_size = await loop.run_in_executor(self.executors.transfer, get_destination_size)
+        else:
+            async with connection.sftp_session() as sftp_client:
+                def get_destination_size():
+                    try:
+                        return sftp_client.stat(remote_path).st_size
+                    except FileNotFoundError:
+                        return 0
+                
+                destination_size = await loop.run_in_executor(self.executors.transfer, get_destination_size)
+        
+        offset = destination_size if destination_size <= source_size else 0
+        checkpoint = self.transfer_checkpoints.get(key)
+        if checkpoint:
+            if checkpoint["total_size"] != source_size or checkpoint["source_mtime"] != source_mtime:
+                logger.info(f"源文件自上次传输后已改变，从头开始: {remote_path}")
+                offset = 0
+            else:
+                offset = min(offset, checkpoint["verified_offset"])
+        
+        if offset and verify_hash:
+            local_digest = await loop.run_in_executor(self.executors.transfer, self._local_prefix_sha256, local_path, offset)
+            remote_digest = await self._remote_prefix_sha256(connection, remote_path, offset)
+            if local_digest != remote_digest:
+                logger.warning(f"已传输部分哈希不一致，从头开始: {remote_path}")
+                offset = 0
+        
+        logger.info(f"续传起始偏移: {remote_path} -> {offset}/{source_size}")
+        return offset
     
-    async def _collect_interactive_output(self, session_id: str, session: InteractiveSession):
-        """收集单个交互式会话的输出"""
-        try:
-            if session.channel and not session.channel.closed:
-                # 检查是否有数据可读
-                if session.channel.recv_ready():
-                    data = session.channel.recv(4096)
-                    if data:
-                        text = data.decode('utf-8', errors='replace')
-                        session.add_output(text)
+    @staticmethod
+    def _local_prefix_sha256(local_path: str, length: int) -> str:
+        """计算本地文件前length字节的SHA-256"""
+        digest = hashlib.sha256()
+        with open(local_path, "rb") as f:
+            remaining = length
+            while remaining > 0:
+                block = f.read(min(1024 * 1024, remaining))
+                if not block:
+                    break
+                digest.update(block)
+                remaining -= len(block)
+        return digest.hexdigest()
+    
+    async def _remote_prefix_sha256(self, connection: SSHConnection, remote_path: str,
+                                    length: int) -> Optional[str]:
+        """在远端计算文件前length字节的SHA-256，失败时返回None"""
+        command = f"head -c {length} {shlex.quote(remote_path)} | sha256sum"
+        exit_code, stdout, stderr = await connection.execute_command(command)
+        if exit_code != 0 or not stdout.strip():
+            logger.warning(f"远端哈希计算失败: {stderr.strip()}")
+            return None
+        return stdout.split()[0]
+    
+    def list_transfer_checkpoints(self) -> Dict:
+        """列出未完成的分块传输检查点"""
+        checkpoints = self.transfer_checkpoints.list()
+        return {
+            "success": True,
+            "checkpoint_file": self.transfer_checkpoints.path,
+            "count": len(checkpoints),
+            "checkpoints": checkpoints
+        }
+    
+    def _download_ranges(self, sftp_client: paramiko.SFTPClient, remote_path: str, local_path: str,
+                         ranges: queue.Queue, on_progress: callable, stop_event: threading.Event):
+        """工作线程：从共享队列领取字节范围，读取后按偏移写入本地文件"""
+        with sftp_client.open(remote_path, "rb") as remote_file, open(local_path, "r+b") as local_file:
+            while not stop_event.is_set():
+                try:
+                    offset, length = ranges.get_nowait()
+                except queue.Empty:
+                    return
                 
-                # 检查channel是否已关闭
-                if session.channel.exit_status_ready():
-                    session.status = InteractiveStatus.COMPLETED
-                    session.end_time = time.time()
-                    logger.info(f"交互式会话已完成: {session_id}")
-                    
-        except Exception as e:
-            logger.error(f"收集交互式会话输出失败: {session_id}, 错误: {str(e)}")
-            session.status = InteractiveStatus.FAILED
-            session.end_time = time.time()
+                # readv会把范围拆成多个SFTP读请求流水线发送，避免逐个等待往返
+                data = b"".join(remote_file.readv([(offset, length)]))
+                if len(data) != length:
+                    raise IOError(f"分块读取不完整: 偏移{offset}, 期望{length}字节, 实际{len(data)}字节")
+                self._write_at(local_file, data, offset)
+                on_progress(offset, length)
     
-    # SFTP 功能
-    async def upload_file(self, connection_id: str, local_path: str, remote_path: str, 
-                         progress_callback: Optional[callable] = None) -> Dict:
-        """上传文件到远程服务器"""
+    def _upload_ranges(self, sftp_client: paramiko.SFTPClient, local_path: str, remote_path: str,
+                       ranges: queue.Queue, on_progress: callable, stop_event: threading.Event):
+        """工作线程：从共享队列领取字节范围，通过mmap读取本地文件并流水线写入远程文件"""
+        with open(local_path, "rb") as local_file, \
+                mmap.mmap(local_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped, \
+                sftp_client.open(remote_path, "r+b") as remote_file:
+            # 流水线模式下写请求不逐个等待确认，错误在后续操作或关闭时抛出
+            remote_file.set_pipelined(True)
+            piece_size = paramiko.SFTPFile.MAX_REQUEST_SIZE
+            while not stop_event.is_set():
+                try:
+                    offset, length = ranges.get_nowait()
+                except queue.Empty:
+                    return
+                
+                remote_file.seek(offset)
+                end = offset + length
+                for position in range(offset, end, piece_size):
+                    remote_file.write(mapped[position:min(position + piece_size, end)])
+                # 该分块的写请求全部确认成功后才能记入检查点
+                self._confirm_pipelined_writes(sftp_client, remote_file)
+                on_progress(offset, length)
+    
+    @staticmethod
+    def _confirm_pipelined_writes(sftp_client: paramiko.SFTPClient, remote_file: paramiko.SFTPFile):
+        """等待文件上未确认的流水线写请求的应答，任一写请求失败时抛出异常
+        
+        paramiko不检查流水线写请求的应答，被其他请求顺带读取时失败状态（如磁盘已满）会被直接丢弃，
+        stat或close都不会报错；因此按请求号逐个读取应答，错误状态由_read_response转换为IOError抛出
+        """
+        while remote_file._reqs:
+            request = remote_file._reqs.popleft()
+            if request in sftp_client._expecting:
+                sftp_client._read_response(request)
+        remote_file._check_exception()
+    
+    @staticmethod
+    def _write_at(local_file, data: bytes, offset: int):
+        """在文件指定偏移写入数据，支持时使用不移动文件指针的os.pwrite"""
+        if hasattr(os, "pwrite"):
+            view = memoryview(data)
+            while view:
+                written = os.pwrite(local_file.fileno(), view, offset)
+                view = view[written:]
+                offset += written
+        else:
+            local_file.seek(offset)
+            local_file.write(data)
+    
+    async def sync_directory(self, connection_id: str, local_path: str, remote_path: str,
+                             direction: str = "upload", include: Optional[List[str]] = None,
+                             exclude: Optional[List[str]] = None, checksum: bool = False,
+                             dry_run: bool = False, concurrency: Optional[int] = None) -> Dict:
+        """同步本地目录与远程目录，只传输新增或变化的文件
+        
+        direction为upload时以本地为源，为download时以远程为源。默认按大小和修改时间判断变化，
+        checksum为True时对大小相同的文件比较SHA-256（远端通过sha256sum计算）
+        """
         if connection_id not in self.connections:
             raise Exception(ERROR_MESSAGES["connection_not_found"])
         
@@ -1122,50 +3645,159 @@ class SSHManager:
         if connection.status != ConnectionStatus.CONNECTED:
             raise Exception("连接未建立")
         
+        if direction not in ("upload", "download"):
+            raise Exception(f"{ERROR_MESSAGES['invalid_parameter']}: direction必须为upload或download")
+        
+        include = include or []
+        exclude = exclude or []
+        concurrency = concurrency or self.config.sftp_transfer_concurrency
+        remote_root = remote_path.rstrip('/') or '/'
+        
         try:
-            # 创建SFTP客户端
             loop = asyncio.get_event_loop()
-            sftp_client = await loop.run_in_executor(None, lambda: connection.client.open_sftp())
+            started = time.monotonic()
             
-            try:
-                # 获取本地文件大小
-                local_file_size = await loop.run_in_executor(None, lambda: os.path.getsize(local_path))
-                
-                # 上传文件
-                def progress_callback_wrapper(transferred, total):
-                    if progress_callback:
-                        progress_callback(transferred, total)
-                
-                await loop.run_in_executor(
-                    None, 
-                    lambda: sftp_client.put(local_path, remote_path, callback=progress_callback_wrapper)
-                )
+            def skip_directory(relative: str) -> bool:
+                return self._sync_path_excluded(relative, exclude)
+            
+            async def walk_remote():
+                try:
+                    return await self._walk_remote_tree(connection, remote_root, skip_directory)
+                except FileNotFoundError:
+                    if direction == "download":
+                        raise
+                    return None
+            
+            if direction == "upload" and not await loop.run_in_executor(self.executors.transfer, lambda: os.path.isdir(local_path)):
+                raise FileNotFoundError(f"本地目录不存在: {local_path}")
+            
+            # 同时遍历两端目录树
+            local_tree, remote_tree = await asyncio.gather(
+                loop.run_in_executor(self.executors.transfer, self._walk_local_tree, local_path, skip_directory),
+                walk_remote()
+            )
+            remote_exists = remote_tree is not None
+            remote_files, remote_directories = remote_tree if remote_exists else ({}, set())
+            local_files, _ = local_tree
+            source, destination = (local_files, remote_files) if direction == "upload" else (remote_files, local_files)
+            
+            # 按大小和修改时间比较，checksum模式下大小相同的文件留待哈希比较
+            changes = []
+            hash_candidates = []
+            filtered = 0
+            unchanged = 0
+            for relative, (size, mtime) in sorted(source.items()):
+                if not self._sync_path_selected(relative, include, exclude):
+                    filtered += 1
+                    continue
                 
-                # 验证上传结果
-                remote_file_size = (await loop.run_in_executor(
-                    None, lambda: sftp_client.stat(remote_path)
-                )).st_size
+                existing = destination.get(relative)
+                if existing is None:
+                    changes.append((relative, "new"))
+                elif existing[0] != size:
+                    changes.append((relative, "size"))
+                elif checksum:
+                    hash_candidates.append(relative)
+                elif existing[1] != mtime:
+                    changes.append((relative, "mtime"))
+                else:
+                    unchanged += 1
+            
+            if hash_candidates:
+                remote_hashes = await self._remote_sha256_many(connection, remote_root, hash_candidates, concurrency)
                 
-                result = {
-                    "success": True,
-                    "local_path": local_path,
-                    "remote_path": remote_path,
-                    "local_size": local_file_size,
-                    "remote_size": remote_file_size,
-                    "message": f"文件上传成功: {local_path} -> {remote_path}"
-                }
+                def hash_local_files():
+                    hashes = {}
+                    for relative in hash_candidates:
+                        file_path = os.path.join(local_path, *relative.split('/'))
+                        hashes[relative] = self._local_prefix_sha256(file_path, local_files[relative][0])
+                    return hashes
                 
-                if local_file_size != remote_file_size:
-                    result["warning"] = "文件大小不匹配，可能上传不完整"
+                local_hashes = await loop.run_in_executor(self.executors.transfer, hash_local_files)
+                for relative in hash_candidates:
+                    if remote_hashes.get(relative) and remote_hashes[relative] == local_hashes[relative]:
+                        unchanged += 1
+                    else:
+                        changes.append((relative, "checksum"))
+                changes.sort()
+            
+            bytes_to_transfer = sum(source[relative][0] for relative, _ in changes)
+            transferred = []
+            failed = []
+            
+            if changes and not dry_run:
+                if direction == "upload":
+                    await self._ensure_remote_directories(
+                        connection, remote_root, remote_exists, remote_directories,
+                        {relative.rsplit('/', 1)[0] for relative, _ in changes if '/' in relative}
+                    )
                 
-                logger.info(f"SFTP上传成功: {local_path} -> {remote_path}")
-                return result
+                semaphore = asyncio.Semaphore(concurrency)
                 
-            finally:
-                await loop.run_in_executor(None, sftp_client.close)
+                async def transfer(relative: str):
+                    async with semaphore:
+                        local_file = os.path.join(local_path, *relative.split('/'))
+                        remote_file = f"{remote_root.rstrip('/')}/{relative}"
+                        mtime = source[relative][1]
+                        try:
+                            # 文件之间已经并行，单个文件不再分块并行
+                            if direction == "upload":
+                                result = await self.upload_file(connection_id, local_file, remote_file, parallel=False)
+                            else:
+                                result = await self.download_file(connection_id, remote_file, local_file, parallel=False)
+                            if not result["success"]:
+                                failed.append({"path": relative, "error": result["error"]})
+                                return
+                            
+                            # 同步修改时间，下次同步时按大小和修改时间即可判定未变化
+                            if direction == "upload":
+                                async with connection.sftp_session() as sftp_client:
+                                    await loop.run_in_executor(
+                                        self.executors.transfer, lambda: sftp_client.utime(remote_file, (mtime, mtime))
+                                    )
+                            else:
+                                await loop.run_in_executor(self.executors.transfer, lambda: os.utime(local_file, (mtime, mtime)))
+                            transferred.append(relative)
+                        except Exception as e:
+                            failed.append({"path": relative, "error": str(e)})
                 
+                await asyncio.gather(*(transfer(relative) for relative, _ in changes))
+            
+            elapsed = time.monotonic() - started
+            change_list = [
+                {"path": relative, "reason": reason, "size": source[relative][0]}
+                for relative, reason in changes[:1000]
+            ]
+            result = {
+                "success": not failed,
+                "direction": direction,
+                "local_path": local_path,
+                "remote_path": remote_path,
+                "dry_run": dry_run,
+                "checksum": checksum,
+                "source_files": len(source),
+                "destination_files": len(destination),
+                "filtered": filtered,
+                "unchanged": unchanged,
+                "to_transfer": len(changes),
+                "bytes_to_transfer": bytes_to_transfer,
+                "transferred": len(transferred),
+                "transferred_bytes": sum(source[relative][0] for relative in transferred),
+                "failed": failed,
+                "changes": change_list,
+                "changes_truncated": len(changes) > len(change_list),
+                "elapsed": round(elapsed, 3)
+            }
+            if failed:
+                result["error"] = f"{len(failed)} 个文件同步失败"
+            
+            action = "同步预览" if dry_run else "同步完成"
+            logger.info(f"目录{action}: {local_path} {'->' if direction == 'upload' else '<-'} {remote_path}, "
+                        f"{len(changes)} 个变化, {unchanged} 个未变化, {elapsed:.2f}秒")
+            return result
+            
         except Exception as e:
-            error_msg = f"SFTP上传失败: {str(e)}"
+            error_msg = f"目录同步失败: {str(e)}"
             logger.error(error_msg)
             return {
                 "success": False,
@@ -1173,10 +3805,154 @@ class SSHManager:
                 "remote_path": remote_path,
                 "error": error_msg
             }
+        finally:
+            if direction == "upload" and not dry_run:
+                connection.metadata_cache.invalidate(remote_root)
     
-    async def download_file(self, connection_id: str, remote_path: str, local_path: str,
-                           progress_callback: Optional[callable] = None) -> Dict:
-        """从远程服务器下载文件"""
+    @staticmethod
+    def _sync_path_excluded(relative: str, exclude: List[str]) -> bool:
+        """路径自身或任一上级目录匹配排除规则时返回True"""
+        parts = relative.split('/')
+        for depth in range(1, len(parts) + 1):
+            prefix = '/'.join(parts[:depth])
+            if any(fnmatch.fnmatch(prefix, pattern) or fnmatch.fnmatch(parts[depth - 1], pattern)
+                   for pattern in exclude):
+                return True
+        return False
+    
+    @classmethod
+    def _sync_path_selected(cls, relative: str, include: List[str], exclude: List[str]) -> bool:
+        """按包含/排除规则判断文件是否参与同步，规则同时匹配相对路径和文件名"""
+        name = relative.rsplit('/', 1)[-1]
+        if include and not any(fnmatch.fnmatch(relative, pattern) or fnmatch.fnmatch(name, pattern)
+                               for pattern in include):
+            return False
+        return not cls._sync_path_excluded(relative, exclude)
+    
+    @staticmethod
+    def _walk_local_tree(local_root: str, skip_directory: Optional[callable] = None) -> Tuple[Dict, set]:
+        """遍历本地目录树，返回{相对路径: (大小, 修改时间)}和相对目录集合，不存在时返回空结果"""
+        files = {}
+        directories = set()
+        for directory, subdirectories, filenames in os.walk(local_root):
+            relative_directory = os.path.relpath(directory, local_root).replace(os.sep, '/')
+            relative_directory = "" if relative_directory == "." else f"{relative_directory}/"
+            
+            kept = []
+            for name in subdirectories:
+                if skip_directory and skip_directory(relative_directory + name):
+                    continue
+                kept.append(name)
+                directories.add(relative_directory + name)
+            subdirectories[:] = kept
+            
+            for name in filenames:
+                try:
+                    file_stat = os.stat(os.path.join(directory, name))
+                except OSError:
+                    continue
+                # 只同步普通文件
+                if (file_stat.st_mode & 0o170000) == 0o100000:
+                    files[relative_directory + name] = (file_stat.st_size, int(file_stat.st_mtime))
+        return files, directories
+    
+    async def _walk_remote_tree(self, connection: SSHConnection, remote_root: str,
+                                skip_directory: Optional[callable] = None,
+                                include_special: bool = False) -> Tuple[Dict, set]:
+        """逐层并发遍历远程目录树，返回{相对路径: (大小, 修改时间)}和相对目录集合
+        
+        同一层的目录通过多个池化SFTP会话并发列出，并发数受会话池大小限制。
+        include_special为True时符号链接等非普通文件也计入文件结果
+        """
+        loop = asyncio.get_event_loop()
+        files = {}
+        directories = set()
+        
+        async def list_directory(relative: str):
+            path = f"{remote_root.rstrip('/')}/{relative}" if relative else remote_root
+            async with connection.sftp_session() as sftp_client:
+                return relative, await loop.run_in_executor(self.executors.transfer, lambda: sftp_client.listdir_attr(path))
+        
+        level = [""]
+        while level:
+            listings = await asyncio.gather(*(list_directory(relative) for relative in level))
+            level = []
+            for relative_directory, entries in listings:
+                for file_attr in entries:
+                    relative = f"{relative_directory}/{file_attr.filename}" if relative_directory else file_attr.filename
+                    file_type = (file_attr.st_mode or 0) & 0o170000
+                    if file_type == 0o040000:
+                        if skip_directory and skip_directory(relative):
+                            continue
+                        directories.add(relative)
+                        level.append(relative)
+                    elif file_type == 0o100000 or include_special:
+                        files[relative] = (file_attr.st_size, int(file_attr.st_mtime or 0))
+        return files, directories
+    
+    async def _remote_sha256_many(self, connection: SSHConnection, remote_root: str,
+                                  relatives: List[str], concurrency: int,
+                                  batch_size: int = 200) -> Dict[str, str]:
+        """在远端批量计算文件SHA-256，每批一次sha256sum调用，返回{相对路径: 哈希}"""
+        semaphore = asyncio.Semaphore(concurrency)
+        hashes = {}
+        
+        async def hash_batch(batch: List[str]):
+            command = f"cd {shlex.quote(remote_root)} && sha256sum -- " + " ".join(shlex.quote(r) for r in batch)
+            async with semaphore:
+                exit_code, stdout, stderr = await connection.execute_command(
+                    command, timeout=self.config.default_timeout * 10
+                )
+            if exit_code != 0:
+                logger.warning(f"远端sha256sum部分失败: {stderr.strip()}")
+            for line in stdout.splitlines():
+                digest, _, name = line.partition("  ")
+                # 文件名包含特殊字符时sha256sum会在行首加反斜杠并转义，这类文件视为需要传输
+                if name and not digest.startswith("\\"):
+                    hashes[name] = digest
+        
+        await asyncio.gather(*(
+            hash_batch(relatives[i:i + batch_size]) for i in range(0, len(relatives), batch_size)
+        ))
+        return hashes
+    
+    async def _ensure_remote_directories(self, connection: SSHConnection, remote_root: str,
+                                         root_exists: bool, existing: set, required: set):
+        """按层级顺序创建上传需要的远程目录"""
+        loop = asyncio.get_event_loop()
+        missing = set()
+        for relative in required:
+            parts = relative.split('/')
+            for depth in range(1, len(parts) + 1):
+                prefix = '/'.join(parts[:depth])
+                if prefix not in existing:
+                    missing.add(prefix)
+        
+        async with connection.sftp_session() as sftp_client:
+            if not root_exists:
+                await self._create_remote_parents(sftp_client, remote_root, 0o755, loop)
+                await loop.run_in_executor(self.executors.transfer, lambda: sftp_client.mkdir(remote_root, 0o755))
+            for relative in sorted(missing, key=lambda p: p.count('/')):
+                path = f"{remote_root.rstrip('/')}/{relative}"
+                await loop.run_in_executor(self.executors.transfer, lambda p=path: sftp_client.mkdir(p, 0o755))
+    
+    async def upload_directory(self, connection_id: str, local_path: str, remote_path: str,
+                               compression: str = "gzip") -> Dict:
+        """以tar流方式把本地目录上传到远程目录
+        
+        本地打包后通过单个exec channel流式发送，远端tar直接解包，不落临时文件；
+        远端没有tar时回退为逐文件SFTP传输
+        """
+        return await self._transfer_directory(connection_id, local_path, remote_path, "upload", compression)
+    
+    async def download_directory(self, connection_id: str, remote_path: str, local_path: str,
+                                 compression: str = "gzip") -> Dict:
+        """以tar流方式把远程目录下载到本地目录，远端没有tar时回退为逐文件SFTP传输"""
+        return await self._transfer_directory(connection_id, local_path, remote_path, "download", compression)
+    
+    async def _transfer_directory(self, connection_id: str, local_path: str, remote_path: str,
+                                  direction: str, compression: str) -> Dict:
+        """目录批量传输的公共流程：协商压缩方式、执行tar流传输或回退到SFTP"""
         if connection_id not in self.connections:
             raise Exception(ERROR_MESSAGES["connection_not_found"])
         
@@ -1184,65 +3960,194 @@ class SSHManager:
         if connection.status != ConnectionStatus.CONNECTED:
             raise Exception("连接未建立")
         
+        if compression not in ("none", "gzip", "zstd"):
+            raise Exception(f"{ERROR_MESSAGES['invalid_parameter']}: compression必须为none、gzip或zstd")
+        
         try:
-            # 创建SFTP客户端
             loop = asyncio.get_event_loop()
-            sftp_client = await loop.run_in_executor(None, lambda: connection.client.open_sftp())
+            started = time.monotonic()
+            if direction == "upload" and not await loop.run_in_executor(self.executors.transfer, lambda: os.path.isdir(local_path)):
+                raise FileNotFoundError(f"本地目录不存在: {local_path}")
             
-            try:
-                # 获取远程文件大小
-                remote_file_size = (await loop.run_in_executor(
-                    None, lambda: sftp_client.stat(remote_path)
-                )).st_size
-                
-                # 确保本地目录存在
-                local_dir = os.path.dirname(local_path)
-                if local_dir:
-                    await loop.run_in_executor(None, lambda: os.makedirs(local_dir, exist_ok=True))
-                
-                # 下载文件
-                def progress_callback_wrapper(transferred, total):
-                    if progress_callback:
-                        progress_callback(transferred, total)
-                
-                await loop.run_in_executor(
-                    None, 
-                    lambda: sftp_client.get(remote_path, local_path, callback=progress_callback_wrapper)
-                )
-                
-                # 验证下载结果
-                local_file_size = await loop.run_in_executor(None, lambda: os.path.getsize(local_path))
-                
-                result = {
-                    "success": True,
-                    "remote_path": remote_path,
-                    "local_path": local_path,
-                    "remote_size": remote_file_size,
-                    "local_size": local_file_size,
-                    "message": f"文件下载成功: {remote_path} -> {local_path}"
-                }
-                
-                if remote_file_size != local_file_size:
-                    result["warning"] = "文件大小不匹配，可能下载不完整"
-                
-                logger.info(f"SFTP下载成功: {remote_path} -> {local_path}")
+            negotiated = await self._negotiate_tar_compression(connection, compression)
+            if negotiated is None:
+                logger.info("远端没有tar命令，回退为逐文件SFTP传输")
+                result = await self.sync_directory(connection_id, local_path, remote_path, direction=direction)
+                result.update({
+                    "mode": "sftp",
+                    "fallback_reason": "远端没有tar命令",
+                    "files": result.get("transferred", 0),
+                    "bytes": result.get("transferred_bytes", 0),
+                    "message": f"已回退为逐文件SFTP传输: {result.get('transferred', 0)} 个文件"
+                })
                 return result
-                
+            
+            transport = connection.client.get_transport()
+            channel = await loop.run_in_executor(self.executors.connect, transport.open_session)
+            try:
+                if direction == "upload":
+                    await loop.run_in_executor(
+                        self.executors.transfer, channel.exec_command, self._tar_extract_command(remote_path, negotiated)
+                    )
+                    stats = await loop.run_in_executor(
+                        self.executors.transfer, self._stream_tar_upload, channel, local_path, negotiated
+                    )
+                else:
+                    await loop.run_in_executor(self.executors.transfer, lambda: os.makedirs(local_path, exist_ok=True))
+                    await loop.run_in_executor(
+                        self.executors.transfer, channel.exec_command, self._tar_create_command(remote_path, negotiated)
+                    )
+                    stats = await loop.run_in_executor(
+                        self.executors.transfer, self._stream_tar_download, channel, local_path, negotiated
+                    )
             finally:
-                await loop.run_in_executor(None, sftp_client.close)
-                
+                channel.close()
+            connection.mark_activity()
+            
+            elapsed = time.monotonic() - started
+            result = {
+                "success": True,
+                "direction": direction,
+                "local_path": local_path,
+                "remote_path": remote_path,
+                "mode": "tar",
+                "compression": negotiated,
+                "files": stats["files"],
+                "bytes": stats["bytes"],
+                "wire_bytes": stats["wire_bytes"],
+                "elapsed": round(elapsed, 3),
+                "throughput": round(stats["bytes"] / elapsed, 1) if elapsed > 0 else None,
+                "message": f"目录{'上传' if direction == 'upload' else '下载'}成功: {stats['files']} 个文件"
+            }
+            if negotiated != compression:
+                result["warning"] = f"{compression}压缩不可用，已改用{negotiated}"
+            
+            logger.info(f"tar流传输成功: {local_path} {'->' if direction == 'upload' else '<-'} {remote_path}, "
+                        f"{stats['files']} 个文件, {elapsed:.2f}秒")
+            return result
+            
         except Exception as e:
-            error_msg = f"SFTP下载失败: {str(e)}"
+            error_msg = f"目录传输失败: {str(e)}"
             logger.error(error_msg)
             return {
                 "success": False,
-                "remote_path": remote_path,
                 "local_path": local_path,
+                "remote_path": remote_path,
                 "error": error_msg
             }
+        finally:
+            if direction == "upload":
+                connection.metadata_cache.invalidate(remote_path)
+    
+    async def _negotiate_tar_compression(self, connection: SSHConnection, compression: str) -> Optional[str]:
+        """检查远端tar和压缩工具，返回实际可用的压缩方式
+        
+        只有探测命令成功执行且远端确实没有tar时才返回None；连接断开、channel被拒或超时时抛出异常，
+        避免把连接问题误判为没有tar而静默回退到逐文件SFTP传输
+        """
+        exit_code, stdout, stderr = await connection.execute_command(
+            "for tool in tar gzip zstd; do command -v $tool >/dev/null 2>&1 && echo $tool; done; exit 0"
+        )
+        if exit_code != 0:
+            raise Exception(f"远端工具检测失败: {stderr.strip() or f'退出码 {exit_code}'}")
+        available = set(stdout.split())
+        if "tar" not in available:
+            return None
+        # zstd需要两端都支持，本地依赖可选的zstandard包
+        if compression == "zstd" and (zstandard is None or "zstd" not in available):
+            compression = "gzip"
+        if compression == "gzip" and "gzip" not in available:
+            compression = "none"
+        return compression
+    
+    @staticmethod
+    def _tar_extract_command(remote_path: str, compression: str) -> str:
+        """远端从stdin解包tar流的命令"""
+        target = shlex.quote(remote_path)
+        if compression == "zstd":
+            return f"mkdir -p {target} && zstd -dcq | tar -xf - -C {target}"
+        flag = "z" if compression == "gzip" else ""
+        return f"mkdir -p {target} && tar -x{flag}f - -C {target}"
+    
+    @staticmethod
+    def _tar_create_command(remote_path: str, compression: str) -> str:
+        """远端把目录打包为tar流写到stdout的命令"""
+        source = shlex.quote(remote_path)
+        if compression == "zstd":
+            return f"tar -cf - -C {source} . | zstd -cq"
+        flag = "z" if compression == "gzip" else ""
+        return f"tar -c{flag}f - -C {source} ."
+    
+    def _stream_tar_upload(self, channel: paramiko.Channel, local_path: str, compression: str) -> Dict:
+        """工作线程：把本地目录打包为tar流写入channel，等待远端解包完成"""
+        writer = ChannelWriter(channel)
+        stream = writer
+        if compression == "zstd":
+            stream = zstandard.ZstdCompressor().stream_writer(writer, closefd=False)
+        stats = {"files": 0, "bytes": 0}
+        
+        def count_member(member: tarfile.TarInfo) -> tarfile.TarInfo:
+            if member.isfile():
+                stats["files"] += 1
+                stats["bytes"] += member.size
+            return member
+        
+        stream_error = None
+        try:
+            with tarfile.open(fileobj=stream, mode="w|gz" if compression == "gzip" else "w|") as archive:
+                archive.add(local_path, arcname=".", filter=count_member)
+            if compression == "zstd":
+                stream.close()
+        except Exception as e:
+            # 远端提前退出时写入会失败，优先报告远端的错误信息
+            stream_error = e
+        channel.shutdown_write()
+        
+        self._finish_tar_channel(channel, "解包", stream_error)
+        stats["wire_bytes"] = writer.bytes_written
+        return stats
+    
+    def _stream_tar_download(self, channel: paramiko.Channel, local_path: str, compression: str) -> Dict:
+        """工作线程：从channel读取远端tar流并直接解包到本地目录"""
+        reader = ChannelReader(channel)
+        stream = reader
+        if compression == "zstd":
+            stream = zstandard.ZstdDecompressor().stream_reader(reader, closefd=False)
+        stats = {"files": 0, "bytes": 0}
+        
+        stream_error = None
+        try:
+            with tarfile.open(fileobj=stream, mode="r|gz" if compression == "gzip" else "r|") as archive:
+                for member in archive:
+                    # data过滤器拒绝绝对路径、越出目标目录的路径和设备文件
+                    archive.extract(member, local_path, filter="data")
+                    if member.isfile():
+                        stats["files"] += 1
+                        stats["bytes"] += member.size
+            # 读完tar流末尾的填充块，避免远端因窗口写满而无法退出
+            while reader.read():
+                pass
+        except Exception as e:
+            # 远端打包失败时本地只会看到空的或截断的流，优先报告远端的错误信息
+            stream_error = e
+        
+        self._finish_tar_channel(channel, "打包", stream_error)
+        stats["wire_bytes"] = reader.bytes_read
+        return stats
+    
+    @staticmethod
+    def _finish_tar_channel(channel: paramiko.Channel, action: str, stream_error: Optional[Exception]):
+        """等待远端tar退出，远端失败或本地流处理失败时抛出异常"""
+        stderr = channel.makefile_stderr("rb").read().decode("utf-8", errors="replace")
+        exit_status = channel.recv_exit_status()
+        if exit_status != 0:
+            raise Exception(f"远端{action}失败（退出码{exit_status}）: {stderr.strip()}")
+        if stream_error is not None:
+            raise stream_error
     
-    async def list_remote_directory(self, connection_id: str, remote_path: str = ".") -> Dict:
-        """列出远程目录内容"""
+    async def list_remote_directory(self, connection_id: str, remote_path: str = ".",
+                                    use_cache: bool = True) -> Dict:
+        """列出远程目录内容，use_cache为False时绕过元数据缓存（仍会刷新缓存）"""
         if connection_id not in self.connections:
             raise Exception(ERROR_MESSAGES["connection_not_found"])
         
@@ -1250,14 +4155,17 @@ class SSHManager:
         if connection.status != ConnectionStatus.CONNECTED:
             raise Exception("连接未建立")
         
+        if use_cache:
+            cached = connection.metadata_cache.get("list", remote_path, "flat")
+            if cached is not None:
+                return dict(cached, cached=True)
+        
         try:
-            # 创建SFTP客户端
+            # 从会话池借用SFTP客户端
             loop = asyncio.get_event_loop()
-            sftp_client = await loop.run_in_executor(None, lambda: connection.client.open_sftp())
-            
-            try:
+            async with connection.sftp_session() as sftp_client:
                 # 列出目录内容
-                file_list = await loop.run_in_executor(None, lambda: sftp_client.listdir_attr(remote_path))
+                file_list = await loop.run_in_executor(self.executors.command, lambda: sftp_client.listdir_attr(remote_path))
                 
                 # 格式化结果
                 files = []
@@ -1286,15 +4194,14 @@ class SSHManager:
                     "files": sorted(files, key=lambda x: x["name"]),
                     "total_count": len(file_list),
                     "directory_count": len(directories),
-                    "file_count": len(files)
+                    "file_count": len(files),
+                    "cached": False
                 }
+                connection.metadata_cache.put("list", remote_path, dict(result), "flat")
                 
                 logger.info(f"列出远程目录成功: {remote_path} ({len(file_list)} 项)")
                 return result
                 
-            finally:
-                await loop.run_in_executor(None, sftp_client.close)
-                
         except Exception as e:
             error_msg = f"列出远程目录失败: {str(e)}"
             logger.error(error_msg)
@@ -1304,6 +4211,173 @@ class SSHManager:
                 "error": error_msg
             }
     
+    async def list_remote_directory_page(self, connection_id: str, remote_path: str = ".",
+                                         recursive: bool = False, max_depth: Optional[int] = None,
+                                         pattern: Optional[str] = None, page_size: Optional[int] = None,
+                                         cursor: Optional[str] = None, include_totals: bool = False,
+                                         use_cache: bool = True) -> Dict:
+        """分页列出远程目录，可递归并按glob过滤
+        
+        Args:
+            connection_id: 连接ID
+            remote_path: 远程目录路径
+            recursive: 是否递归列出子目录
+            max_depth: 递归的最大深度，1表示只列出当前目录，为空时不限制
+            pattern: glob过滤规则，同时匹配相对路径和文件名；目录不匹配时仍会进入遍历
+            page_size: 每页条目数，默认为配置中的listing_page_size
+            cursor: 上一页返回的next_cursor，传入时忽略路径和过滤参数
+            include_totals: 是否统计过滤后的总条目数（需要额外遍历一遍，结果缓存在游标上）
+            use_cache: 为False时绕过元数据缓存；只有一页即可列完的结果才会被缓存
+        
+        Returns:
+            包含entries、next_cursor、has_more以及可选totals的字典
+        """
+        if connection_id not in self.connections:
+            raise Exception(ERROR_MESSAGES["connection_not_found"])
+        
+        connection = self.connections[connection_id]
+        if connection.status != ConnectionStatus.CONNECTED:
+            raise Exception("连接未建立")
+        
+        page_size = max(1, page_size or self.config.listing_page_size)
+        loop = asyncio.get_event_loop()
+        await self._expire_listing_cursors()
+        
+        cache_variant = (recursive, max_depth, pattern)
+        if cursor is None and use_cache:
+            cached = connection.metadata_cache.get("list", remote_path, cache_variant)
+            if cached is not None and cached["count"] <= page_size:
+                result = dict(cached, cached=True)
+                if include_totals:
+                    result["totals"] = RemoteListingCursor.summarize(cached["entries"])
+                return result
+        
+        if cursor is not None:
+            listing = self.listing_cursors.get(cursor)
+            if listing is None or listing.connection_id != connection_id:
+                return {
+                    "success": False,
+                    "path": remote_path,
+                    "error": "目录列表游标不存在或已过期"
+                }
+        else:
+            # 每个连接上的游标至少给其他SFTP操作留出一个会话池名额
+            cursor_limit = max(1, connection.sftp_pool.max_size - 1)
+            own_cursors = [c for c in self.listing_cursors.values() if c.connection_id == connection_id]
+            idle_cursors = [c for c in own_cursors if not c.lock.locked()]
+            if len(own_cursors) >= cursor_limit and idle_cursors:
+                oldest = min(idle_cursors, key=lambda c: c.last_used)
+                logger.info(f"连接上的目录列表游标达到上限{cursor_limit}，关闭最久未使用的游标: {oldest.cursor_id}")
+                await self._close_listing_cursors([oldest.cursor_id])
+            try:
+                # 游标从会话池借用一个SFTP会话，翻页期间目录句柄保持打开
+                sftp_client = await connection.sftp_pool.acquire()
+            except Exception as e:
+                error_msg = f"列出远程目录失败: {str(e)}"
+                logger.error(error_msg)
+                return {"success": False, "path": remote_path, "error": error_msg}
+            listing = RemoteListingCursor(
+                str(uuid.uuid4()), connection_id, sftp_client, remote_path,
+                recursive=recursive, max_depth=max_depth, pattern=pattern,
+                sftp_pool=connection.sftp_pool
+            )
+            self.listing_cursors[listing.cursor_id] = listing
+            if len(self.listing_cursors) > MAX_LISTING_CURSORS:
+                oldest = min(self.listing_cursors.values(), key=lambda c: c.last_used)
+                logger.info(f"目录列表游标过多，关闭最久未使用的游标: {oldest.cursor_id}")
+                await self._close_listing_cursors([oldest.cursor_id])
+        
+        try:
+            async with listing.lock:
+                listing.last_used = time.monotonic()
+                entries, done = await loop.run_in_executor(self.executors.command, listing.fetch, page_size)
+                if include_totals and listing.totals is None and done and listing.returned == len(entries):
+                    # 一页即列完，直接由本页条目汇总
+                    listing.totals = RemoteListingCursor.summarize(entries)
+                elif include_totals and listing.totals is None:
+                    # 游标会话上还有未读完的目录句柄和预读请求，统计需要另借一个会话
+                    if connection.sftp_pool.max_size < 2:
+                        raise Exception("SFTP会话池大小为1时无法在翻页过程中统计总数")
+                    async with connection.sftp_session() as sftp_client:
+                        listing.totals = await loop.run_in_executor(self.executors.command, listing.count, sftp_client)
+                listing.last_used = time.monotonic()
+        except Exception as e:
+            await self._close_listing_cursors([listing.cursor_id])
+            error_msg = f"列出远程目录失败: {str(e)}"
+            logger.error(error_msg)
+            return {"success": False, "path": listing.remote_path, "error": error_msg}
+        
+        if done:
+            await self._close_listing_cursors([listing.cursor_id])
+        
+        result = {
+            "success": True,
+            "path": listing.remote_path,
+            "recursive": listing.recursive,
+            "max_depth": listing.max_depth,
+            "pattern": listing.pattern,
+            "entries": entries,
+            "count": len(entries),
+            "returned": listing.returned,
+            "has_more": not done,
+            "next_cursor": None if done else listing.cursor_id,
+            "cached": False
+        }
+        if cursor is None and done:
+            connection.metadata_cache.put("list", remote_path, dict(result), cache_variant)
+        if include_totals:
+            result["totals"] = listing.totals
+        logger.info(f"分页列出远程目录: {listing.remote_path} (本页 {len(entries)} 项，累计 {listing.returned} 项)")
+        return result
+    
+    def get_metadata_cache_stats(self, connection_id: Optional[str] = None) -> Dict:
+        """获取元数据缓存的命中统计，不指定连接时返回所有连接"""
+        if connection_id is not None and connection_id not in self.connections:
+            raise Exception(ERROR_MESSAGES["connection_not_found"])
+        connection_ids = [connection_id] if connection_id else list(self.connections)
+        per_connection = {cid: self.connections[cid].metadata_cache.stats() for cid in connection_ids}
+        hits = sum(stats["hits"] for stats in per_connection.values())
+        misses = sum(stats["misses"] for stats in per_connection.values())
+        return {
+            "connections": per_connection,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+            "entries": sum(stats["entries"] for stats in per_connection.values())
+        }
+    
+    def clear_metadata_cache(self, connection_id: Optional[str] = None) -> int:
+        """清空元数据缓存，返回清除的条目数"""
+        if connection_id is not None and connection_id not in self.connections:
+            raise Exception(ERROR_MESSAGES["connection_not_found"])
+        connection_ids = [connection_id] if connection_id else list(self.connections)
+        return sum(self.connections[cid].metadata_cache.clear() for cid in connection_ids)
+    
+    async def close_listing_cursor(self, cursor_id: str) -> bool:
+        """提前关闭目录列表游标，释放其SFTP会话"""
+        if cursor_id not in self.listing_cursors:
+            return False
+        await self._close_listing_cursors([cursor_id])
+        return True
+    
+    async def _close_listing_cursors(self, cursor_ids: List[str]):
+        """从游标表中移除游标并交还其SFTP会话"""
+        for cursor_id in cursor_ids:
+            listing = self.listing_cursors.pop(cursor_id, None)
+            if listing is not None:
+                await listing.close()
+    
+    async def _expire_listing_cursors(self):
+        """关闭空闲超时的目录列表游标"""
+        now = time.monotonic()
+        expired = [
+            cursor_id for cursor_id, listing in self.listing_cursors.items()
+            if not listing.lock.locked() and now - listing.last_used > self.config.listing_cursor_idle_timeout
+        ]
+        if expired:
+            logger.info(f"关闭 {len(expired)} 个空闲超时的目录列表游标")
+            await self._close_listing_cursors(expired)
+    
     async def create_remote_directory(self, connection_id: str, remote_path: str, 
                                     mode: int = 0o755, parents: bool = True) -> Dict:
         """在远程服务器上创建目录"""
@@ -1315,27 +4389,15 @@ class SSHManager:
             raise Exception("连接未建立")
         
         try:
-            # 创建SFTP客户端
+            # 从会话池借用SFTP客户端
             loop = asyncio.get_event_loop()
-            sftp_client = await loop.run_in_executor(None, lambda: connection.client.open_sftp())
-            
-            try:
+            async with connection.sftp_session() as sftp_client:
                 if parents:
-                    # 递归创建父目录
-                    parent_path = os.path.dirname(remote_path.rstrip('/'))
-                    if parent_path and parent_path != remote_path:
-                        try:
-                            await loop.run_in_executor(None, lambda: sftp_client.stat(parent_path))
-                        except FileNotFoundError:
-                            # 父目录不存在，递归创建
-                            parent_result = await self.create_remote_directory(
-                                connection_id, parent_path, mode, parents
-                            )
-                            if not parent_result["success"]:
-                                return parent_result
+                    # 在同一个会话中逐级创建缺失的父目录（避免嵌套借用会话）
+                    await self._create_remote_parents(sftp_client, remote_path, mode, loop)
                 
                 # 创建目录
-                await loop.run_in_executor(None, lambda: sftp_client.mkdir(remote_path, mode))
+                await loop.run_in_executor(self.executors.command, lambda: sftp_client.mkdir(remote_path, mode))
                 
                 result = {
                     "success": True,
@@ -1347,9 +4409,6 @@ class SSHManager:
                 logger.info(f"创建远程目录成功: {remote_path}")
                 return result
                 
-            finally:
-                await loop.run_in_executor(None, sftp_client.close)
-                
         except Exception as e:
             error_msg = f"创建远程目录失败: {str(e)}"
             logger.error(error_msg)
@@ -1358,9 +4417,32 @@ class SSHManager:
                 "path": remote_path,
                 "error": error_msg
             }
+        finally:
+            connection.metadata_cache.invalidate(remote_path)
+    
+    async def _create_remote_parents(self, sftp_client, remote_path: str, mode: int, loop):
+        """创建remote_path所有不存在的父目录"""
+        missing = []
+        parent_path = os.path.dirname(remote_path.rstrip('/'))
+        while parent_path and parent_path not in ('/', '.'):
+            try:
+                await loop.run_in_executor(self.executors.command, lambda p=parent_path: sftp_client.stat(p))
+                break
+            except FileNotFoundError:
+                missing.append(parent_path)
+                parent_path = os.path.dirname(parent_path)
+        
+        # 从最上层开始创建
+        for path in reversed(missing):
+            await loop.run_in_executor(self.executors.command, lambda p=path: sftp_client.mkdir(p, mode))
+            logger.info(f"创建远程目录成功: {path}")
     
-    async def remove_remote_file(self, connection_id: str, remote_path: str) -> Dict:
-        """删除远程文件"""
+    async def remove_remote_file(self, connection_id: str, remote_path: str, fast: bool = False,
+                                 concurrency: Optional[int] = None) -> Dict:
+        """删除远程文件
+        
+        删除目录时默认通过多个SFTP会话并发删除；fast为True时在远端执行rm -rf（带路径安全检查）
+        """
         if connection_id not in self.connections:
             raise Exception(ERROR_MESSAGES["connection_not_found"])
         
@@ -1368,15 +4450,16 @@ class SSHManager:
         if connection.status != ConnectionStatus.CONNECTED:
             raise Exception("连接未建立")
         
+        concurrency = concurrency or self.config.sftp_pool_size
+        
         try:
-            # 创建SFTP客户端
             loop = asyncio.get_event_loop()
-            sftp_client = await loop.run_in_executor(None, lambda: connection.client.open_sftp())
-            
-            try:
+            started = time.monotonic()
+            # 从会话池借用SFTP客户端
+            async with connection.sftp_session() as sftp_client:
                 # 检查是否为目录
                 try:
-                    file_attr = await loop.run_in_executor(None, lambda: sftp_client.stat(remote_path))
+                    file_attr = await loop.run_in_executor(self.executors.command, lambda: sftp_client.stat(remote_path))
                     is_directory = file_attr.st_mode is not None and (file_attr.st_mode & 0o040000) != 0
                 except FileNotFoundError:
                     return {
@@ -1385,27 +4468,39 @@ class SSHManager:
                         "error": "文件或目录不存在"
                     }
                 
-                if is_directory:
-                    # 删除目录及其内容
-                    await self._remove_remote_directory_recursive(sftp_client, remote_path, loop)
-                    operation = "目录"
-                else:
+                if not is_directory:
                     # 删除文件
-                    await loop.run_in_executor(None, lambda: sftp_client.remove(remote_path))
-                    operation = "文件"
-                
-                result = {
-                    "success": True,
-                    "path": remote_path,
-                    "type": operation,
-                    "message": f"远程{operation}删除成功: {remote_path}"
-                }
-                
-                logger.info(f"删除远程{operation}成功: {remote_path}")
-                return result
-                
-            finally:
-                await loop.run_in_executor(None, sftp_client.close)
+                    await loop.run_in_executor(self.executors.command, lambda: sftp_client.remove(remote_path))
+            
+            if is_directory:
+                # 删除目录及其内容（在归还会话后进行，删除引擎需要同时借用多个会话）
+                if fast:
+                    deleted_count = await self._remove_remote_tree_with_rm(connection, remote_path)
+                    method = "rm"
+                else:
+                    deleted_count = await self._remove_remote_directory_recursive(
+                        connection, remote_path, concurrency
+                    )
+                    method = "sftp"
+                operation = "目录"
+            else:
+                deleted_count = 1
+                method = "sftp"
+                operation = "文件"
+            
+            elapsed = time.monotonic() - started
+            result = {
+                "success": True,
+                "path": remote_path,
+                "type": operation,
+                "method": method,
+                "deleted_count": deleted_count,
+                "elapsed": round(elapsed, 3),
+                "message": f"远程{operation}删除成功: {remote_path}"
+            }
+            
+            logger.info(f"删除远程{operation}成功: {remote_path} ({deleted_count} 项, {elapsed:.2f}秒)")
+            return result
                 
         except Exception as e:
             error_msg = f"删除远程文件失败: {str(e)}"
@@ -1415,33 +4510,102 @@ class SSHManager:
                 "path": remote_path,
                 "error": error_msg
             }
+        finally:
+            connection.metadata_cache.invalidate(remote_path)
     
-    async def _remove_remote_directory_recursive(self, sftp_client, remote_path: str, loop):
-        """递归删除远程目录及其内容"""
+    async def _remove_remote_directory_recursive(self, connection: SSHConnection, remote_path: str,
+                                                 concurrency: int) -> int:
+        """并发删除远程目录及其内容，返回删除的条目数（含目录自身）
+        
+        先逐层并发列出整棵树，再由多个池化SFTP会话并发删除所有文件，
+        最后自底向上逐层并发删除目录（同一层的目录互不依赖）
+        """
         try:
-            # 列出目录内容
-            file_list = await loop.run_in_executor(None, lambda: sftp_client.listdir_attr(remote_path))
+            files, directories = await self._walk_remote_tree(connection, remote_path, include_special=True)
+            root = remote_path.rstrip('/') or '/'
             
-            # 删除所有子项
-            for file_attr in file_list:
-                item_path = f"{remote_path.rstrip('/')}/{file_attr.filename}"
-                
-                if file_attr.st_mode is not None and (file_attr.st_mode & 0o040000) != 0:
-                    # 是目录，递归删除
-                    await self._remove_remote_directory_recursive(sftp_client, item_path, loop)
-                else:
-                    # 是文件，直接删除
-                    await loop.run_in_executor(None, lambda: sftp_client.remove(item_path))
+            await self._remove_remote_paths(
+                connection, [f"{root}/{relative}" for relative in files], "remove", concurrency
+            )
+            
+            levels: Dict[int, List[str]] = {}
+            for relative in directories:
+                levels.setdefault(relative.count('/'), []).append(f"{root}/{relative}")
+            for depth in sorted(levels, reverse=True):
+                await self._remove_remote_paths(connection, levels[depth], "rmdir", concurrency)
+            await self._remove_remote_paths(connection, [remote_path], "rmdir", 1)
             
-            # 删除空目录
-            await loop.run_in_executor(None, lambda: sftp_client.rmdir(remote_path))
+            return len(files) + len(directories) + 1
             
         except Exception as e:
             logger.error(f"递归删除目录失败: {remote_path}, 错误: {str(e)}")
             raise
     
-    async def get_remote_file_info(self, connection_id: str, remote_path: str) -> Dict:
-        """获取远程文件信息"""
+    async def _remove_remote_paths(self, connection: SSHConnection, paths: List[str],
+                                   operation: str, concurrency: int):
+        """由多个池化SFTP会话并发执行remove或rmdir
+        
+        每个工作线程独占一个会话，从共享队列连续领取路径，避免每个路径都切换一次线程
+        """
+        if not paths:
+            return
+        
+        loop = asyncio.get_event_loop()
+        pending = queue.Queue()
+        for path in paths:
+            pending.put(path)
+        stop_event = threading.Event()
+        
+        def remove_paths(sftp_client):
+            remove = getattr(sftp_client, operation)
+            while not stop_event.is_set():
+                try:
+                    path = pending.get_nowait()
+                except queue.Empty:
+                    return
+                remove(path)
+        
+        async def worker():
+            try:
+                async with connection.sftp_session() as sftp_client:
+                    await loop.run_in_executor(self.executors.transfer, remove_paths, sftp_client)
+            except Exception:
+                stop_event.set()
+                raise
+        
+        workers = min(concurrency, len(paths), connection.sftp_pool.max_size)
+        await asyncio.gather(*(worker() for _ in range(workers)))
+    
+    async def _remove_remote_tree_with_rm(self, connection: SSHConnection, remote_path: str) -> int:
+        """在远端执行rm -rf删除目录，返回删除的条目数
+        
+        只接受规范化后的绝对路径，拒绝根目录、系统目录、家目录及其上级目录
+        """
+        if not remote_path.startswith('/'):
+            raise Exception("rm -rf快速删除只接受绝对路径")
+        normalized = posixpath.normpath(remote_path)
+        # normpath会保留开头的"//"，先统一为单个斜杠
+        normalized = '/' + normalized.lstrip('/')
+        if normalized.count('/') < 2 or normalized in PROTECTED_REMOTE_PATHS:
+            raise Exception(f"拒绝快速删除受保护的路径: {normalized}")
+        
+        exit_code, stdout, stderr = await connection.execute_command('printf %s "$HOME"')
+        home = posixpath.normpath(stdout.strip()) if exit_code == 0 and stdout.strip() else None
+        if home and (normalized == home or home.startswith(normalized.rstrip('/') + '/')):
+            raise Exception(f"拒绝快速删除家目录或其上级目录: {normalized}")
+        
+        target = shlex.quote(normalized)
+        exit_code, stdout, stderr = await connection.execute_command(
+            f"count=$(find {target} 2>/dev/null | wc -l) && rm -rf -- {target} && echo $count",
+            timeout=self.config.default_timeout * 10
+        )
+        if exit_code != 0:
+            raise Exception(f"rm -rf执行失败: {stderr.strip()}")
+        return int(stdout.strip() or 0)
+    
+    async def get_remote_file_info(self, connection_id: str, remote_path: str,
+                                   use_cache: bool = True) -> Dict:
+        """获取远程文件信息，use_cache为False时绕过元数据缓存（仍会刷新缓存）"""
         if connection_id not in self.connections:
             raise Exception(ERROR_MESSAGES["connection_not_found"])
         
@@ -1449,14 +4613,17 @@ class SSHManager:
         if connection.status != ConnectionStatus.CONNECTED:
             raise Exception("连接未建立")
         
+        if use_cache:
+            cached = connection.metadata_cache.get("stat", remote_path)
+            if cached is not None:
+                return dict(cached, cached=True)
+        
         try:
-            # 创建SFTP客户端
+            # 从会话池借用SFTP客户端
             loop = asyncio.get_event_loop()
-            sftp_client = await loop.run_in_executor(None, lambda: connection.client.open_sftp())
-            
-            try:
+            async with connection.sftp_session() as sftp_client:
                 # 获取文件属性
-                file_attr = await loop.run_in_executor(None, lambda: sftp_client.stat(remote_path))
+                file_attr = await loop.run_in_executor(self.executors.command, lambda: sftp_client.stat(remote_path))
                 
                 result = {
                     "success": True,
@@ -1467,15 +4634,14 @@ class SSHManager:
                     "permissions": oct(file_attr.st_mode)[-3:],
                     "is_directory": file_attr.st_mode is not None and (file_attr.st_mode & 0o040000) != 0,
                     "owner": file_attr.st_uid,
-                    "group": file_attr.st_gid
+                    "group": file_attr.st_gid,
+                    "cached": False
                 }
+                connection.metadata_cache.put("stat", remote_path, dict(result))
                 
                 logger.debug(f"获取远程文件信息成功: {remote_path}")
                 return result
                 
-            finally:
-                await loop.run_in_executor(None, sftp_client.close)
-                
         except Exception as e:
             error_msg = f"获取远程文件信息失败: {str(e)}"
             logger.error(error_msg)
@@ -1495,13 +4661,11 @@ class SSHManager:
             raise Exception("连接未建立")
         
         try:
-            # 创建SFTP客户端
+            # 从会话池借用SFTP客户端
             loop = asyncio.get_event_loop()
-            sftp_client = await loop.run_in_executor(None, lambda: connection.client.open_sftp())
-            
-            try:
+            async with connection.sftp_session() as sftp_client:
                 # 重命名
-                await loop.run_in_executor(None, lambda: sftp_client.rename(old_path, new_path))
+                await loop.run_in_executor(self.executors.command, lambda: sftp_client.rename(old_path, new_path))
                 
                 result = {
                     "success": True,
@@ -1513,9 +4677,6 @@ class SSHManager:
                 logger.info(f"重命名远程路径成功: {old_path} -> {new_path}")
                 return result
                 
-            finally:
-                await loop.run_in_executor(None, sftp_client.close)
-                
         except Exception as e:
             error_msg = f"重命名远程路径失败: {str(e)}"
             logger.error(error_msg)
@@ -1524,4 +4685,7 @@ class SSHManager:
                 "old_path": old_path,
                 "new_path": new_path,
                 "error": error_msg
-            }
\ No newline at end of file
+            }
+        finally:
+            connection.metadata_cache.invalidate(old_path)
+            connection.metadata_cache.invalidate(new_path)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+单元测试共用的模拟SSH对象
+提供模拟的SSHClient、能通过会话池可用性检查的模拟SFTP客户端、以本地目录为后端的SFTP客户端、已连接的SSHConnection和预置该连接的SSHManager，
+各测试文件只保留与被测功能相关的桩
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import paramiko
+from typing import Tuple
+from unittest.mock import Mock, patch
+from ssh_manager import SSHManager, SSHConnection, ConnectionStatus
+from config_loader import SSHAgentConfig
+
+
+def make_sftp_client() -> Mock:
+    """创建底层channel可用的模拟SFTP客户端"""
+    sftp_client = Mock()
+    channel = Mock()
+    channel.closed = False
+    channel.get_transport.return_value.is_active.return_value = True
+    sftp_client.get_channel.return_value = channel
+    return sftp_client
+
+
+class LocalBackedSFTP:
+    """把远程路径直接映射到本地文件系统的模拟SFTP客户端"""
+
+    def __init__(self):
+        self.get_channel = Mock(return_value=make_sftp_client().get_channel())
+
+    def listdir_iter(self, path, read_aheads=50):
+        with os.scandir(path) as entries:
+            for entry in entries:
+                yield paramiko.SFTPAttributes.from_stat(entry.stat(follow_symlinks=False), entry.name)
+
+    def listdir_attr(self, path):
+        return list(self.listdir_iter(path))
+
+    def stat(self, path):
+        return paramiko.SFTPAttributes.from_stat(os.stat(path))
+
+    def mkdir(self, path, mode=0o777):
+        os.mkdir(path, mode)
+
+    def utime(self, path, times):
+        os.utime(path, times)
+
+    def put(self, local_path, remote_path, callback=None):
+        shutil.copyfile(local_path, remote_path)
+
+    def get(self, remote_path, local_path, callback=None):
+        shutil.copyfile(remote_path, local_path)
+
+    def remove(self, path):
+        os.remove(path)
+
+    def rmdir(self, path):
+        os.rmdir(path)
+
+    def close(self):
+        pass
+
+
+def make_exec_result(stdout: bytes = b"ok\n", stderr: bytes = b"", exit_status: int = 0):
+    """构造SSHClient.exec_command的返回值(stdin, stdout, stderr)"""
+    stdout_file = Mock()
+    stdout_file.read.return_value = stdout
+    stdout_file.channel.recv_exit_status.return_value = exit_status
+    stderr_file = Mock()
+    stderr_file.read.return_value = stderr
+    return Mock(), stdout_file, stderr_file
+
+
+class FakeSSHClient:
+    """模拟paramiko.SSHClient：握手和exec_command耗时可控，记录同时执行的命令数
+
+    outcomes为多个客户端共享的列表，每次握手依次取出一项决定成功与否
+    """
+
+    def __init__(self, connect_delay=0.0, fail=False, outcomes=None, exec_delay=0.0):
+        self.connect_delay = connect_delay
+        self.fail = fail
+        self.outcomes = outcomes
+        self.exec_delay = exec_delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.commands = []
+        self.set_missing_host_key_policy = Mock()
+        self.connect = Mock(side_effect=self._connect)
+        self.close = Mock()
+        self.transport = Mock()
+        self.transport.is_active.return_value = True
+        self.get_transport = Mock(return_value=self.transport)
+
+    def _connect(self, **kwargs):
+        time.sleep(self.connect_delay)
+        if self.fail or (self.outcomes is not None and not self.outcomes.pop(0)):
+            raise OSError("Connection refused")
+
+    def exec_command(self, command, timeout=None):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.commands.append(command)
+        time.sleep(self.exec_delay)
+        with self.lock:
+            self.active -= 1
+        return make_exec_result()
+
+
+def patch_ssh_clients(**kwargs):
+    """替换paramiko.SSHClient，每次创建一个FakeSSHClient(**kwargs)，返回(patcher, 已创建的客户端列表)"""
+    clients = []
+
+    def create_client():
+        client = FakeSSHClient(**kwargs)
+        clients.append(client)
+        return client
+
+    return patch("ssh_manager.paramiko.SSHClient", side_effect=create_client), clients
+
+
+def mark_connected(connection: SSHConnection, client=None) -> SSHConnection:
+    """把连接置为CONNECTED状态
+
+    client默认为Mock，每次open_sftp返回一个新的make_sftp_client()
+    """
+    if client is None:
+        client = Mock()
+        client.open_sftp.side_effect = make_sftp_client
+    connection.client = client
+    connection.status = ConnectionStatus.CONNECTED
+    return connection
+
+
+def make_connection(host: str = "server.com", client=None, **kwargs) -> SSHConnection:
+    """创建已连接的SSHConnection，kwargs传给SSHConnection"""
+    return mark_connected(SSHConnection(host, "user", 22, **kwargs), client)
+
+
+def add_connection(manager: SSHManager, host: str = "server.com", username: str = "user", port: int = 22,
+                   client=None) -> Tuple[str, SSHConnection]:
+    """按管理器配置创建已连接的主机并登记到manager.connections，返回(connection_id, connection)"""
+    connection = mark_connected(manager._new_connection(host, username, port), client)
+    connection_id = manager.generate_connection_id(host, username, port)
+    manager.connections[connection_id] = connection
+    return connection_id, connection
+
+
+def make_manager(client=None, **config) -> Tuple[SSHManager, SSHConnection]:
+    """创建SSHManager并登记一个已连接的主机user@server.com:22，返回(manager, connection)
+
+    传输检查点默认写入临时目录，避免测试写入用户目录
+    """
+    config.setdefault("transfer_checkpoint_file", os.path.join(tempfile.mkdtemp(), "checkpoints.json"))
+    manager = SSHManager(SSHAgentConfig(**config))
+    _, connection = add_connection(manager, client=client)
+    return manager, connection
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+事件驱动异步命令输出读取的pytest测试
+使用基于os.pipe的模拟channel，验证输出在到达时即被写入缓冲区
+"""
+
+import pytest
+import asyncio
+import os
+from unittest.mock import Mock
+from ssh_manager import CommandStatus
+from ssh_test_helpers import make_manager
+
+
+class FakeChannel:
+    """模拟paramiko.Channel：有数据或EOF时fileno()可读"""
+
+    def __init__(self):
+        self._read_fd, self._write_fd = os.pipe()
+        self._stdout = bytearray()
+        self._stderr = bytearray()
+        self._signalled = False
+        self.eof_received = False
+        self.closed = False
+        self.exit_status = None
+
+    def _set(self):
+        if not self._signalled:
+            os.write(self._write_fd, b"*")
+            self._signalled = True
+
+    def _clear(self):
+        if self._signalled and not self._stdout and not self._stderr and not self.eof_received:
+            os.read(self._read_fd, 1)
+            self._signalled = False
+
+    def feed(self, data: bytes, stderr: bool = False):
+        (self._stderr if stderr else self._stdout).extend(data)
+        self._set()
+
+    def finish(self, exit_status: int = 0):
+        self.exit_status = exit_status
+        self.eof_received = True
+        self._set()
+
+    def fileno(self):
+        return self._read_fd
+
+    def recv_ready(self):
+        return bool(self._stdout)
+
+    def recv_stderr_ready(self):
+        return bool(self._stderr)
+
+    def recv(self, size):
+        data = bytes(self._stdout[:size])
+        del self._stdout[:size]
+        self._clear()
+        return data
+
+    def recv_stderr(self, size):
+        data = bytes(self._stderr[:size])
+        del self._stderr[:size]
+        self._clear()
+        return data
+
+    def exit_status_ready(self):
+        return self.exit_status is not None
+
+    def recv_exit_status(self):
+        return self.exit_status
+
+    def close(self):
+        self.closed = True
+        for fd in (self._read_fd, self._write_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def make_command_manager(**config):
+    manager, connection = make_manager(**config)
+    channels = []
+
+    def exec_command(command):
+        channel = FakeChannel()
+        channels.append(channel)
+        stdout = Mock()
+        stdout.channel = channel
+        return Mock(), stdout, Mock()
+
+    connection.client.exec_command.side_effect = exec_command
+    return manager, channels
+
+
+async def wait_until(predicate, timeout=2.0):
+    deadline = asyncio.get_event_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_event_loop().time() > deadline:
+            raise AssertionError("条件在超时前未满足")
+        await asyncio.sleep(0.005)
+
+
+class TestAsyncCommandReader:
+    """事件驱动读取器测试类"""
+
+    @pytest.mark.asyncio
+    async def test_output_is_pushed_on_arrival(self):
+        """测试输出到达后无需轮询即写入缓冲区"""
+        manager, channels = make_command_manager()
+        command_id = await manager.start_async_command("user@server.com:22", "tail -f log")
+
+        assert manager._output_monitor_task is None
+        assert command_id in manager._command_readers
+
+        channels[0].feed(b"line 1\n")
+        channels[0].feed(b"oops\n", stderr=True)
+        async_cmd = manager.async_commands[command_id]
+        await wait_until(lambda: async_cmd.stdout_size and async_cmd.stderr_size)
+
+        assert async_cmd.stdout_buffer.text() == "line 1\n"
+        assert async_cmd.stderr_buffer.text() == "oops\n"
+
+        channels[0].finish(0)
+        await wait_until(lambda: async_cmd.status == CommandStatus.COMPLETED)
+        assert async_cmd.exit_code == 0
+        assert command_id not in manager._command_readers
+        channels[0].close()
+
+    @pytest.mark.asyncio
+    async def test_terminate_removes_reader(self):
+        """测试终止命令时移除读取器"""
+        manager, channels = make_command_manager()
+        command_id = await manager.start_async_command("user@server.com:22", "sleep 100")
+
+        assert await manager.terminate_command(command_id)
+        assert command_id not in manager._command_readers
+        assert manager.async_commands[command_id].status == CommandStatus.TERMINATED
+
+    @pytest.mark.asyncio
+    async def test_many_concurrent_commands(self):
+        """测试500个并发命令的输出都能及时收集"""
+        manager, channels = make_command_manager()
+        command_ids = [
+            await manager.start_async_command("user@server.com:22", f"job {i}")
+            for i in range(500)
+        ]
+
+        for i, channel in enumerate(channels):
+            channel.feed(f"out {i}\n".encode())
+            channel.finish(0)
+
+        await wait_until(lambda: all(
+            manager.async_commands[cid].status == CommandStatus.COMPLETED for cid in command_ids
+        ))
+        for i, cid in enumerate(command_ids):
+            assert manager.async_commands[cid].stdout_buffer.text() == f"out {i}\n"
+        assert not manager._command_readers
+        for channel in channels:
+            channel.close()
+
+    @pytest.mark.asyncio
+    async def test_drain_limit_per_wakeup(self):
+        """测试每次可读事件最多读取drain上限，剩余输出在后续事件中读完后命令才结束"""
+        manager, channels = make_command_manager(interactive_drain_limit=64 * 1024)
+        command_id = await manager.start_async_command("user@server.com:22", "yes")
+        async_cmd = manager.async_commands[command_id]
+        content = b"y\n" * (512 * 1024)
+
+        manager._unregister_command_reader(command_id)
+        channels[0].feed(content)
+        channels[0].finish(0)
+        manager._on_command_readable(command_id)
+        assert async_cmd.stdout_size == 64 * 1024
+        assert async_cmd.status == CommandStatus.RUNNING
+
+        manager._register_command_reader(command_id, async_cmd)
+        await wait_until(lambda: async_cmd.status == CommandStatus.COMPLETED)
+        assert async_cmd.stdout_size == len(content)
+        channels[0].close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+并发自动连接的pytest测试
+测试握手并发上限、单主机超时、失败汇总以及后台自动连接
+"""
+
+import pytest
+import asyncio
+import time
+from unittest.mock import Mock, patch
+from ssh_manager import SSHManager, ConnectionStatus
+from config_loader import SSHAgentConfig, SSHConnectionConfig
+from ssh_test_helpers import add_connection
+
+
+def make_hosts(count):
+    return [SSHConnectionConfig(name=f"node-{i}", host=f"node{i}", username="ops") for i in range(count)]
+
+
+def make_manager(handshake_seconds=0.05, **config):
+    manager = SSHManager(SSHAgentConfig(**config))
+    stats = {"running": 0, "peak": 0}
+
+    async def fake_create_connection(host, username, port=22, **kwargs):
+        stats["running"] += 1
+        stats["peak"] = max(stats["peak"], stats["running"])
+        try:
+            await asyncio.sleep(30 if host == "node-hung" else handshake_seconds)
+        finally:
+            stats["running"] -= 1
+        connection_id, connection = add_connection(manager, host, username, port)
+        if host == "node1":
+            connection.status = ConnectionStatus.ERROR
+            connection.error_message = "认证失败"
+        return connection_id
+
+    manager.create_connection = fake_create_connection
+    return manager, stats
+
+
+class TestAutoConnect:
+    """并发自动连接测试类"""
+
+    @pytest.mark.asyncio
+    async def test_connects_concurrently_with_limit(self):
+        """测试握手并发进行且不超过并发上限，失败主机汇总报告"""
+        manager, stats = make_manager(auto_connect_parallelism=4)
+
+        result = await manager.connect_many(make_hosts(12))
+
+        assert stats["peak"] == 4
+        assert result["total"] == 12
+        assert len(result["connected"]) == 11
+        assert result["failed"] == [{"name": "node-1", "error": "认证失败"}]
+        assert not result["success"]
+        # 12台主机分3批握手，远小于逐台连接的耗时
+        assert result["elapsed"] < 0.05 * 12
+
+    @pytest.mark.asyncio
+    async def test_per_host_timeout(self):
+        """测试握手超时的主机单独报告，不影响其他主机"""
+        manager, stats = make_manager(auto_connect_timeout=1)
+        hosts = make_hosts(2) + [SSHConnectionConfig(name="hung", host="node-hung", username="ops")]
+
+        result = await manager.connect_many(hosts)
+
+        assert [item["name"] for item in result["connected"]] == ["node-0"]
+        assert {item["name"] for item in result["failed"]} == {"node-1", "hung"}
+        assert "超时" in [item for item in result["failed"] if item["name"] == "hung"][0]["error"]
+
+    @pytest.mark.asyncio
+    async def test_background_auto_connect(self):
+        """测试后台自动连接立即返回，等待时得到同一份汇总"""
+        manager, stats = make_manager(handshake_seconds=0.1)
+
+        task = manager.start_auto_connect(make_hosts(3))
+        assert not task.done()
+        assert manager.start_auto_connect(make_hosts(3)) is task
+
+        summary = await manager.wait_auto_connect()
+        assert summary["total"] == 3
+        assert len(summary["connected"]) == 2
+        assert await manager.wait_auto_connect() is None
+
+    @pytest.mark.asyncio
+    async def test_timed_out_handshake_reported_pending(self):
+        """测试超时但握手仍在进行的主机归入pending，握手完成后连接可用"""
+        manager = SSHManager()
+
+        def slow_client():
+            client = Mock()
+            client.connect.side_effect = lambda **kwargs: time.sleep(0.3)
+            return client
+
+        host = SSHConnectionConfig(name="slow", host="node-slow", username="ops", password="secret")
+        with patch("ssh_manager.paramiko.SSHClient", side_effect=slow_client):
+            result = await manager.connect_many([host], timeout=0.05)
+
+            assert result["failed"] == []
+            assert [item["name"] for item in result["pending"]] == ["slow"]
+            assert "超时" in result["pending"][0]["error"]
+            assert not result["success"]
+
+            connection_id = result["pending"][0]["connection_id"]
+            await manager._connecting[connection_id]
+        assert manager.connections[connection_id].status == ConnectionStatus.CONNECTED
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
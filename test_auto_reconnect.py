@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+后台自动重连的pytest测试
+测试指数退避间隔、健康检查触发重连、重连期间命令排队等待以及等待超时和放弃重连
+"""
+
+import pytest
+from ssh_manager import SSHManager, SSHConnection, ConnectionStatus
+from config_loader import SSHAgentConfig
+from ssh_test_helpers import patch_ssh_clients
+
+
+def make_manager(outcomes, **config):
+    config.setdefault("reconnect_base_delay", 0.01)
+    config.setdefault("reconnect_jitter", 0)
+    manager = SSHManager(SSHAgentConfig(**config))
+    factory, _ = patch_ssh_clients(outcomes=outcomes)
+    return manager, factory
+
+
+def drop_connection(connection):
+    """模拟sshd重启：传输层失效，连接被标记为ERROR"""
+    connection.client.transport.is_active.return_value = False
+    connection.status = ConnectionStatus.ERROR
+    connection.error_message = "SSH传输层不活跃"
+
+
+class TestAutoReconnect:
+    """自动重连测试类"""
+
+    def test_backoff_delays(self):
+        """测试退避间隔指数增长并封顶，抖动只会缩短间隔"""
+        manager = SSHManager(SSHAgentConfig(reconnect_base_delay=1, reconnect_max_delay=10, reconnect_jitter=0))
+        assert [manager._reconnect_delay(attempt) for attempt in range(6)] == [1, 2, 4, 8, 10, 10]
+
+        manager = SSHManager(SSHAgentConfig(reconnect_base_delay=1, reconnect_max_delay=10, reconnect_jitter=0.5))
+        delays = [manager._reconnect_delay(3) for _ in range(50)]
+        assert all(4 <= delay <= 8 for delay in delays)
+        assert len(set(delays)) > 1
+
+    @pytest.mark.asyncio
+    async def test_health_check_triggers_reconnect(self):
+        """测试健康检查发现断开后在同一连接对象上重连"""
+        manager, factory = make_manager([True, False, True])
+        with factory:
+            connection_id = await manager.create_connection("server.com", "user", password="secret")
+            connection = manager.connections[connection_id]
+            # 连接状态仍为CONNECTED，由健康检查发现传输层失效
+            connection.client.transport.is_active.return_value = False
+
+            await manager._check_all_connections(force=True)
+            assert manager.get_reconnect_status(connection_id)["in_progress"]
+            assert await manager._reconnect_tasks[connection_id]
+
+        assert manager.connections[connection_id] is connection
+        assert connection.status == ConnectionStatus.CONNECTED
+        status = manager.get_reconnect_status(connection_id)
+        assert status["reconnects"] == 1
+        assert status["attempts"] == 2
+        assert not status["in_progress"]
+
+    @pytest.mark.asyncio
+    async def test_command_waits_for_reconnect(self):
+        """测试重连期间发出的命令排队等待，重连成功后正常执行"""
+        manager, factory = make_manager([True, False, False, True])
+        with factory:
+            connection_id = await manager.create_connection("server.com", "user", password="secret")
+            drop_connection(manager.connections[connection_id])
+
+            result = await manager.execute_command(connection_id, "uptime")
+
+        assert result["success"]
+        assert result["stdout"] == "ok\n"
+        assert manager.get_reconnect_status(connection_id)["attempts"] == 3
+
+    @pytest.mark.asyncio
+    async def test_command_deadline_and_disconnect(self):
+        """测试命令等待超过期限后返回失败，手动断开时停止重连"""
+        manager, factory = make_manager(
+            [True] + [False] * 100, reconnect_base_delay=0.05, reconnect_command_wait=0.1
+        )
+        with factory:
+            connection_id = await manager.create_connection("server.com", "user", password="secret")
+            drop_connection(manager.connections[connection_id])
+
+            result = await manager.execute_command(connection_id, "uptime")
+            assert not result["success"]
+            assert "重连失败" in result["stderr"]
+            task = manager._reconnect_tasks[connection_id]
+            assert not task.done()
+
+            await manager.disconnect(connection_id)
+        assert task.cancelled()
+        assert manager._reconnect_tasks == {}
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self):
+        """测试达到最大尝试次数后放弃重连，连接保持ERROR状态"""
+        manager, factory = make_manager([True, False, False, False], reconnect_max_attempts=3)
+        with factory:
+            connection_id = await manager.create_connection("server.com", "user", password="secret")
+            drop_connection(manager.connections[connection_id])
+            assert not await manager._schedule_reconnect(connection_id)
+
+        assert manager.connections[connection_id].status == ConnectionStatus.ERROR
+        status = manager.get_reconnect_status(connection_id)
+        assert status["gave_up"] == 1
+        assert status["attempts"] == 3
+        assert "Connection refused" in status["last_error"]
+
+    @pytest.mark.asyncio
+    async def test_no_reconnect_without_credentials(self):
+        """测试没有成功认证过的连接或关闭自动重连时命令立即失败"""
+        manager = SSHManager()
+        connection = SSHConnection("server.com", "user", 22)
+        connection.status = ConnectionStatus.ERROR
+        manager.connections["user@server.com:22"] = connection
+
+        result = await manager.execute_command("user@server.com:22", "uptime")
+        assert not result["success"]
+        assert manager._reconnect_tasks == {}
+
+        manager, factory = make_manager([True], auto_reconnect=False)
+        with factory:
+            connection_id = await manager.create_connection("server.com", "user", password="secret")
+            drop_connection(manager.connections[connection_id])
+            result = await manager.execute_command(connection_id, "uptime")
+        assert not result["success"]
+        assert manager._reconnect_tasks == {}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
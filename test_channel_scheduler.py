@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+单连接channel调度的pytest测试
+测试每条传输层的channel上限、FIFO排队顺序、排队耗时统计以及额外传输层的扩展
+"""
+
+import pytest
+import asyncio
+from unittest.mock import Mock, patch
+from ssh_manager import SSHManager, ChannelScheduler, ConnectionStatus
+from ssh_test_helpers import FakeSSHClient, make_connection
+
+
+def make_scheduled_connection(client, max_channels=2, max_extra_transports=0):
+    connection = make_connection(client=client, max_channels=max_channels,
+                                 max_extra_transports=max_extra_transports)
+    connection.mark_activity()
+    return connection
+
+
+class TestChannelScheduler:
+    """channel调度测试类"""
+
+    @pytest.mark.asyncio
+    async def test_limit_and_queue_wait(self):
+        """测试同时打开的channel不超过上限，排队的命令报告等待时间"""
+        client = FakeSSHClient(exec_delay=0.05)
+        connection = make_scheduled_connection(client, max_channels=2)
+        manager = SSHManager()
+        manager.connections["user@server.com:22"] = connection
+
+        results = await asyncio.gather(*[
+            manager.execute_command("user@server.com:22", f"echo {i}") for i in range(6)
+        ])
+
+        assert all(result["success"] for result in results)
+        assert client.peak == 2
+        waits = sorted(result["queue_wait"] for result in results)
+        assert waits[:2] == [0.0, 0.0]
+        assert waits[-1] >= 0.08
+        stats = connection.channel_scheduler.stats()
+        assert stats["acquired"] == 6
+        assert stats["queued_total"] == 4
+        assert stats["active"] == 0
+        assert stats["extra_transports"] == 0
+
+    @pytest.mark.asyncio
+    async def test_fifo_order(self):
+        """测试释放的名额按到达顺序交给等待者"""
+        scheduler = ChannelScheduler(max_channels=1)
+        first, _ = await scheduler.acquire()
+        order = []
+
+        async def waiter(i):
+            lane, _ = await scheduler.acquire()
+            order.append(i)
+            await asyncio.sleep(0)
+            scheduler.release(lane)
+
+        tasks = [asyncio.create_task(waiter(i)) for i in range(5)]
+        await asyncio.sleep(0.01)
+        assert scheduler.stats()["queued"] == 5
+
+        # 名额释放后，新到的请求不能插到等待者前面
+        scheduler.release(first)
+        late = asyncio.create_task(waiter("late"))
+        await asyncio.gather(*tasks, late)
+        assert order == [0, 1, 2, 3, 4, "late"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        """测试排队中被取消的请求不会占用名额"""
+        scheduler = ChannelScheduler(max_channels=1)
+        lane, _ = await scheduler.acquire()
+        task = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        scheduler.release(lane)
+
+        assert scheduler.stats()["queued"] == 0
+        assert scheduler.stats()["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_extra_transport_on_saturation(self):
+        """测试channel占满时按需额外打开传输层，断开连接时一并关闭"""
+        primary = FakeSSHClient(exec_delay=0.05)
+        extra = FakeSSHClient(exec_delay=0.05)
+        connection = make_scheduled_connection(primary, max_channels=2, max_extra_transports=1)
+        connection._auth_kwargs = {"hostname": "server.com", "username": "user", "port": 22}
+
+        with patch("ssh_manager.paramiko.SSHClient", return_value=extra):
+            results = await asyncio.gather(*[
+                connection.execute_command(f"echo {i}", timing=timing)
+                for i, timing in enumerate([{} for _ in range(8)])
+            ])
+
+        assert all(exit_code == 0 for exit_code, _, _ in results)
+        assert primary.peak <= 2 and extra.peak <= 2
+        assert len(extra.commands) > 0
+        extra.connect.assert_called_once_with(hostname="server.com", username="user", port=22)
+        stats = connection.channel_scheduler.stats()
+        assert stats["extra_transports"] == 1
+        assert [lane["index"] for lane in stats["transports"]] == [0, 1]
+
+        await connection.disconnect()
+        extra.close.assert_called_once()
+        assert connection.channel_scheduler.stats()["extra_transports"] == 0
+
+    @pytest.mark.asyncio
+    async def test_broken_extra_transport_is_dropped(self):
+        """测试额外传输层断开时只移除该传输层，主连接保持可用"""
+        connection = make_scheduled_connection(FakeSSHClient(exec_delay=0.05), max_channels=1, max_extra_transports=1)
+        broken = Mock()
+        broken.exec_command.side_effect = EOFError("transport closed")
+        broken.get_transport.return_value.is_active.return_value = False
+        scheduler = connection.channel_scheduler
+        lane = scheduler.lanes[0]
+        scheduler.lanes.append(type(lane)(1, broken))
+        lane.active = 1
+
+        exit_code, _, stderr = await connection.execute_command("uptime")
+        lane.active = 0
+
+        assert exit_code == -1
+        assert "transport closed" in stderr
+        assert connection.status == ConnectionStatus.CONNECTED
+        assert scheduler.stats()["extra_transports"] == 0
+        broken.close.assert_called_once()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
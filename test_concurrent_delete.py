@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+远程目录并发删除的pytest测试
+测试多会话并发删除、删除计数以及rm -rf快速删除的路径安全检查
+"""
+
+import pytest
+import os
+import tempfile
+import threading
+import time
+from unittest.mock import AsyncMock
+from ssh_test_helpers import LocalBackedSFTP, make_manager
+
+
+class RecordingSFTP(LocalBackedSFTP):
+    """记录各线程删除调用的本地模拟SFTP客户端"""
+
+    threads = set()
+
+    def remove(self, path):
+        self.threads.add(threading.get_ident())
+        super().remove(path)
+        # 模拟网络往返延迟
+        time.sleep(0.001)
+
+
+def make_delete_manager():
+    manager, connection = make_manager(sftp_pool_size=4)
+    connection.client.open_sftp.side_effect = RecordingSFTP
+    return manager, connection
+
+
+class TestConcurrentDelete:
+    """并发删除测试类"""
+
+    @pytest.mark.asyncio
+    async def test_removes_tree_concurrently(self):
+        """测试多会话并发删除整棵目录树并返回删除条目数"""
+        manager, connection = make_delete_manager()
+        RecordingSFTP.threads.clear()
+        with tempfile.TemporaryDirectory() as work_dir:
+            root = os.path.join(work_dir, "node_modules")
+            for i in range(200):
+                path = os.path.join(root, f"pkg{i % 10}", "lib" if i % 2 else "", f"f{i}.js")
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                open(path, "w").close()
+            os.symlink("pkg0", os.path.join(root, "link"))
+
+            result = await manager.remove_remote_file("user@server.com:22", root)
+
+            assert result["success"], result.get("error")
+            assert result["type"] == "目录"
+            assert result["method"] == "sftp"
+            # 200个文件 + 1个符号链接 + 10个包目录 + 5个lib目录 + 根目录
+            assert result["deleted_count"] == 217
+            assert not os.path.exists(root)
+        assert connection.sftp_pool.stats()["opened"] == 4
+        assert len(RecordingSFTP.threads) > 1
+
+    @pytest.mark.asyncio
+    async def test_fast_path_rejects_unsafe_paths(self):
+        """测试rm -rf快速删除拒绝相对路径、系统目录和家目录"""
+        manager, connection = make_delete_manager()
+        connection.execute_command = AsyncMock(return_value=(0, "/srv/www/deploy", ""))
+
+        for path in ("relative/dir", "/", "/usr", "//usr/local/", "/usr/local/../bin", "/srv/www"):
+            with pytest.raises(Exception):
+                await manager._remove_remote_tree_with_rm(connection, path)
+        with pytest.raises(Exception, match="家目录"):
+            await manager._remove_remote_tree_with_rm(connection, "/srv/www/deploy/")
+
+    @pytest.mark.asyncio
+    async def test_fast_path_runs_rm(self):
+        """测试快速删除在远端执行rm -rf并返回条目数"""
+        manager, connection = make_delete_manager()
+        connection.execute_command = AsyncMock(side_effect=[(0, "/home/deploy", ""), (0, "1532\n", "")])
+
+        count = await manager._remove_remote_tree_with_rm(connection, "/srv/app/node_modules")
+
+        assert count == 1532
+        command = connection.execute_command.call_args[0][0]
+        assert "rm -rf -- /srv/app/node_modules" in command
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
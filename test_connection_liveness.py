@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+被动存活检测的pytest测试
+测试execute_command在近期有通信时跳过健康探测，空闲超时后才探测
+"""
+
+import pytest
+import time
+from ssh_manager import ConnectionStatus
+from ssh_test_helpers import make_connection, make_exec_result
+
+
+def make_probed_connection(idle_probe_threshold=60):
+    connection = make_connection(idle_probe_threshold=idle_probe_threshold)
+    connection.client.get_transport.return_value.is_active.return_value = True
+    connection.client.exec_command.return_value = make_exec_result()
+    return connection
+
+
+class TestConnectionLiveness:
+    """被动存活检测测试类"""
+
+    @pytest.mark.asyncio
+    async def test_recent_activity_skips_probe(self):
+        """测试近期有通信时不发送探测命令"""
+        connection = make_probed_connection()
+        connection.mark_activity()
+
+        exit_code, stdout, _ = await connection.execute_command("uptime")
+
+        assert exit_code == 0
+        assert stdout == "ok\n"
+        assert connection.client.exec_command.call_count == 1
+        assert connection.probes_skipped == 1
+        assert connection.probes_sent == 0
+
+    @pytest.mark.asyncio
+    async def test_idle_connection_is_probed(self):
+        """测试空闲超过阈值时发送探测"""
+        connection = make_probed_connection(idle_probe_threshold=10)
+        connection.last_activity = time.monotonic() - 60
+
+        await connection.execute_command("uptime")
+
+        assert connection.probes_sent == 1
+        assert connection.client.exec_command.call_count == 2
+        # 命令成功后不再需要探测
+        await connection.execute_command("uptime")
+        assert connection.probes_sent == 1
+        assert connection.probes_skipped == 1
+
+    @pytest.mark.asyncio
+    async def test_inactive_transport_fails_without_probe(self):
+        """测试传输层不活跃时直接判定断开"""
+        connection = make_probed_connection()
+        connection.mark_activity()
+        connection.client.get_transport.return_value.is_active.return_value = False
+
+        exit_code, _, stderr = await connection.execute_command("uptime")
+
+        assert exit_code == -1
+        assert connection.status == ConnectionStatus.ERROR
+        connection.client.exec_command.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_command_error_marks_connection_broken(self):
+        """测试真实命令失败且传输层断开时标记连接错误"""
+        connection = make_probed_connection()
+        connection.mark_activity()
+
+        def fail(*args, **kwargs):
+            connection.client.get_transport.return_value.is_active.return_value = False
+            raise EOFError("channel closed")
+
+        connection.client.exec_command.side_effect = fail
+
+        exit_code, _, _ = await connection.execute_command("uptime")
+
+        assert exit_code == -1
+        assert connection.status == ConnectionStatus.ERROR
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
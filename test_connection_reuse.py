@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+重复ssh_connect复用已有连接的pytest测试
+测试健康连接直接复用、force_reconnect强制重连、断开的连接重新握手以及并发连接合并为一次握手
+"""
+
+import pytest
+import asyncio
+from unittest.mock import patch
+from ssh_manager import SSHManager, ConnectionStatus
+from ssh_test_helpers import FakeSSHClient, patch_ssh_clients
+
+
+def handshakes(clients):
+    return sum(client.connect.call_count for client in clients)
+
+
+class TestConnectionReuse:
+    """连接复用测试类"""
+
+    @pytest.mark.asyncio
+    async def test_healthy_connection_is_reused(self):
+        """测试已有健康连接时不重新握手，也不替换连接对象"""
+        manager = SSHManager()
+        factory, clients = patch_ssh_clients()
+        with factory:
+            connection_id = await manager.create_connection("server.com", "user", password="secret")
+            connection = manager.connections[connection_id]
+            again = await manager.create_connection("server.com", "user", password="secret")
+
+        assert again == connection_id
+        assert manager.connections[connection_id] is connection
+        assert handshakes(clients) == 1
+        connection.client.close.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_force_reconnect(self):
+        """测试force_reconnect为True时断开旧连接并重新握手"""
+        manager = SSHManager()
+        factory, clients = patch_ssh_clients()
+        with factory:
+            connection_id = await manager.create_connection("server.com", "user", password="secret")
+            old = manager.connections[connection_id]
+            await manager.create_connection("server.com", "user", password="secret", force_reconnect=True)
+
+        assert handshakes(clients) == 2
+        assert manager.connections[connection_id] is not old
+        assert old.status == ConnectionStatus.DISCONNECTED
+
+    @pytest.mark.asyncio
+    async def test_dead_connection_is_replaced(self):
+        """测试传输层已断开或上次连接失败时重新握手"""
+        manager = SSHManager()
+        factory, clients = patch_ssh_clients()
+        with factory:
+            connection_id = await manager.create_connection("server.com", "user", password="secret")
+            manager.connections[connection_id].client.transport.is_active.return_value = False
+            await manager.create_connection("server.com", "user", password="secret")
+        assert handshakes(clients) == 2
+        assert manager.connections[connection_id].status == ConnectionStatus.CONNECTED
+
+        manager = SSHManager()
+        clients = [FakeSSHClient(fail=True), FakeSSHClient()]
+        with patch("ssh_manager.paramiko.SSHClient", side_effect=clients):
+            connection_id = await manager.create_connection("server.com", "user", password="secret")
+            assert manager.connections[connection_id].status == ConnectionStatus.ERROR
+            await manager.create_connection("server.com", "user", password="secret")
+        assert manager.connections[connection_id].status == ConnectionStatus.CONNECTED
+
+    @pytest.mark.asyncio
+    async def test_concurrent_connects_share_one_handshake(self):
+        """测试同一连接ID的并发连接只进行一次握手，被取消的调用方不影响其他调用方"""
+        manager = SSHManager()
+        factory, clients = patch_ssh_clients(connect_delay=0.1)
+        with factory:
+            callers = [
+                asyncio.create_task(manager.create_connection("server.com", "user", password="secret"))
+                for _ in range(5)
+            ]
+            await asyncio.sleep(0.02)
+            callers[0].cancel()
+            results = await asyncio.gather(*callers[1:])
+
+            # 握手完成后的连接请求直接复用
+            await manager.create_connection("server.com", "user", password="secret")
+
+        assert set(results) == {"user@server.com:22"}
+        assert handshakes(clients) == 1
+        assert manager.connections["user@server.com:22"].status == ConnectionStatus.CONNECTED
+        assert manager._connecting == {}
+
+    @pytest.mark.asyncio
+    async def test_force_reconnect_joins_inflight_handshake(self):
+        """测试握手进行中到达的force_reconnect请求共享这次握手"""
+        manager = SSHManager()
+        factory, clients = patch_ssh_clients(connect_delay=0.05)
+        with factory:
+            first = asyncio.create_task(manager.create_connection("server.com", "user", password="secret"))
+            await asyncio.sleep(0.01)
+            await manager.create_connection("server.com", "user", password="secret", force_reconnect=True)
+            await first
+
+        assert handshakes(clients) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
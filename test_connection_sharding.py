@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+单连接多传输层的pytest测试
+测试连接建立时打开常驻传输层、按负载最低分配命令、部分失败和每条传输层的统计
+"""
+
+import pytest
+import asyncio
+from unittest.mock import patch
+from ssh_manager import SSHManager, SSHConnection
+from config_loader import SSHAgentConfig
+from ssh_test_helpers import FakeSSHClient
+
+
+class TestConnectionSharding:
+    """多传输层测试类"""
+
+    @pytest.mark.asyncio
+    async def test_commands_spread_across_transports(self):
+        """测试连接建立时打开全部常驻传输层，并发命令分散到各传输层"""
+        clients = [FakeSSHClient(exec_delay=0.05) for _ in range(3)]
+        manager = SSHManager(SSHAgentConfig(transports_per_connection=3, max_channels_per_connection=2))
+
+        with patch("ssh_manager.paramiko.SSHClient", side_effect=clients):
+            connection_id = await manager.create_connection("server.com", "user", password="secret")
+            results = await asyncio.gather(*[
+                manager.execute_command(connection_id, f"echo {i}") for i in range(6)
+            ])
+
+        assert all(result["success"] for result in results)
+        assert [len(client.commands) for client in clients] == [2, 2, 2]
+        assert all(result["queue_wait"] == 0.0 for result in results)
+        assert sorted(result["transport"] for result in results) == [0, 0, 1, 1, 2, 2]
+
+        stats = manager.get_transport_stats(connection_id)[connection_id]
+        assert stats["pooled_transports"] == 2
+        assert stats["extra_transports"] == 0
+        for lane in stats["transports"]:
+            assert lane["channels_opened"] == 2
+            assert lane["peak_active"] == 2
+            assert 0 < lane["utilization"] <= 1
+
+    @pytest.mark.asyncio
+    async def test_least_loaded_placement(self):
+        """测试命令分配到当前活跃channel最少的传输层"""
+        connection = SSHConnection("server.com", "user", 22, max_channels=4, transports=2)
+        scheduler = connection.channel_scheduler
+        scheduler.add_lane(FakeSSHClient(exec_delay=0.05), pooled=True)
+
+        lanes = [(await scheduler.acquire())[0].index for _ in range(4)]
+        assert sorted(lanes) == [0, 0, 1, 1]
+
+        scheduler.release(scheduler.lanes[1])
+        scheduler.release(scheduler.lanes[1])
+        lane, _ = await scheduler.acquire()
+        assert lane.index == 1
+
+    @pytest.mark.asyncio
+    async def test_partial_failure_and_reconnect(self):
+        """测试部分常驻传输层打开失败时连接仍然可用，重新连接时关闭旧的传输层"""
+        first = [FakeSSHClient(exec_delay=0.05), FakeSSHClient(exec_delay=0.05), FakeSSHClient(exec_delay=0.05, fail=True)]
+        connection = SSHConnection("server.com", "user", 22, transports=3)
+
+        with patch("ssh_manager.paramiko.SSHClient", side_effect=first):
+            assert await connection.connect(password="secret")
+        stats = connection.channel_scheduler.stats()
+        assert stats["pooled_transports"] == 1
+
+        second = [FakeSSHClient(exec_delay=0.05), FakeSSHClient(exec_delay=0.05), FakeSSHClient(exec_delay=0.05)]
+        with patch("ssh_manager.paramiko.SSHClient", side_effect=second):
+            assert await connection.connect(password="secret")
+
+        first[1].close.assert_called_once()
+        assert connection.channel_scheduler.stats()["pooled_transports"] == 2
+
+        await connection.disconnect()
+        for client in second:
+            client.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_single_transport_by_default(self):
+        """测试默认配置下不额外打开传输层"""
+        clients = [FakeSSHClient(exec_delay=0.05)]
+        manager = SSHManager()
+        with patch("ssh_manager.paramiko.SSHClient", side_effect=clients):
+            connection_id = await manager.create_connection("server.com", "user", password="secret")
+
+        stats = manager.get_transport_stats()
+        assert list(stats) == [connection_id]
+        assert len(stats[connection_id]["transports"]) == 1
+        with pytest.raises(Exception):
+            manager.get_transport_stats("user@missing:22")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
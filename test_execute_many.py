@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+ssh_execute_many多主机批量执行的pytest测试
+测试结果分组、并发上限、单主机超时以及配置主机的按需连接
+"""
+
+import pytest
+import asyncio
+from unittest.mock import patch
+from ssh_manager import SSHManager, ConnectionStatus
+from config_loader import SSHAgentConfig, SSHConnectionConfig
+from ssh_test_helpers import add_connection
+
+
+def add_host(manager, host, handler):
+    connection_id, connection = add_connection(manager, host)
+    connection.execute_command = handler
+    return connection_id
+
+
+class TestExecuteMany:
+    """批量执行测试类"""
+
+    @pytest.mark.asyncio
+    async def test_groups_identical_output(self):
+        """测试输出相同的主机归为一组，失败和未连接的主机单独分组"""
+        manager = SSHManager()
+        ids = []
+        for i in range(4):
+            async def handler(command, timeout=30):
+                return 0, "Ubuntu 22.04\n", ""
+            ids.append(add_host(manager, f"web{i}", handler))
+
+        async def failing(command, timeout=30):
+            return 1, "", "command not found\n"
+        ids.append(add_host(manager, "db0", failing))
+        ids.append("user@missing:22")
+
+        result = await manager.execute_many("lsb_release -ds", connection_ids=ids)
+
+        assert result["total"] == 6
+        assert result["succeeded"] == 4
+        assert result["failed"] == 1
+        assert result["errors"] == 1
+        assert not result["success"]
+        first = result["groups"][0]
+        assert first["exit_code"] == 0
+        assert first["hosts"] == ids[:4]
+        assert first["stdout"] == "Ubuntu 22.04\n"
+        assert len(result["groups"]) == 3
+
+    @pytest.mark.asyncio
+    async def test_parallelism_and_timeout(self):
+        """测试同时执行的主机数不超过上限，超时的主机单独报告"""
+        manager = SSHManager()
+        running = 0
+        peak = 0
+
+        async def slow(command, timeout=30):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.05)
+            running -= 1
+            return 0, "ok\n", ""
+
+        async def hung(command, timeout=30):
+            await asyncio.sleep(10)
+
+        ids = [add_host(manager, f"host{i}", slow) for i in range(6)]
+        ids.append(add_host(manager, "stuck", hung))
+
+        result = await manager.execute_many("uptime", connection_ids=ids, timeout=1, max_parallel=3)
+
+        assert peak == 3
+        assert result["succeeded"] == 6
+        assert result["errors"] == 1
+        timeout_group = [group for group in result["groups"] if group["error"]][0]
+        assert timeout_group["hosts"] == ["user@stuck:22"]
+        assert "超时" in timeout_group["error"]
+
+    @pytest.mark.asyncio
+    async def test_connects_config_hosts_lazily(self):
+        """测试配置中尚未连接的主机按需连接，已连接的主机直接复用"""
+        manager = SSHManager(SSHAgentConfig())
+
+        async def handler(command, timeout=30):
+            return 0, "up\n", ""
+        add_host(manager, "app1", handler)
+
+        async def fake_create_connection(host, username, port=22, **kwargs):
+            connection_id = add_host(manager, host, handler)
+            if host == "app3":
+                manager.connections[connection_id].status = ConnectionStatus.ERROR
+                manager.connections[connection_id].error_message = "认证失败"
+            return connection_id
+
+        hosts = [SSHConnectionConfig(name=f"app-{i}", host=f"app{i}", username="user") for i in (1, 2, 3)]
+        with patch.object(manager, "create_connection", side_effect=fake_create_connection) as create:
+            result = await manager.execute_many("uptime", host_configs=hosts)
+
+        assert [call.kwargs["host"] for call in create.call_args_list] == ["app2", "app3"]
+        assert result["connected"] == ["user@app2:22"]
+        assert result["groups"][0]["hosts"] == ["app-1", "app-2"]
+        assert "认证失败" in result["groups"][1]["error"]
+
+        with pytest.raises(Exception, match="没有指定目标主机"):
+            await manager.execute_many("uptime")
+
+    @pytest.mark.asyncio
+    async def test_dropped_connection_is_error_and_queue_excluded(self):
+        """测试执行中断开的连接归入errors，duration不包含排队等待时间"""
+        manager = SSHManager()
+
+        async def slow(command, timeout=30):
+            await asyncio.sleep(0.1)
+            return 0, "ok\n", ""
+
+        async def dropped(command, timeout=30):
+            return -1, "", "SSH连接已断开"
+
+        ids = [add_host(manager, f"host{i}", slow) for i in range(2)]
+        ids.append(add_host(manager, "gone", dropped))
+
+        result = await manager.execute_many("uptime", connection_ids=ids, max_parallel=1)
+
+        assert result["succeeded"] == 2
+        assert result["failed"] == 0
+        assert result["errors"] == 1
+        error_group = [group for group in result["groups"] if group["error"]][0]
+        assert error_group["hosts"] == ["user@gone:22"]
+        assert error_group["exit_code"] is None
+        assert "SSH连接已断开" in error_group["error"]
+        # 第二台主机排队等待了约0.1秒，但只计执行时间
+        assert all(result["durations"][host] < 0.18 for host in ids[:2])
+
+    @pytest.mark.asyncio
+    async def test_durations_keyed_by_connection_id(self):
+        """测试显示名称相同的主机各自记录耗时"""
+        manager = SSHManager(SSHAgentConfig())
+
+        async def handler(command, timeout=30):
+            return 0, "up\n", ""
+        for host in ("db1", "db2"):
+            add_host(manager, host, handler)
+
+        hosts = [SSHConnectionConfig(name="db", host=host, username="user") for host in ("db1", "db2")]
+        result = await manager.execute_many("uptime", host_configs=hosts)
+
+        assert result["groups"][0]["hosts"] == ["db", "db"]
+        assert set(result["durations"]) == {"user@db1:22", "user@db2:22"}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
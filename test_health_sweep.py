@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+批量健康检查和keep-alive的pytest测试
+测试并发扫描、单连接超时、按最近通信时间顺延的调度以及扫描指标
+"""
+
+import pytest
+import asyncio
+import time
+from unittest.mock import AsyncMock
+from ssh_manager import SSHManager, ConnectionStatus
+from config_loader import SSHAgentConfig
+from ssh_test_helpers import add_connection
+
+
+def add_probed_connection(manager, host, ensure_alive=None, send_keepalive=None):
+    connection_id, connection = add_connection(manager, host)
+    connection.ensure_alive = ensure_alive or AsyncMock(return_value=True)
+    connection.send_keepalive = send_keepalive or AsyncMock(return_value=True)
+    connection.sftp_pool.evict_idle = AsyncMock(return_value=0)
+    return connection_id, connection
+
+
+class TestHealthSweep:
+    """批量健康检查测试类"""
+
+    @pytest.mark.asyncio
+    async def test_sweep_is_concurrent_with_timeout(self):
+        """测试慢连接不拖慢整轮扫描，超时连接单独记录"""
+        manager = SSHManager(SSHAgentConfig(health_check_timeout=0.2, health_check_concurrency=8))
+
+        async def slow_probe():
+            await asyncio.sleep(0.1)
+            return True
+
+        async def hung_probe():
+            await asyncio.sleep(10)
+
+        for i in range(8):
+            add_probed_connection(manager, f"web{i}", ensure_alive=slow_probe)
+        hung_id, _ = add_probed_connection(manager, "stuck", ensure_alive=hung_probe)
+
+        await manager._check_all_connections()
+
+        metrics = manager.get_health_metrics()["health_check"]
+        assert metrics["sweeps"] == 1
+        assert metrics["last_sweep_hosts"] == 9
+        # 8个0.1秒的探测并发完成，挂起的连接在0.2秒超时，而非逐个累加
+        assert metrics["last_sweep_duration"] < 0.5
+        assert not metrics["hosts"][hung_id]["ok"]
+        assert "超时" in metrics["hosts"][hung_id]["error"]
+        assert metrics["hosts"]["user@web0:22"]["ok"]
+
+    @pytest.mark.asyncio
+    async def test_recent_activity_defers_checks(self):
+        """测试最近有通信的连接顺延检查，下次计划时间带随机抖动"""
+        manager = SSHManager(SSHAgentConfig(health_check_jitter=0.1))
+        active_id, active = add_probed_connection(manager, "active")
+        idle_id, idle = add_probed_connection(manager, "idle")
+        active.mark_activity()
+
+        await manager._check_all_connections()
+
+        active.ensure_alive.assert_not_called()
+        idle.ensure_alive.assert_awaited_once()
+        delay = idle.next_health_check - time.monotonic()
+        assert 30 * 0.9 - 1 <= delay <= 30 * 1.1
+
+        # 刚检查过的连接在下次计划时间之前不再检查
+        await manager._check_all_connections()
+        idle.ensure_alive.assert_awaited_once()
+
+        await manager._check_all_connections(force=True)
+        assert idle.ensure_alive.await_count == 2
+        assert active.ensure_alive.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_keepalive_sweep_and_disconnect_cleanup(self):
+        """测试keep-alive并发发送，失败连接触发命令清理"""
+        manager = SSHManager()
+        ok_id, ok = add_probed_connection(manager, "ok")
+        bad_id, bad = add_probed_connection(manager, "bad", send_keepalive=AsyncMock(return_value=False))
+
+        await manager._send_keepalive_to_all_connections()
+
+        hosts = manager.get_health_metrics()["keepalive"]["hosts"]
+        assert hosts[ok_id]["ok"] and not hosts[bad_id]["ok"]
+        assert hosts[ok_id]["next_due_in"] > 100
+
+        def mark_broken():
+            bad.status = ConnectionStatus.ERROR
+            return False
+        bad.ensure_alive = AsyncMock(side_effect=mark_broken)
+        manager._cleanup_commands_on_disconnected_connection = AsyncMock()
+        await manager._check_all_connections()
+        manager._cleanup_commands_on_disconnected_connection.assert_awaited_once_with(bad_id)
+
+        await manager.disconnect(bad_id)
+        assert bad_id not in manager.get_health_metrics()["keepalive"]["hosts"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
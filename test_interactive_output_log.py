@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+交互式会话输出日志的pytest测试
+测试基于序号的增量读取、since_time过滤和旧输出丢弃
+"""
+
+import pytest
+import asyncio
+import time
+from unittest.mock import Mock
+from config_loader import SSHAgentConfig
+from ssh_manager import SSHManager, OutputChunkLog, InteractiveSession, InteractiveStatus
+
+
+class TestOutputChunkLog:
+    """交互式输出日志测试类"""
+
+    def test_read_after_cursor(self):
+        """测试只返回游标之后的输出"""
+        log = OutputChunkLog()
+        log.append("$ ls\n")
+        log.append("a.txt b.txt\n")
+        window = log.read()
+        assert window["text"] == "$ ls\na.txt b.txt\n"
+        assert window["next_offset"] == 17
+
+        log.append("$ ")
+        window = log.read(offset=window["next_offset"])
+        assert window["text"] == "$ "
+        assert window["offset"] == 17
+        assert window["next_offset"] == 19
+
+    def test_cursor_inside_chunk(self):
+        """测试游标落在输出块中间时精确切分"""
+        log = OutputChunkLog()
+        log.append("hello ")
+        log.append("world")
+
+        assert log.read(offset=8)["text"] == "rld"
+        assert log.read(offset=6)["text"] == "world"
+        assert log.read(offset=100)["text"] == ""
+
+    def test_since_time(self):
+        """测试按到达时间过滤"""
+        log = OutputChunkLog()
+        log.append("old", timestamp=100.0)
+        log.append("new", timestamp=200.0)
+        log.append("newer", timestamp=300.0)
+
+        assert log.read(since_time=150.0)["text"] == "newnewer"
+        assert log.read(since_time=300.0)["text"] == ""
+
+    def test_trim_keeps_offsets_stable(self):
+        """测试丢弃旧输出后序号保持不变并报告被跳过的字符"""
+        log = OutputChunkLog(max_chars=10)
+        for i in range(10):
+            log.append(f"{i}{i}{i}")
+
+        assert log.total_chars == 30
+        assert log.retained_chars <= 10
+        window = log.read(offset=0)
+        assert window["skipped"] == log.first_offset
+        assert window["text"].endswith("999")
+        assert log.read(offset=27)["text"] == "999"
+
+
+class TestInteractiveOutputCursor:
+    """get_interactive_output游标测试类"""
+
+    @pytest.mark.asyncio
+    async def test_get_interactive_output_with_offset(self):
+        """测试get_interactive_output按游标返回新增输出"""
+        manager = SSHManager()
+        session = InteractiveSession(
+            session_id="s1",
+            connection_id="user@server.com:22",
+            initial_command="python3",
+            status=InteractiveStatus.ACTIVE,
+            start_time=0
+        )
+        manager.interactive_sessions["s1"] = session
+        session.add_output(">>> ")
+
+        first = await manager.get_interactive_output("s1")
+        session.add_output("1 + 1\n2\n>>> ")
+        second = await manager.get_interactive_output("s1", offset=first["next_offset"])
+
+        assert first["output"] == ">>> "
+        assert second["output"] == "1 + 1\n2\n>>> "
+        assert second["next_offset"] == session.output_log.total_chars
+
+
+def make_session(manager):
+    session = InteractiveSession(
+        session_id="s1",
+        connection_id="user@server.com:22",
+        initial_command="bash",
+        status=InteractiveStatus.ACTIVE,
+        start_time=0
+    )
+    manager.interactive_sessions["s1"] = session
+    return session
+
+
+async def feed_later(manager, session, text, delay):
+    await asyncio.sleep(delay)
+    session.add_output(text)
+    await manager._notify_output_waiters(session)
+
+
+class TestWaitInteractiveOutput:
+    """wait_interactive_output长轮询测试类"""
+
+    @pytest.mark.asyncio
+    async def test_returns_when_new_output_arrives(self):
+        """测试新输出到达后立即返回"""
+        manager = SSHManager()
+        session = make_session(manager)
+        session.add_output("$ ")
+
+        feeder = asyncio.create_task(feed_later(manager, session, "hello\n", 0.05))
+        result = await manager.wait_interactive_output("s1", timeout=5)
+        await feeder
+
+        assert result["wait_reason"] == "output"
+        assert result["output"] == "hello\n"
+        assert result["waited"] < 1
+
+    @pytest.mark.asyncio
+    async def test_waits_for_pattern(self):
+        """测试等待正则匹配（如密码提示）"""
+        manager = SSHManager()
+        session = make_session(manager)
+
+        async def feed():
+            await feed_later(manager, session, "[sudo] ", 0.02)
+            await feed_later(manager, session, "password for user: ", 0.02)
+
+        feeder = asyncio.create_task(feed())
+        result = await manager.wait_interactive_output("s1", offset=0, pattern=r"password for \w+:", timeout=5)
+        await feeder
+
+        assert result["wait_reason"] == "pattern"
+        assert result["output"] == "[sudo] password for user: "
+
+    @pytest.mark.asyncio
+    async def test_waits_for_quiet_period(self):
+        """测试输出安静指定时间后返回"""
+        manager = SSHManager()
+        session = make_session(manager)
+        session.add_output("building...\n")
+
+        result = await manager.wait_interactive_output("s1", offset=0, idle_ms=50, timeout=5)
+
+        assert result["wait_reason"] == "idle"
+        assert time.time() - session.last_output_time >= 0.05
+
+    @pytest.mark.asyncio
+    async def test_timeout_and_session_end(self):
+        """测试超时和会话结束"""
+        manager = SSHManager()
+        session = make_session(manager)
+
+        result = await manager.wait_interactive_output("s1", timeout=0.05)
+        assert result["wait_reason"] == "timeout"
+        assert result["output"] == ""
+
+        session.status = InteractiveStatus.COMPLETED
+        result = await manager.wait_interactive_output("s1", timeout=5)
+        assert result["wait_reason"] == "session_ended"
+
+
+
+class ChunkedChannel:
+    """按预设分块返回数据的模拟channel"""
+
+    def __init__(self, chunks):
+        self._chunks = list(chunks)
+        self.closed = False
+        self.recv_sizes = []
+
+    def recv_ready(self):
+        return bool(self._chunks)
+
+    def recv(self, size):
+        self.recv_sizes.append(size)
+        return self._chunks.pop(0)
+
+    def exit_status_ready(self):
+        return False
+
+
+class TestCollectInteractiveOutput:
+    """交互式输出收集测试类"""
+
+    @pytest.mark.asyncio
+    async def test_drains_all_available_data(self):
+        """测试一次唤醒读空所有已到达的数据"""
+        manager = SSHManager()
+        session = make_session(manager)
+        session.channel = ChunkedChannel([b"a" * 4096, b"b" * 4096, b"c" * 100])
+
+        await manager._collect_interactive_output("s1", session)
+
+        assert session.output_log.total_chars == 8292
+        assert session.channel.recv_sizes == [manager.config.interactive_read_size] * 3
+
+    @pytest.mark.asyncio
+    async def test_drain_limit_yields_to_event_loop(self):
+        """测试达到单次读取上限时先返回，剩余数据在下一轮读取"""
+        manager = SSHManager(SSHAgentConfig(interactive_read_size=1024, interactive_drain_limit=2048))
+        session = make_session(manager)
+        session.channel = ChunkedChannel([b"x" * 1024] * 5)
+
+        assert await manager._collect_interactive_output("s1", session) is True
+        assert session.output_log.total_chars == 2048
+        assert await manager._collect_interactive_output("s1", session) is True
+        assert await manager._collect_interactive_output("s1", session) is False
+        assert session.output_log.total_chars == 5120
+
+    @pytest.mark.asyncio
+    async def test_fast_session_does_not_starve_others(self):
+        """测试输出不断的会话不会阻塞其他协程"""
+        manager = SSHManager(SSHAgentConfig(interactive_read_size=1024, interactive_drain_limit=4096))
+        session = make_session(manager)
+        session.channel = Mock()
+        session.channel.closed = False
+        session.channel.recv_ready.return_value = True
+        session.channel.recv.return_value = b"y" * 1024
+        session.channel.exit_status_ready.return_value = False
+        monitor = asyncio.create_task(manager._monitor_interactive_sessions())
+
+        # 收集协程每读取4096字节就让出事件循环，这里的协程能够继续执行
+        for _ in range(20):
+            await asyncio.sleep(0)
+        manager._running = False
+        await asyncio.wait_for(monitor, 1)
+
+        assert session.output_log.total_chars > 4096
+        assert session.status == InteractiveStatus.ACTIVE
+
+    @pytest.mark.asyncio
+    async def test_multibyte_character_split_across_reads(self):
+        """测试跨两次读取的多字节字符被正确解码"""
+        manager = SSHManager()
+        session = make_session(manager)
+        encoded = "你好".encode("utf-8")
+        session.channel = ChunkedChannel([encoded[:2], encoded[2:4]])
+        await manager._collect_interactive_output("s1", session)
+        session.channel = ChunkedChannel([encoded[4:]])
+        await manager._collect_interactive_output("s1", session)
+
+        assert session.output_log.read()["text"] == "你好"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -175,6 +175,45 @@ class TestAsyncCommandTools:
             assert len(result.content) > 0
             assert isinstance(result.content[0], TextContent)
     
+    @pytest.mark.asyncio
+    async def test_ssh_get_command_status_with_cursor(self):
+        """测试ssh_get_command_status按游标增量读取"""
+        command_id = str(uuid.uuid4())
+        
+        with patch('ssh_manager.SSHManager.get_command_status') as mock_status:
+            mock_status.return_value = {
+                "command_id": command_id,
+                "connection_id": "user@server.com:22",
+                "command": "make",
+                "status": "running",
+                "start_time": 0,
+                "end_time": None,
+                "duration": 1.0,
+                "exit_code": None,
+                "stdout_size": 120,
+                "stderr_size": 0,
+                "stdout": "new line\n",
+                "stderr": "",
+                "offset": 111,
+                "stderr_offset": 0,
+                "next_offset": 120,
+                "next_stderr_offset": 0
+            }
+            
+            result = await handle_call_tool("ssh_get_command_status", {
+                "command_id": command_id,
+                "offset": 111,
+                "stderr_offset": 0
+            })
+            
+            assert not result.isError
+            _, kwargs = mock_status.call_args
+            assert kwargs["offset"] == 111
+            assert kwargs["stderr_offset"] == 0
+            text = result.content[0].text
+            assert "new line" in text
+            assert "offset=120" in text
+    
     # 移除有问题的测试
     
     @pytest.mark.asyncio
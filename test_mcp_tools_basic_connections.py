@@ -73,7 +73,8 @@ class TestBasicConnectionTools:
                 port=22,
                 password="testpass",
                 private_key=None,
-                private_key_password=None
+                private_key_password=None,
+                force_reconnect=False
             )
     
     @pytest.mark.asyncio
@@ -99,7 +100,8 @@ class TestBasicConnectionTools:
                 port=2222,
                 password="testpass",
                 private_key=None,
-                private_key_password=None
+                private_key_password=None,
+                force_reconnect=False
             )
     
     @pytest.mark.asyncio
@@ -125,7 +127,8 @@ class TestBasicConnectionTools:
                 port=22,
                 password=None,
                 private_key="/path/to/private/key",
-                private_key_password="keypass"
+                private_key_password="keypass",
+                force_reconnect=False
             )
     
     @pytest.mark.asyncio
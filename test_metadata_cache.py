@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+远程元数据缓存的pytest测试
+测试stat/目录列表的缓存命中、绕过缓存、写操作失效、TTL过期和LRU淘汰
+"""
+
+import pytest
+import stat
+import paramiko
+from unittest.mock import patch
+from ssh_manager import RemoteMetadataCache
+from ssh_test_helpers import make_manager, make_sftp_client
+
+
+def make_attr(name, mode=stat.S_IFREG | 0o644, size=10):
+    file_attr = paramiko.SFTPAttributes()
+    file_attr.filename = name
+    file_attr.st_mode = mode
+    file_attr.st_size = size
+    file_attr.st_mtime = 1700000000
+    file_attr.st_atime = 1700000000
+    file_attr.st_uid = 1000
+    file_attr.st_gid = 1000
+    return file_attr
+
+
+def make_cache_manager():
+    manager, connection = make_manager()
+    sftp_client = make_sftp_client()
+    sftp_client.stat.side_effect = lambda path: make_attr(path.rsplit("/", 1)[-1])
+    sftp_client.listdir_attr.side_effect = lambda path: [make_attr("a.txt"), make_attr("lib", stat.S_IFDIR | 0o755)]
+    sftp_client.listdir_iter.side_effect = lambda path: iter([make_attr("a.txt"), make_attr("b.txt", size=5)])
+    connection.client.open_sftp.side_effect = lambda: sftp_client
+    return manager, connection, sftp_client
+
+
+class TestMetadataCache:
+    """元数据缓存测试类"""
+
+    @pytest.mark.asyncio
+    async def test_stat_hits_and_bypass(self):
+        """测试重复获取文件信息命中缓存，bypass时重新查询远端"""
+        manager, connection, sftp_client = make_cache_manager()
+
+        first = await manager.get_remote_file_info("user@server.com:22", "/srv/app/a.txt")
+        second = await manager.get_remote_file_info("user@server.com:22", "/srv/app//a.txt")
+        assert not first["cached"]
+        assert second["cached"]
+        assert second["size"] == first["size"]
+        assert sftp_client.stat.call_count == 1
+
+        third = await manager.get_remote_file_info("user@server.com:22", "/srv/app/a.txt", use_cache=False)
+        assert not third["cached"]
+        assert sftp_client.stat.call_count == 2
+
+        stats = manager.get_metadata_cache_stats("user@server.com:22")
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["connections"]["user@server.com:22"]["entries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_mutations_invalidate(self):
+        """测试重命名、上传、删除、创建目录使相关条目失效，无关条目保留"""
+        manager, connection, sftp_client = make_cache_manager()
+        await manager.get_remote_file_info("user@server.com:22", "/srv/app/a.txt")
+        await manager.get_remote_file_info("user@server.com:22", "/etc/hosts")
+        await manager.list_remote_directory("user@server.com:22", "/srv/app")
+        await manager.list_remote_directory_page("user@server.com:22", "/srv", recursive=True)
+        assert connection.metadata_cache.stats()["entries"] == 4
+
+        await manager.rename_remote_path("user@server.com:22", "/srv/app/a.txt", "/srv/app/c.txt")
+
+        cache = connection.metadata_cache
+        assert cache.get("stat", "/etc/hosts") is not None
+        assert cache.get("stat", "/srv/app/a.txt") is None
+        assert cache.get("list", "/srv/app", "flat") is None
+        assert cache.get("list", "/srv", (True, None, None)) is None
+
+        await manager.list_remote_directory("user@server.com:22", "/srv/app")
+        await manager.create_remote_directory("user@server.com:22", "/srv/app/new", parents=False)
+        assert cache.get("list", "/srv/app", "flat") is None
+
+        await manager.list_remote_directory("user@server.com:22", "/srv/app")
+        sftp_client.stat.side_effect = lambda path: make_attr("a.txt")
+        await manager.remove_remote_file("user@server.com:22", "/srv/app/a.txt")
+        assert cache.get("list", "/srv/app", "flat") is None
+        assert cache.get("stat", "/etc/hosts") is not None
+
+    @pytest.mark.asyncio
+    async def test_single_page_listing_cached(self):
+        """测试一页即可列完的目录列表被缓存，并可直接汇总总数"""
+        manager, connection, sftp_client = make_cache_manager()
+
+        first = await manager.list_remote_directory_page("user@server.com:22", "/srv/app", page_size=10)
+        second = await manager.list_remote_directory_page(
+            "user@server.com:22", "/srv/app", page_size=10, include_totals=True
+        )
+
+        assert not first["cached"]
+        assert second["cached"]
+        assert [entry["name"] for entry in second["entries"]] == ["a.txt", "b.txt"]
+        assert second["totals"] == {"entries": 2, "files": 2, "directories": 0, "bytes": 15}
+        assert sftp_client.listdir_iter.call_count == 1
+
+        # 页大小不足以容纳缓存结果时重新从远端列出
+        third = await manager.list_remote_directory_page("user@server.com:22", "/srv/app", page_size=1)
+        assert not third["cached"]
+        assert third["has_more"]
+
+    def test_ttl_and_lru(self):
+        """测试条目过期和超出容量时淘汰最久未使用的条目"""
+        cache = RemoteMetadataCache(max_entries=2, ttl=30)
+        with patch("ssh_manager.time.monotonic", return_value=100.0):
+            cache.put("stat", "/a", {"size": 1})
+            cache.put("stat", "/b", {"size": 2})
+            assert cache.get("stat", "/a") == {"size": 1}
+            cache.put("stat", "/c", {"size": 3})
+            assert cache.get("stat", "/b") is None
+            assert cache.stats()["evictions"] == 1
+        with patch("ssh_manager.time.monotonic", return_value=131.0):
+            assert cache.get("stat", "/a") is None
+            assert cache.stats()["entries"] == 1
+
+        disabled = RemoteMetadataCache(ttl=0)
+        disabled.put("stat", "/a", {"size": 1})
+        assert disabled.get("stat", "/a") is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
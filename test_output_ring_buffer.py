@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+异步命令输出环形缓冲区的pytest测试
+测试字节上限、丢弃计数、UTF-8边界处理、落盘模式以及落盘文件的清理
+"""
+
+import pytest
+import os
+import tempfile
+from unittest.mock import Mock
+from ssh_manager import SSHManager, OutputRingBuffer, AsyncCommand, CommandStatus
+from config_loader import SSHAgentConfig
+
+
+class TestOutputRingBuffer:
+    """输出环形缓冲区测试类"""
+
+    def test_keeps_only_recent_bytes(self):
+        """测试超出上限时丢弃最旧的数据"""
+        buffer = OutputRingBuffer(max_bytes=10)
+        for chunk in (b"aaaa", b"bbbb", b"cccc"):
+            buffer.append(chunk)
+
+        assert len(buffer) == 10
+        assert buffer.getvalue() == b"aabbbbcccc"
+        assert buffer.total_bytes == 12
+        assert buffer.dropped_bytes == 2
+
+    def test_large_chunk_is_truncated(self):
+        """测试单块超过上限时只保留尾部"""
+        buffer = OutputRingBuffer(max_bytes=4)
+        buffer.append(b"0123456789")
+
+        assert buffer.getvalue() == b"6789"
+        assert buffer.dropped_bytes == 6
+
+    def test_trim_does_not_split_utf8_characters(self):
+        """测试截断时跳过被切开的多字节字符"""
+        buffer = OutputRingBuffer(max_bytes=5)
+        buffer.append("中文ab".encode("utf-8"))
+
+        # "中文ab" 为8字节，截断3字节后恰好从"文"开始
+        assert buffer.text() == "文ab"
+        buffer.append(b"c")
+        # 再丢弃1字节会切开"文"，应整体跳过
+        assert buffer.text() == "abc"
+        assert buffer.dropped_bytes == 6
+
+    def test_spill_to_disk_keeps_full_log(self):
+        """测试落盘模式保留完整输出"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            spill_path = os.path.join(temp_dir, "cmd.stdout.log")
+            buffer = OutputRingBuffer(max_bytes=4, spill_path=spill_path)
+            buffer.append(b"hello ")
+            buffer.append(b"world")
+            buffer.close()
+
+            with open(spill_path, "rb") as f:
+                assert f.read() == b"hello world"
+            assert buffer.getvalue() == b"orld"
+            assert buffer.stats()["spill_path"] == spill_path
+
+    def test_async_command_sizes_follow_buffers(self):
+        """测试AsyncCommand的输出大小来自缓冲区计数"""
+        async_cmd = AsyncCommand(
+            command_id="cmd",
+            connection_id="user@server.com:22",
+            command="yes",
+            status=CommandStatus.RUNNING,
+            start_time=0,
+            stdout_buffer=OutputRingBuffer(max_bytes=8)
+        )
+        async_cmd.stdout_buffer.append(b"y\n" * 100)
+        async_cmd.stderr_buffer.append(b"err")
+
+        assert async_cmd.stdout_size == 200
+        assert len(async_cmd.stdout_buffer) == 8
+        assert async_cmd.stderr_size == 3
+
+
+    def test_incremental_read_returns_only_new_bytes(self):
+        """测试按游标只读取新增输出"""
+        buffer = OutputRingBuffer()
+        buffer.append(b"first\n")
+        window = buffer.read()
+        assert window["data"] == b"first\n"
+
+        buffer.append(b"second\n")
+        window = buffer.read(window["next_offset"])
+        assert window["data"] == b"second\n"
+        assert window["offset"] == 6
+        assert window["next_offset"] == 13
+
+        assert buffer.read(window["next_offset"])["data"] == b""
+
+    def test_head_and_tail_reads(self):
+        """测试head/tail模式"""
+        buffer = OutputRingBuffer()
+        buffer.append(b"0123456789")
+
+        assert buffer.read(2, max_bytes=3)["data"] == b"234"
+        tail = buffer.read(tail_bytes=4)
+        assert tail["data"] == b"6789"
+        assert tail["offset"] == 6
+
+    def test_read_reports_skipped_bytes(self):
+        """测试游标之后的数据被丢弃时报告跳过的字节数"""
+        buffer = OutputRingBuffer(max_bytes=4)
+        buffer.append(b"abcdefgh")
+
+        window = buffer.read(0)
+        assert window["data"] == b"efgh"
+        assert window["skipped_bytes"] == 4
+        assert window["offset"] == 4
+
+    def test_read_from_spill_file(self):
+        """测试落盘模式下可以读取已从内存丢弃的数据"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            buffer = OutputRingBuffer(max_bytes=4, spill_path=os.path.join(temp_dir, "out.log"))
+            buffer.append(b"abcdefgh")
+
+            window = buffer.read(1, max_bytes=5)
+            assert window["data"] == b"bcdef"
+            assert window["skipped_bytes"] == 0
+            buffer.close()
+
+    def test_read_keeps_utf8_characters_whole(self):
+        """测试读取窗口不会切开多字节字符"""
+        buffer = OutputRingBuffer()
+        buffer.append("a中b".encode("utf-8"))
+
+        window = buffer.read(0, max_bytes=2)
+        assert window["data"] == b"a"
+        window = buffer.read(window["next_offset"], max_bytes=2)
+        assert window["data"].decode("utf-8") == "中"
+
+    def test_spill_write_failure_falls_back_to_memory(self):
+        """测试落盘写入失败后不再从残缺的落盘文件读取，改为报告跳过的字节数"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            spill_path = os.path.join(temp_dir, "out.log")
+            buffer = OutputRingBuffer(max_bytes=4, spill_path=spill_path)
+            buffer.append(b"abcd")
+            buffer._spill_file.flush()
+            buffer._spill_file.write = Mock(side_effect=OSError("No space left on device"))
+            buffer.append(b"efgh")
+
+            assert buffer.spill_path is None
+            assert not os.path.exists(spill_path)
+            window = buffer.read(0)
+            assert window["data"] == b"efgh"
+            assert window["skipped_bytes"] == 4
+
+    @pytest.mark.asyncio
+    async def test_cleanup_removes_spill_files(self):
+        """测试清理已完成的命令时删除其输出落盘文件"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = SSHManager(SSHAgentConfig(async_output_spill_dir=temp_dir))
+            async_cmd = AsyncCommand(
+                command_id="cmd",
+                connection_id="user@server.com:22",
+                command="make",
+                status=CommandStatus.COMPLETED,
+                start_time=0,
+                end_time=1,
+                stdout_buffer=manager._new_output_buffer("cmd", "stdout"),
+                stderr_buffer=manager._new_output_buffer("cmd", "stderr")
+            )
+            async_cmd.stdout_buffer.append(b"build output")
+            async_cmd.close_buffers()
+            manager.async_commands["cmd"] = async_cmd
+
+            assert sorted(os.listdir(temp_dir)) == ["cmd.stderr.log", "cmd.stdout.log"]
+            assert await manager.cleanup_completed_commands(0) == 1
+            assert os.listdir(temp_dir) == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+分块并行SFTP下载的pytest测试
+使用内存中的模拟SFTP文件，验证多会话按偏移写入后的文件内容和传输统计
+"""
+
+import pytest
+import os
+import tempfile
+from ssh_test_helpers import make_manager, make_sftp_client
+
+
+class FakeRemoteFile:
+    """模拟paramiko.SFTPFile，仅支持readv"""
+
+    def __init__(self, content: bytes):
+        self._content = content
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def readv(self, chunks):
+        for offset, length in chunks:
+            yield self._content[offset:offset + length]
+
+
+def make_download_manager(content: bytes, pool_size=4, remote_size=None):
+    manager, connection = make_manager(sftp_pool_size=pool_size)
+
+    def open_sftp():
+        sftp_client = make_sftp_client()
+        sftp_client.stat.return_value.st_size = len(content) if remote_size is None else remote_size
+        sftp_client.stat.return_value.st_mtime = 1700000000
+        sftp_client.open.side_effect = lambda path, mode: FakeRemoteFile(content)
+        return sftp_client
+
+    connection.client.open_sftp.side_effect = open_sftp
+    return manager, connection
+
+
+class TestParallelDownload:
+    """分块并行下载测试类"""
+
+    @pytest.mark.asyncio
+    async def test_parallel_download_reassembles_file(self):
+        """测试多个会话并行下载的分块按偏移拼成完整文件"""
+        content = os.urandom(1024 * 1024 + 123)
+        manager, connection = make_download_manager(content)
+        progress = []
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            local_path = os.path.join(temp_dir, "sub", "big.bin")
+            result = await manager.download_file(
+                "user@server.com:22", "/data/big.bin", local_path,
+                progress_callback=lambda done, total: progress.append((done, total)),
+                parallel=True, chunk_size=64 * 1024, concurrency=4
+            )
+
+            with open(local_path, "rb") as f:
+                assert f.read() == content
+
+        assert result["success"]
+        assert result["mode"] == "parallel"
+        assert result["chunks"] == 17
+        assert result["concurrency"] == 4
+        assert result["local_size"] == len(content)
+        assert result["elapsed"] >= 0
+        assert progress[-1] == (len(content), len(content))
+        assert connection.sftp_pool.stats()["opened"] == 4
+
+    @pytest.mark.asyncio
+    async def test_small_file_uses_single_session(self):
+        """测试默认模式下小文件走单会话下载"""
+        content = b"small file"
+        manager, connection = make_download_manager(content)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            local_path = os.path.join(temp_dir, "small.txt")
+
+            def fake_get(remote_path, path, callback=None):
+                with open(path, "wb") as f:
+                    f.write(content)
+
+            async with connection.sftp_session() as sftp_client:
+                sftp_client.get.side_effect = fake_get
+            result = await manager.download_file("user@server.com:22", "/data/small.txt", local_path)
+
+        assert result["success"]
+        assert result["mode"] == "single"
+        assert result["chunks"] == 1
+        sftp_client.get.assert_called_once()
+        sftp_client.open.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_default_uses_single_session(self):
+        """测试未指定parallel时即使大文件也走单会话get下载"""
+        content = os.urandom(512 * 1024)
+        manager, connection = make_download_manager(content)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            local_path = os.path.join(temp_dir, "big.bin")
+
+            def fake_get(remote_path, path, callback=None):
+                with open(path, "wb") as f:
+                    f.write(content)
+
+            async with connection.sftp_session() as sftp_client:
+                sftp_client.get.side_effect = fake_get
+            result = await manager.download_file(
+                "user@server.com:22", "/data/big.bin", local_path, chunk_size=64 * 1024
+            )
+
+        assert result["success"]
+        assert result["mode"] == "single"
+        assert result["chunks"] == 1
+        sftp_client.get.assert_called_once()
+        sftp_client.open.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_short_read_fails_download(self):
+        """测试分块读取不完整时下载失败"""
+        # 远程文件在下载过程中被截断
+        manager, connection = make_download_manager(os.urandom(200 * 1024), remote_size=256 * 1024)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            result = await manager.download_file(
+                "user@server.com:22", "/data/big.bin", os.path.join(temp_dir, "big.bin"),
+                parallel=True, chunk_size=64 * 1024
+            )
+
+        assert not result["success"]
+        assert "分块读取不完整" in result["error"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
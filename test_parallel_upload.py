@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+分块并行SFTP上传的pytest测试
+使用写入内存的模拟SFTP文件，验证流水线写请求按偏移拼成完整的远程文件
+"""
+
+import pytest
+import os
+import tempfile
+import threading
+import itertools
+from collections import deque
+from unittest.mock import Mock
+from ssh_test_helpers import make_manager, make_sftp_client
+
+
+class FakeRemoteStore:
+    """所有模拟会话共享的远程文件内容"""
+
+    def __init__(self):
+        self.content = bytearray()
+        self.lock = threading.Lock()
+        self.pipelined = []
+        self.write_sizes = []
+        self.request_numbers = itertools.count()
+        # 落在该偏移处的写请求返回失败状态（模拟磁盘已满）
+        self.fail_offset = None
+
+    def truncate(self, path, size):
+        with self.lock:
+            del self.content[size:]
+            self.content.extend(b"\0" * (size - len(self.content)))
+
+
+class FakeWritableFile:
+    """模拟paramiko.SFTPFile的seek/write，写请求登记在所属会话的_expecting中等待确认"""
+
+    def __init__(self, store: FakeRemoteStore, mode: str, expecting: dict):
+        self._store = store
+        self._expecting = expecting
+        self._reqs = deque()
+        self._position = 0
+        if mode == "wb":
+            store.truncate(None, 0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def close(self):
+        pass
+
+    def set_pipelined(self, pipelined=True):
+        self._store.pipelined.append(pipelined)
+
+    def stat(self):
+        return Mock(st_size=len(self._store.content))
+
+    def seek(self, offset):
+        self._position = offset
+
+    def _check_exception(self):
+        pass
+
+    def write(self, data):
+        request = next(self._store.request_numbers)
+        self._reqs.append(request)
+        if self._position == self._store.fail_offset:
+            self._expecting[request] = IOError("No space left on device")
+            self._position += len(data)
+            return
+        self._expecting[request] = None
+        with self._store.lock:
+            self._store.write_sizes.append(len(data))
+            end = self._position + len(data)
+            if end > len(self._store.content):
+                self._store.content.extend(b"\0" * (end - len(self._store.content)))
+            self._store.content[self._position:end] = data
+        self._position += len(data)
+
+
+def make_upload_manager(store: FakeRemoteStore):
+    manager, connection = make_manager(sftp_pool_size=4)
+
+    def open_sftp():
+        sftp_client = make_sftp_client()
+        sftp_client._expecting = {}
+
+        def read_response(request):
+            error = sftp_client._expecting.pop(request)
+            if error is not None:
+                raise error
+
+        sftp_client._read_response.side_effect = read_response
+        sftp_client.open.side_effect = lambda path, mode: FakeWritableFile(store, mode, sftp_client._expecting)
+        sftp_client.truncate.side_effect = store.truncate
+        sftp_client.stat.side_effect = lambda path: Mock(st_size=len(store.content))
+        return sftp_client
+
+    connection.client.open_sftp.side_effect = open_sftp
+    return manager, connection
+
+
+class TestParallelUpload:
+    """分块并行上传测试类"""
+
+    @pytest.mark.asyncio
+    async def test_parallel_upload_reassembles_file(self):
+        """测试多个会话并行上传的分块按偏移拼成完整文件"""
+        content = os.urandom(1024 * 1024 + 77)
+        store = FakeRemoteStore()
+        manager, connection = make_upload_manager(store)
+        progress = []
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            local_path = os.path.join(temp_dir, "big.bin")
+            with open(local_path, "wb") as f:
+                f.write(content)
+
+            result = await manager.upload_file(
+                "user@server.com:22", local_path, "/data/big.bin",
+                progress_callback=lambda done, total: progress.append((done, total)),
+                parallel=True, chunk_size=128 * 1024, concurrency=4
+            )
+
+        assert result["success"]
+        assert result["mode"] == "parallel"
+        assert result["chunks"] == 9
+        assert result["concurrency"] == 4
+        assert bytes(store.content) == content
+        assert result["remote_size"] == len(content)
+        assert progress[-1] == (len(content), len(content))
+        # 每个工作线程都开启流水线写入，且单次写请求不超过SFTP最大请求大小
+        assert store.pipelined == [True] * 4
+        assert max(store.write_sizes) <= 32768
+
+    @pytest.mark.asyncio
+    async def test_small_file_uses_put(self):
+        """测试默认模式下小文件走put上传"""
+        store = FakeRemoteStore()
+        manager, connection = make_upload_manager(store)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            local_path = os.path.join(temp_dir, "small.txt")
+            with open(local_path, "wb") as f:
+                f.write(b"small file")
+
+            async with connection.sftp_session() as sftp_client:
+                sftp_client.put.side_effect = lambda local, remote, callback=None: store.content.extend(b"small file")
+            result = await manager.upload_file("user@server.com:22", local_path, "/data/small.txt")
+
+        assert result["success"]
+        assert result["mode"] == "single"
+        sftp_client.put.assert_called_once()
+        sftp_client.open.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_default_uses_put_for_large_file(self):
+        """测试未指定parallel时即使大文件也走put上传"""
+        store = FakeRemoteStore()
+        manager, connection = make_upload_manager(store)
+        content = os.urandom(512 * 1024)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            local_path = os.path.join(temp_dir, "big.bin")
+            with open(local_path, "wb") as f:
+                f.write(content)
+
+            async with connection.sftp_session() as sftp_client:
+                sftp_client.put.side_effect = lambda local, remote, callback=None: store.content.extend(content)
+            result = await manager.upload_file(
+                "user@server.com:22", local_path, "/data/big.bin", chunk_size=64 * 1024
+            )
+
+        assert result["success"]
+        assert result["mode"] == "single"
+        sftp_client.put.assert_called_once()
+        sftp_client.open.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_pipelined_write_does_not_advance_checkpoint(self):
+        """测试流水线写请求失败时上传报错，检查点停在失败分块之前"""
+        chunk = 128 * 1024
+        content = os.urandom(chunk * 6)
+        store = FakeRemoteStore()
+        store.fail_offset = chunk * 3
+        manager, connection = make_upload_manager(store)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            local_path = os.path.join(temp_dir, "big.bin")
+            with open(local_path, "wb") as f:
+                f.write(content)
+
+            result = await manager.upload_file(
+                "user@server.com:22", local_path, "/data/big.bin",
+                chunk_size=chunk, resume=True
+            )
+
+        assert not result["success"]
+        assert "No space left on device" in result["error"]
+        checkpoints = manager.list_transfer_checkpoints()["checkpoints"]
+        assert checkpoints[0]["verified_offset"] == chunk * 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
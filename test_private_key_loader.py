@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+私钥加载器的pytest测试
+测试RSA/Ed25519/ECDSA私钥的类型识别、已解密私钥的缓存、文件更新后重新加载以及连接间共享
+"""
+
+import pytest
+import os
+import tempfile
+import paramiko
+from unittest.mock import Mock, patch
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from ssh_manager import SSHConnection, PrivateKeyLoader
+
+PASSWORD = "secret"
+
+
+def write_key(directory, name, private_key, private_format=serialization.PrivateFormat.OpenSSH,
+              password=PASSWORD):
+    encryption = (serialization.BestAvailableEncryption(password.encode()) if password
+                  else serialization.NoEncryption())
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        f.write(private_key.private_bytes(serialization.Encoding.PEM, private_format, encryption))
+    return path
+
+
+@pytest.fixture
+def key_dir():
+    with tempfile.TemporaryDirectory() as directory:
+        yield directory
+
+
+class TestPrivateKeyLoader:
+    """私钥加载器测试类"""
+
+    def test_detects_all_key_types(self, key_dir):
+        """测试OpenSSH格式和传统PEM格式私钥都能识别类型并解密"""
+        keys = {
+            "id_ed25519": (ed25519.Ed25519PrivateKey.generate(), serialization.PrivateFormat.OpenSSH, "ssh-ed25519"),
+            "id_ecdsa": (ec.generate_private_key(ec.SECP256R1()), serialization.PrivateFormat.OpenSSH,
+                         "ecdsa-sha2-nistp256"),
+            "id_rsa": (rsa.generate_private_key(65537, 2048), serialization.PrivateFormat.OpenSSH, "ssh-rsa"),
+            "id_rsa_pem": (rsa.generate_private_key(65537, 2048), serialization.PrivateFormat.TraditionalOpenSSL,
+                           "ssh-rsa"),
+            "id_ecdsa_pem": (ec.generate_private_key(ec.SECP384R1()), serialization.PrivateFormat.TraditionalOpenSSL,
+                             "ecdsa-sha2-nistp384")
+        }
+        loader = PrivateKeyLoader()
+        for name, (private_key, private_format, key_type) in keys.items():
+            path = write_key(key_dir, name, private_key, private_format)
+            with open(path) as f:
+                assert PrivateKeyLoader.detect_key_class(f.read()) is not None
+            assert loader.load(path, PASSWORD).get_name() == key_type
+
+        # PKCS8格式无法从文件头识别类型，由cryptography解密后包装
+        path = write_key(key_dir, "id_pkcs8_rsa", rsa.generate_private_key(65537, 2048),
+                         serialization.PrivateFormat.PKCS8)
+        assert loader.load(path, PASSWORD).get_name() == "ssh-rsa"
+        path = write_key(key_dir, "id_pkcs8_ecdsa", ec.generate_private_key(ec.SECP256R1()),
+                         serialization.PrivateFormat.PKCS8, password=None)
+        assert loader.load(path).get_name() == "ecdsa-sha2-nistp256"
+        path = write_key(key_dir, "id_pkcs8_ed25519", ed25519.Ed25519PrivateKey.generate(),
+                         serialization.PrivateFormat.PKCS8)
+        assert isinstance(loader.load(path, PASSWORD), paramiko.Ed25519Key)
+        with open(os.path.join(key_dir, "id_pkcs8_rsa")) as f, pytest.raises(paramiko.PasswordRequiredException):
+            loader.parse(f.read())
+
+    def test_cache_hit_skips_decryption(self, key_dir):
+        """测试同一私钥只解密一次，口令不同时不使用缓存"""
+        path = write_key(key_dir, "id_ed25519", ed25519.Ed25519PrivateKey.generate())
+        loader = PrivateKeyLoader()
+
+        with patch.object(PrivateKeyLoader, "parse", wraps=PrivateKeyLoader.parse) as parse:
+            first = loader.load(path, PASSWORD)
+            second = loader.load(os.path.join(key_dir, ".", "id_ed25519"), PASSWORD)
+            assert first is second
+            assert parse.call_count == 1
+
+            with pytest.raises(paramiko.SSHException):
+                loader.load(path, "wrong")
+            with pytest.raises(paramiko.PasswordRequiredException):
+                loader.load(path)
+
+        assert loader.stats() == {"entries": 1, "hits": 1, "misses": 1}
+        # 加载结束后不保留按路径的锁
+        assert loader._path_locks == {}
+
+    def test_reloads_when_file_changes(self, key_dir):
+        """测试私钥文件被替换后重新加载并丢弃旧的缓存"""
+        path = write_key(key_dir, "id_key", ed25519.Ed25519PrivateKey.generate())
+        loader = PrivateKeyLoader()
+        old = loader.load(path, PASSWORD)
+
+        write_key(key_dir, "id_key", ec.generate_private_key(ec.SECP256R1()))
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        new = loader.load(path, PASSWORD)
+
+        assert old.get_name() == "ssh-ed25519"
+        assert new.get_name() == "ecdsa-sha2-nistp256"
+        assert loader.stats()["entries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_connections_share_loaded_key(self, key_dir):
+        """测试多个连接使用同一私钥时共享已解密的PKey"""
+        path = write_key(key_dir, "id_ed25519", ed25519.Ed25519PrivateKey.generate())
+        PrivateKeyLoader.shared().clear()
+        clients = [Mock(), Mock()]
+
+        with patch("ssh_manager.paramiko.SSHClient", side_effect=clients):
+            for host in ("web1", "web2"):
+                connection = SSHConnection(host, "deploy", 22)
+                assert await connection.connect(private_key=path, private_key_password=PASSWORD)
+
+        keys = [client.connect.call_args.kwargs["pkey"] for client in clients]
+        assert isinstance(keys[0], paramiko.Ed25519Key)
+        assert keys[0] is keys[1]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
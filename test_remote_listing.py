@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+远程目录分页列表的pytest测试
+使用以本地临时目录为后端、逐条产出条目的模拟listdir_iter，验证分页游标、递归深度、glob过滤和总数统计
+"""
+
+import pytest
+import os
+import tempfile
+from unittest.mock import patch
+from mcp_server import handle_call_tool
+from ssh_test_helpers import LocalBackedSFTP, make_manager
+
+
+class StreamingSFTP(LocalBackedSFTP):
+    """listdir_iter按需逐条读取本地目录，并统计产出条目数和关闭次数"""
+
+    def __init__(self, stats):
+        super().__init__()
+        self.stats = stats
+        self.closed = False
+
+    def listdir_iter(self, path, read_aheads=50):
+        for attr in super().listdir_iter(path, read_aheads):
+            self.stats["yielded"] += 1
+            yield attr
+
+    def close(self):
+        self.closed = True
+        self.stats["closed"] += 1
+
+
+def make_listing_manager(**config):
+    stats = {"yielded": 0, "closed": 0}
+    manager, connection = make_manager(**config)
+    connection.client.open_sftp.side_effect = lambda: StreamingSFTP(stats)
+    return manager, stats
+
+
+def touch(path, size=0):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+
+
+class TestRemoteListing:
+    """分页目录列表测试类"""
+
+    @pytest.mark.asyncio
+    async def test_pages_follow_cursor(self):
+        """测试按游标翻页直到读完，读完后游标关闭并把会话归还会话池"""
+        manager, stats = make_listing_manager()
+        with tempfile.TemporaryDirectory() as root:
+            for i in range(25):
+                touch(os.path.join(root, f"file{i}.txt"))
+
+            names = []
+            cursor = None
+            pages = 0
+            while True:
+                result = await manager.list_remote_directory_page(
+                    "user@server.com:22", root, page_size=10, cursor=cursor
+                )
+                assert result["success"], result.get("error")
+                names.extend(entry["name"] for entry in result["entries"])
+                pages += 1
+                if not result["has_more"]:
+                    break
+                cursor = result["next_cursor"]
+
+        assert pages == 3
+        assert sorted(names) == sorted(f"file{i}.txt" for i in range(25))
+        assert result["returned"] == 25
+        assert result["next_cursor"] is None
+        assert manager.listing_cursors == {}
+        assert stats["closed"] == 0
+        pool = manager.connections["user@server.com:22"].sftp_pool.stats()
+        assert pool["in_use"] == 0 and pool["idle"] == 1
+
+    @pytest.mark.asyncio
+    async def test_entries_are_streamed(self):
+        """测试每页只从服务端读取当前页（外加一条预读）的条目"""
+        manager, stats = make_listing_manager()
+        with tempfile.TemporaryDirectory() as root:
+            for i in range(1000):
+                touch(os.path.join(root, f"f{i}"))
+
+            result = await manager.list_remote_directory_page("user@server.com:22", root, page_size=50)
+
+            assert result["count"] == 50
+            assert result["has_more"]
+            assert stats["yielded"] == 51
+            assert await manager.close_listing_cursor(result["next_cursor"])
+            assert stats["closed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_recursive_depth_pattern_and_totals(self):
+        """测试递归列表按最大深度和glob过滤，并按需统计总数"""
+        manager, stats = make_listing_manager()
+        with tempfile.TemporaryDirectory() as root:
+            touch(os.path.join(root, "app.log"), 10)
+            touch(os.path.join(root, "readme.md"))
+            touch(os.path.join(root, "svc", "svc.log"), 20)
+            touch(os.path.join(root, "svc", "old", "deep.log"), 30)
+
+            result = await manager.list_remote_directory_page(
+                "user@server.com:22", root, recursive=True, max_depth=2,
+                pattern="*.log", include_totals=True
+            )
+
+        assert result["success"], result.get("error")
+        assert sorted(entry["path"] for entry in result["entries"]) == ["app.log", "svc/svc.log"]
+        assert {entry["path"]: entry["depth"] for entry in result["entries"]} == {"app.log": 1, "svc/svc.log": 2}
+        assert result["totals"] == {"entries": 2, "files": 2, "directories": 0, "bytes": 30}
+        assert not result["has_more"]
+
+    @pytest.mark.asyncio
+    async def test_expired_cursor(self):
+        """测试空闲超时的游标被关闭，继续使用时返回错误"""
+        manager, stats = make_listing_manager(listing_cursor_idle_timeout=0)
+        with tempfile.TemporaryDirectory() as root:
+            for i in range(5):
+                touch(os.path.join(root, f"f{i}"))
+            result = await manager.list_remote_directory_page("user@server.com:22", root, page_size=2)
+
+            result = await manager.list_remote_directory_page(
+                "user@server.com:22", root, cursor=result["next_cursor"]
+            )
+
+        assert not result["success"]
+        assert "游标不存在或已过期" in result["error"]
+        assert stats["closed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cursors_borrow_from_pool_with_per_connection_limit(self):
+        """测试游标从会话池借用会话，每个连接最多保留会话池大小减一个游标"""
+        manager, stats = make_listing_manager()
+        connection = manager.connections["user@server.com:22"]
+        with tempfile.TemporaryDirectory() as root:
+            for i in range(5):
+                touch(os.path.join(root, f"f{i}"))
+            cursors = []
+            for _ in range(5):
+                result = await manager.list_remote_directory_page("user@server.com:22", root, page_size=2)
+                cursors.append(result["next_cursor"])
+
+            assert list(manager.listing_cursors) == cursors[-3:]
+            assert connection.sftp_pool.stats()["in_use"] == 3
+            assert connection.sftp_pool.stats()["opened"] == 5
+            # 被挤出的游标上还有未读完的目录，会话直接关闭
+            assert stats["closed"] == 2
+
+            async with connection.sftp_session() as sftp_client:
+                assert sftp_client.listdir_attr(root)
+
+        for cursor in cursors[-3:]:
+            assert await manager.close_listing_cursor(cursor)
+        assert connection.sftp_pool.stats()["in_use"] == 0
+
+    @pytest.mark.asyncio
+    async def test_tool_keeps_sorted_listing_without_paging(self):
+        """测试工具未请求分页时保持原有的排序列表，请求分页时才返回分页结果"""
+        manager, _ = make_listing_manager()
+        with tempfile.TemporaryDirectory() as root, patch("mcp_server.ssh_manager", manager):
+            for name in ("b.txt", "a.txt"):
+                touch(os.path.join(root, name))
+            os.makedirs(os.path.join(root, "sub"))
+
+            result = await handle_call_tool("ssh_list_remote_directory", {
+                "connection_id": "user@server.com:22", "remote_path": root
+            })
+            text = result.content[0].text
+            assert "目录数: 1" in text and "文件数: 2" in text
+            assert text.index("📁 sub/") < text.index("📄 a.txt") < text.index("📄 b.txt")
+            assert "游标" not in text
+
+            result = await handle_call_tool("ssh_list_remote_directory", {
+                "connection_id": "user@server.com:22", "remote_path": root, "page_size": 2
+            })
+            text = result.content[0].text
+            assert "本页项目数: 2" in text
+            assert "下一页游标" in text
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
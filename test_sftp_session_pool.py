@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+SFTP会话池的pytest测试
+测试会话复用、损坏会话重建、空闲回收和池大小限制
+"""
+
+import pytest
+import asyncio
+from unittest.mock import Mock
+from ssh_manager import SSHManager
+from ssh_test_helpers import make_connection, make_sftp_client
+
+
+class TestSFTPSessionPool:
+    """SFTP会话池测试类"""
+
+    @pytest.mark.asyncio
+    async def test_session_is_reused(self):
+        """测试连续操作复用同一个会话"""
+        connection = make_connection(sftp_pool_size=2)
+
+        async with connection.sftp_session() as first:
+            pass
+        async with connection.sftp_session() as second:
+            pass
+
+        assert first is second
+        assert connection.client.open_sftp.call_count == 1
+        stats = connection.sftp_pool.stats()
+        assert stats["opened"] == 1
+        assert stats["reused"] == 1
+        assert stats["idle"] == 1
+
+    @pytest.mark.asyncio
+    async def test_broken_session_is_reopened(self):
+        """测试损坏的会话在借出时自动重建"""
+        connection = make_connection(sftp_pool_size=2)
+
+        async with connection.sftp_session() as first:
+            pass
+        first.get_channel.return_value.closed = True
+
+        async with connection.sftp_session() as second:
+            pass
+
+        assert second is not first
+        assert connection.client.open_sftp.call_count == 2
+        first.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_idle_sessions_are_evicted(self):
+        """测试空闲超时的会话被回收"""
+        connection = make_connection(sftp_pool_size=2, sftp_idle_timeout=0)
+
+        async with connection.sftp_session() as sftp_client:
+            pass
+        await asyncio.sleep(0.01)
+        evicted = await connection.sftp_pool.evict_idle()
+
+        assert evicted == 1
+        sftp_client.close.assert_called_once()
+        assert connection.sftp_pool.stats()["idle"] == 0
+
+    @pytest.mark.asyncio
+    async def test_pool_size_is_bounded(self):
+        """测试并发借用不超过池大小"""
+        connection = make_connection(sftp_pool_size=2)
+        peak = 0
+
+        async def use_session():
+            nonlocal peak
+            async with connection.sftp_session():
+                peak = max(peak, connection.sftp_pool.stats()["in_use"])
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*[use_session() for _ in range(6)])
+
+        assert peak == 2
+        assert connection.client.open_sftp.call_count == 2
+        assert connection.sftp_pool.stats()["in_use"] == 0
+
+    @pytest.mark.asyncio
+    async def test_manager_sftp_calls_share_session(self):
+        """测试SSHManager的SFTP操作共享会话池"""
+        manager = SSHManager()
+        connection = make_connection(sftp_pool_size=2)
+        manager.connections["user@server.com:22"] = connection
+
+        stat_result = Mock(st_size=10, st_mtime=0, st_atime=0, st_mode=0o100644, st_uid=0, st_gid=0)
+        connection.client.open_sftp.side_effect = None
+        sftp_client = make_sftp_client()
+        sftp_client.stat.return_value = stat_result
+        connection.client.open_sftp.return_value = sftp_client
+
+        for _ in range(3):
+            result = await manager.get_remote_file_info("user@server.com:22", "/tmp/file")
+            assert result["success"]
+
+        assert connection.client.open_sftp.call_count == 1
+        sftp_client.close.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
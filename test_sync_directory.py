@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+ssh_sync_directory目录同步的pytest测试
+使用以本地临时目录为后端的模拟SFTP客户端，验证变化检测、过滤规则、dry-run和哈希比较
+"""
+
+import pytest
+import os
+import subprocess
+import tempfile
+from ssh_test_helpers import LocalBackedSFTP, make_manager
+
+
+def write_file(path, content, mtime=1700000000):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+    os.utime(path, (mtime, mtime))
+
+
+def make_sync_manager(work_dir):
+    manager, connection = make_manager(
+        transfer_checkpoint_file=os.path.join(work_dir, "checkpoints.json")
+    )
+
+    async def execute_command(command, timeout=30):
+        # 远端命令（sha256sum）直接在本机执行
+        completed = subprocess.run(command, shell=True, capture_output=True, text=True)
+        return completed.returncode, completed.stdout, completed.stderr
+
+    connection.client.open_sftp.side_effect = LocalBackedSFTP
+    connection.execute_command = execute_command
+    return manager
+
+
+class TestSyncDirectory:
+    """目录同步测试类"""
+
+    @pytest.mark.asyncio
+    async def test_upload_sync_transfers_only_changes(self):
+        """测试首次同步传输全部文件，再次同步时没有变化"""
+        with tempfile.TemporaryDirectory() as work_dir:
+            local_root = os.path.join(work_dir, "project")
+            remote_root = os.path.join(work_dir, "remote", "project")
+            write_file(os.path.join(local_root, "main.py"), "print('hi')\n")
+            write_file(os.path.join(local_root, "pkg", "sub", "util.py"), "x = 1\n")
+            write_file(os.path.join(local_root, "node_modules", "lib", "index.js"), "//\n")
+            manager = make_sync_manager(work_dir)
+
+            result = await manager.sync_directory(
+                "user@server.com:22", local_root, remote_root, exclude=["node_modules"]
+            )
+
+            assert result["success"]
+            assert result["to_transfer"] == 2
+            assert result["transferred"] == 2
+            assert not os.path.exists(os.path.join(remote_root, "node_modules"))
+            with open(os.path.join(remote_root, "pkg", "sub", "util.py")) as f:
+                assert f.read() == "x = 1\n"
+            assert int(os.stat(os.path.join(remote_root, "main.py")).st_mtime) == 1700000000
+
+            result = await manager.sync_directory(
+                "user@server.com:22", local_root, remote_root, exclude=["node_modules"]
+            )
+            assert result["to_transfer"] == 0
+            assert result["unchanged"] == 2
+
+    @pytest.mark.asyncio
+    async def test_dry_run_and_include(self):
+        """测试dry-run只报告变化，include只选择匹配的文件"""
+        with tempfile.TemporaryDirectory() as work_dir:
+            local_root = os.path.join(work_dir, "local")
+            remote_root = os.path.join(work_dir, "remote")
+            write_file(os.path.join(local_root, "a.py"), "new content\n")
+            write_file(os.path.join(local_root, "notes.txt"), "notes\n")
+            write_file(os.path.join(remote_root, "a.py"), "old\n")
+            manager = make_sync_manager(work_dir)
+
+            result = await manager.sync_directory(
+                "user@server.com:22", local_root, remote_root, include=["*.py"], dry_run=True
+            )
+
+            assert result["success"]
+            assert result["filtered"] == 1
+            assert result["changes"] == [{"path": "a.py", "reason": "size", "size": 12}]
+            assert result["transferred"] == 0
+            with open(os.path.join(remote_root, "a.py")) as f:
+                assert f.read() == "old\n"
+
+    @pytest.mark.asyncio
+    async def test_checksum_detects_same_size_changes(self):
+        """测试大小和修改时间相同但内容不同的文件只有checksum模式能检测到"""
+        with tempfile.TemporaryDirectory() as work_dir:
+            local_root = os.path.join(work_dir, "local")
+            remote_root = os.path.join(work_dir, "remote")
+            write_file(os.path.join(remote_root, "conf", "app.ini"), "mode=prod\n")
+            write_file(os.path.join(local_root, "conf", "app.ini"), "mode=test\n")
+            write_file(os.path.join(remote_root, "same.txt"), "same\n")
+            write_file(os.path.join(local_root, "same.txt"), "same\n")
+            manager = make_sync_manager(work_dir)
+
+            result = await manager.sync_directory(
+                "user@server.com:22", local_root, remote_root, direction="download"
+            )
+            assert result["to_transfer"] == 0
+
+            result = await manager.sync_directory(
+                "user@server.com:22", local_root, remote_root, direction="download", checksum=True
+            )
+            assert result["success"]
+            assert [change["path"] for change in result["changes"]] == ["conf/app.ini"]
+            assert result["changes"][0]["reason"] == "checksum"
+            with open(os.path.join(local_root, "conf", "app.ini")) as f:
+                assert f.read() == "mode=prod\n"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+tar流批量目录传输的pytest测试
+模拟exec channel在本机执行远端命令，端到端验证tar打包、流式传输和解包
+"""
+
+import pytest
+import os
+import subprocess
+import tempfile
+from unittest.mock import AsyncMock, patch
+from ssh_test_helpers import make_manager
+
+
+class LocalExecChannel:
+    """模拟paramiko.Channel：exec_command在本机子进程中执行"""
+
+    def __init__(self):
+        self.process = None
+
+    def exec_command(self, command):
+        self.process = subprocess.Popen(
+            command, shell=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+
+    def sendall(self, data):
+        self.process.stdin.write(data)
+
+    def shutdown_write(self):
+        self.process.stdin.close()
+
+    def recv(self, size):
+        return self.process.stdout.read1(size)
+
+    def makefile_stderr(self, mode="rb"):
+        return self.process.stderr
+
+    def recv_exit_status(self):
+        return self.process.wait()
+
+    def close(self):
+        for stream in (self.process.stdin, self.process.stdout, self.process.stderr):
+            if not stream.closed:
+                stream.close()
+
+
+def make_tar_manager(remote_tools="tar\ngzip\n"):
+    manager, connection = make_manager()
+    connection.client.get_transport.return_value.open_session.side_effect = LocalExecChannel
+    connection.execute_command = AsyncMock(return_value=(0, remote_tools, ""))
+    return manager, connection
+
+
+def make_tree(root, count):
+    for i in range(count):
+        path = os.path.join(root, f"dir{i % 5}", f"file{i}.txt")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(f"content {i}\n" * (i + 1))
+
+
+def read_tree(root):
+    tree = {}
+    for directory, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(directory, name)
+            with open(path) as f:
+                tree[os.path.relpath(path, root)] = f.read()
+    return tree
+
+
+class TestTarTransfer:
+    """tar流批量传输测试类"""
+
+    @pytest.mark.asyncio
+    async def test_upload_directory_with_gzip(self):
+        """测试本地目录打包为gzip压缩的tar流并在远端解包"""
+        manager, connection = make_tar_manager()
+        with tempfile.TemporaryDirectory() as work_dir:
+            local_root = os.path.join(work_dir, "local")
+            remote_root = os.path.join(work_dir, "remote", "target")
+            make_tree(local_root, 50)
+
+            result = await manager.upload_directory("user@server.com:22", local_root, remote_root)
+
+            assert result["success"], result.get("error")
+            assert result["mode"] == "tar"
+            assert result["compression"] == "gzip"
+            assert result["files"] == 50
+            assert result["wire_bytes"] < result["bytes"]
+            assert read_tree(remote_root) == read_tree(local_root)
+
+    @pytest.mark.asyncio
+    async def test_download_directory_without_compression(self):
+        """测试远端目录以未压缩tar流下载并解包到本地"""
+        manager, connection = make_tar_manager()
+        with tempfile.TemporaryDirectory() as work_dir:
+            remote_root = os.path.join(work_dir, "remote")
+            local_root = os.path.join(work_dir, "local", "copy")
+            make_tree(remote_root, 20)
+
+            result = await manager.download_directory(
+                "user@server.com:22", remote_root, local_root, compression="none"
+            )
+
+            assert result["success"], result.get("error")
+            assert result["compression"] == "none"
+            assert result["files"] == 20
+            assert read_tree(local_root) == read_tree(remote_root)
+
+    @pytest.mark.asyncio
+    async def test_remote_failure_is_reported(self):
+        """测试远端tar失败时返回错误"""
+        manager, connection = make_tar_manager()
+        with tempfile.TemporaryDirectory() as work_dir:
+            result = await manager.download_directory(
+                "user@server.com:22", os.path.join(work_dir, "missing"), os.path.join(work_dir, "local")
+            )
+
+        assert not result["success"]
+        assert "远端打包失败" in result["error"]
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_sftp_without_tar(self):
+        """测试远端没有tar时回退为逐文件SFTP传输"""
+        manager, connection = make_tar_manager(remote_tools="")
+        manager.sync_directory = AsyncMock(
+            return_value={"success": True, "transferred": 3, "transferred_bytes": 30}
+        )
+        with tempfile.TemporaryDirectory() as work_dir:
+            result = await manager.upload_directory("user@server.com:22", work_dir, "/srv/app")
+
+        assert result["mode"] == "sftp"
+        assert result["files"] == 3
+        manager.sync_directory.assert_awaited_once_with(
+            "user@server.com:22", work_dir, "/srv/app", direction="upload"
+        )
+        connection.client.get_transport.return_value.open_session.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_probe_failure_is_reported(self):
+        """测试工具探测因连接问题失败时返回错误，不回退为SFTP传输"""
+        manager, connection = make_tar_manager()
+        connection.execute_command = AsyncMock(return_value=(-1, "", "SSH连接已断开"))
+        manager.sync_directory = AsyncMock()
+        with tempfile.TemporaryDirectory() as work_dir:
+            result = await manager.upload_directory("user@server.com:22", work_dir, "/srv/app")
+
+        assert not result["success"]
+        assert "SSH连接已断开" in result["error"]
+        manager.sync_directory.assert_not_called()
+        connection.client.get_transport.return_value.open_session.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_zstd_downgrades_when_unavailable(self):
+        """测试本地缺少zstandard时zstd降级为gzip"""
+        manager, connection = make_tar_manager(remote_tools="tar\ngzip\nzstd\n")
+        with patch("ssh_manager.zstandard", None):
+            compression = await manager._negotiate_tar_compression(connection, "zstd")
+        assert compression == "gzip"
+
+        manager, connection = make_tar_manager(remote_tools="tar\n")
+        assert await manager._negotiate_tar_compression(connection, "gzip") == "none"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
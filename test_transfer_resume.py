@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+SFTP断点续传的pytest测试
+测试检查点落盘、服务重启后续传、源文件变化和前缀哈希校验
+"""
+
+import pytest
+import os
+import hashlib
+import tempfile
+from unittest.mock import Mock, AsyncMock
+from ssh_manager import SSHManager
+from ssh_test_helpers import make_manager, make_sftp_client
+
+CHUNK = 64 * 1024
+
+
+class FlakyRemoteFile:
+    """模拟paramiko.SFTPFile，读取指定数量的分块后连接中断"""
+
+    def __init__(self, content: bytes, reads: list, fail_after=None):
+        self._content = content
+        self._reads = reads
+        self._fail_after = fail_after
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def readv(self, chunks):
+        for offset, length in chunks:
+            if self._fail_after is not None and len(self._reads) >= self._fail_after:
+                raise EOFError("连接中断")
+            self._reads.append(offset)
+            yield self._content[offset:offset + length]
+
+
+def make_resume_manager(checkpoint_file, content, mtime=1700000000, fail_after=None):
+    manager, connection = make_manager(transfer_checkpoint_file=checkpoint_file)
+    reads = []
+
+    def open_sftp():
+        sftp_client = make_sftp_client()
+        sftp_client.stat.return_value = Mock(st_size=len(content), st_mtime=mtime)
+        sftp_client.open.side_effect = lambda path, mode: FlakyRemoteFile(content, reads, fail_after)
+        return sftp_client
+
+    connection.client.open_sftp.side_effect = open_sftp
+    return manager, connection, reads
+
+
+class TestTransferResume:
+    """断点续传测试类"""
+
+    @pytest.mark.asyncio
+    async def test_resume_after_restart(self):
+        """测试中断后由新的管理器实例从检查点继续下载"""
+        content = os.urandom(CHUNK * 8)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkpoint_file = os.path.join(temp_dir, "checkpoints.json")
+            local_path = os.path.join(temp_dir, "artifact.tar")
+
+            manager, _, _ = make_resume_manager(checkpoint_file, content, fail_after=3)
+            result = await manager.download_file(
+                "user@server.com:22", "/data/artifact.tar", local_path,
+                resume=True, parallel=False, chunk_size=CHUNK
+            )
+            assert not result["success"]
+            checkpoints = manager.list_transfer_checkpoints()["checkpoints"]
+            assert checkpoints[0]["verified_offset"] == CHUNK * 3
+
+            # 模拟MCP服务重启
+            manager, _, reads = make_resume_manager(checkpoint_file, content)
+            result = await manager.download_file(
+                "user@server.com:22", "/data/artifact.tar", local_path,
+                resume=True, parallel=False, chunk_size=CHUNK
+            )
+
+            assert result["success"]
+            assert result["resumed_from"] == CHUNK * 3
+            assert reads[0] == CHUNK * 3
+            with open(local_path, "rb") as f:
+                assert f.read() == content
+            assert manager.list_transfer_checkpoints()["count"] == 0
+
+    @pytest.mark.asyncio
+    async def test_changed_source_restarts(self):
+        """测试源文件修改时间变化后从头传输"""
+        content = os.urandom(CHUNK * 4)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkpoint_file = os.path.join(temp_dir, "checkpoints.json")
+            local_path = os.path.join(temp_dir, "app.log")
+
+            manager, _, _ = make_resume_manager(checkpoint_file, content, fail_after=2)
+            await manager.download_file(
+                "user@server.com:22", "/var/log/app.log", local_path,
+                resume=True, parallel=False, chunk_size=CHUNK
+            )
+
+            manager, _, reads = make_resume_manager(checkpoint_file, content, mtime=1800000000)
+            result = await manager.download_file(
+                "user@server.com:22", "/var/log/app.log", local_path,
+                resume=True, parallel=False, chunk_size=CHUNK
+            )
+
+            assert result["success"]
+            assert result["resumed_from"] == 0
+            assert reads[0] == 0
+
+    @pytest.mark.asyncio
+    async def test_hash_mismatch_restarts(self):
+        """测试没有检查点时按已有部分大小续传，前缀哈希不一致则从头传输"""
+        content = os.urandom(CHUNK * 4)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkpoint_file = os.path.join(temp_dir, "checkpoints.json")
+            local_path = os.path.join(temp_dir, "data.bin")
+            with open(local_path, "wb") as f:
+                f.write(content[:CHUNK])
+
+            manager, connection, reads = make_resume_manager(checkpoint_file, content)
+            remote_digest = hashlib.sha256(content[:CHUNK]).hexdigest()
+            connection.execute_command = AsyncMock(return_value=(0, f"{remote_digest}  -\n", ""))
+            result = await manager.download_file(
+                "user@server.com:22", "/data/data.bin", local_path,
+                resume=True, verify_hash=True, parallel=False, chunk_size=CHUNK
+            )
+            assert result["resumed_from"] == CHUNK
+            assert "head -c 65536 /data/data.bin" in connection.execute_command.call_args[0][0]
+
+            with open(local_path, "r+b") as f:
+                f.truncate(CHUNK)
+                f.write(b"corrupted")
+            reads.clear()
+            result = await manager.download_file(
+                "user@server.com:22", "/data/data.bin", local_path,
+                resume=True, verify_hash=True, parallel=False, chunk_size=CHUNK
+            )
+
+            assert result["success"]
+            assert result["resumed_from"] == 0
+            with open(local_path, "rb") as f:
+                assert f.read() == content
+
+    def test_default_checkpoint_file_in_user_state_dir(self, monkeypatch):
+        """测试默认检查点文件保存在用户状态目录中，目录权限为0700"""
+        with tempfile.TemporaryDirectory() as home:
+            monkeypatch.setenv("HOME", home)
+            manager = SSHManager()
+            state_dir = os.path.join(home, ".ssh_agent_mcp")
+            assert manager.transfer_checkpoints.path == os.path.join(state_dir, "transfer_checkpoints.json")
+
+            manager.transfer_checkpoints.begin("upload|c|/r|/l", verified_offset=0)
+            assert os.path.exists(manager.transfer_checkpoints.path)
+            assert os.stat(state_dir).st_mode & 0o777 == 0o700
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+按工作负载分类的线程池的pytest测试
+测试排队和饱和统计，以及长时间传输不会挤占健康检查线程
+"""
+
+import pytest
+import asyncio
+import threading
+from ssh_manager import SSHConnection, InstrumentedExecutor
+from ssh_test_helpers import make_manager
+
+
+class TestWorkloadExecutors:
+    """工作负载线程池测试类"""
+
+    @pytest.mark.asyncio
+    async def test_queue_and_saturation_stats(self):
+        """测试任务超过线程数时记录排队深度和饱和次数"""
+        executor = InstrumentedExecutor("test", 2)
+        release = threading.Event()
+        loop = asyncio.get_event_loop()
+        try:
+            futures = [loop.run_in_executor(executor, release.wait) for _ in range(5)]
+            await asyncio.sleep(0.05)
+
+            stats = executor.stats()
+            assert stats["workers"] == 2
+            assert stats["active"] == 2
+            assert stats["queued"] == 3
+            assert stats["saturated"] == 3
+            assert stats["utilization"] == 1.0
+
+            release.set()
+            await asyncio.gather(*futures)
+            stats = executor.stats()
+            assert stats["completed"] == 5
+            assert stats["queued"] == 0
+            assert stats["peak_queued"] >= 3
+            assert stats["max_wait_ms"] > 0
+        finally:
+            release.set()
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_transfers_do_not_starve_health_checks(self):
+        """测试传输线程池占满时健康检查仍在自己的线程池中完成"""
+        manager, connection = make_manager(transfer_workers=1, health_check_timeout=2)
+        connection.client.get_transport.return_value.is_active.return_value = True
+        assert connection.executors is manager.executors
+
+        release = threading.Event()
+        loop = asyncio.get_event_loop()
+        blocked = [loop.run_in_executor(manager.executors.transfer, release.wait) for _ in range(3)]
+        try:
+            await asyncio.sleep(0.05)
+            assert manager.get_executor_stats()["transfer"]["queued"] == 2
+
+            assert await asyncio.wait_for(connection.send_keepalive(), 1)
+            stats = manager.get_executor_stats()
+            assert stats["housekeeping"]["completed"] == 2
+            assert stats["transfer"]["completed"] == 0
+        finally:
+            release.set()
+            await asyncio.gather(*blocked)
+            manager.executors.shutdown()
+
+    def test_standalone_connection_uses_shared_executors(self):
+        """测试不经SSHManager创建的连接使用共享的默认线程池"""
+        first = SSHConnection("a.com", "user", 22)
+        second = SSHConnection("b.com", "user", 22)
+        assert first.executors is second.executors
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])